@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark and regression check of the scraper against recorded Ticketline pages.
+
+The pages in fixtures/ are served from a local HTTP server and crawled with the real scraping
+code (HTTP fetch mode), then the events are written to a throwaway Postgres. Reports pages/sec,
+extraction ms/page, matching throughput and rows/sec inserted, so a change can be measured
+without touching the live site.
+
+Usage:
+    python benchmark.py run [--repeat 5] [--db-rows 2000] [--output bench.json] [--compare previous.json]
+    python benchmark.py record [--months 2] [--details 4]    (refresh fixtures/ from the live site)
+
+The manifest also lists the events expected from each recorded page; tests/test_fixture_crawl.py
+crawls the fixtures and checks the scraper still extracts exactly those.
+
+The database is BENCH_DATABASE_URL when set (a scratch schema is created in it and dropped at
+the end), otherwise a temporary cluster through pgserver (pip install pgserver). Without either,
+the database phase is skipped.
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import replace
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, 'fixtures')
+MANIFEST_NAME = 'manifest.json'
+SCHEMA_NAME = 'schema.sql'
+
+# Results that measure speed, and which way is better (the rest are counts, shown for context)
+HIGHER_IS_BETTER = ('per_second',)
+LOWER_IS_BETTER = ('ms_per_page', 'crawl_seconds')
+
+
+def load_scraper():
+    """Import ticketline-ws.py as a module. It needs DB_* variables at import time, which the benchmark doesn't use."""
+    for name in ('DB_HOST', 'DB_PORT', 'DB_NAME', 'DB_USER', 'DB_PASSWORD'):
+        os.environ.setdefault(name, '0' if name == 'DB_PORT' else 'benchmark')
+    spec = importlib.util.spec_from_file_location('ticketline_ws', os.path.join(HERE, 'ticketline-ws.py'))
+    scraper = importlib.util.module_from_spec(spec)
+    with redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(scraper)
+    return scraper
+
+
+def load_manifest(fixtures_dir):
+    with open(os.path.join(fixtures_dir, MANIFEST_NAME), encoding='utf-8') as manifest_file:
+        return json.load(manifest_file)
+
+
+def page_key(url):
+    """Key of a page in the manifest: its path and query, without the host."""
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else '')
+
+
+@contextmanager
+def quiet(verbose=False):
+    """Silence the scraper's per-event logging, which would otherwise dominate the timings."""
+    if verbose:
+        yield
+    else:
+        with redirect_stdout(io.StringIO()):
+            yield
+
+
+class FixtureServer:
+    """Serves the recorded pages of the manifest from memory on a local port. Unknown pages get a 404."""
+
+    def __init__(self, fixtures_dir, manifest):
+        self.requests = 0
+        self.misses = []
+        pages = {}
+        for key, file_name in manifest['pages'].items():
+            with open(os.path.join(fixtures_dir, file_name), 'rb') as page_file:
+                pages[key] = page_file.read()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, like the real site
+
+            def do_GET(self):
+                server.requests += 1
+                body = pages.get(self.path)
+                if body is None:
+                    server.misses.append(self.path)
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fixture-server', daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        return False
+
+
+class FixtureMiss(BaseException):
+    """A page needed the browser. BaseException, so the scraper's retry loops don't swallow it."""
+
+
+class FixturePage:
+    """Stands in for a browser page: the benchmark only measures the HTTP path."""
+
+    def goto(self, url, **kwargs):
+        raise FixtureMiss(f"{url} could not be scraped over HTTP (not recorded, or not parseable)")
+
+
+class FixtureSession:
+    """The part of BrowserSession that run_sync_crawl uses, without a browser."""
+
+    policy = None
+
+    def page(self):
+        return FixturePage()
+
+
+def configure_scraper(scraper, base_url, manifest):
+    """Point the scraper at the fixture server, with every cache and every delay turned off."""
+    scraper.BASE_URL = base_url
+    scraper.FETCH_MODE = 'http'
+    scraper.PAGE_CACHE_ENABLED = False
+    scraper.JOURNAL_ENABLED = False
+    scraper.INCREMENTAL_MODE = False
+    scraper.DISCOVERY_MODE = 'category'  # The fixtures are category listings
+    scraper.DISCOVERY_STATE_PATH = None
+    scraper.BROWSER_PROFILES_DIR = None  # Profiles and cookies in memory only
+    scraper.RATE_JITTER = 0
+    scraper.REQUESTS_PER_MINUTE = scraper.MAX_REQUESTS_PER_MINUTE = 10 ** 9
+    scraper.CATEGORIES = manifest.get('categories', [253])
+    scraper.get_crawl_months = lambda: [tuple(month) for month in manifest['months']]
+
+
+def event_record(event):
+    """An event as the manifest lists it, with the details page URL relative to the fixture server."""
+    return {
+        'title': event.title,
+        'date': event.date,
+        'location': event.location,
+        'has_multi_sessions': event.has_multi_sessions,
+        'detailsPageUrl': page_key(event.detailsPageUrl) if event.detailsPageUrl else event.detailsPageUrl
+    }
+
+
+def crawl_by_page(scraper, fixtures_dir, manifest):
+    """
+    Crawl the fixtures once (HTTP path). Returns the events each recorded page led to, by file name
+    (the records the manifest expects under 'events'), and the pages the crawl asked for but weren't recorded.
+    """
+    base = scraper.ScheduledCrawl
+    files = manifest['pages']
+    found = {file_name: [] for file_name in files.values()}
+
+    def collect(url, events):
+        found.setdefault(files.get(page_key(url), page_key(url)), []).extend(event_record(event) for event in events)
+        return events
+
+    class RecordingCrawl(base):
+        listing = None  # Sessions read from a listing's structured data belong to the listing page
+
+        def listing_done(self, payload, listing):
+            self.listing = scraper.listing_url(payload['category'], payload['month'], payload['year'], payload['page'])
+            try:
+                return collect(self.listing, super().listing_done(payload, listing))
+            finally:
+                self.listing = None
+
+        def details_done(self, event, extra):
+            events = super().details_done(event, extra)
+            return events if self.listing else collect(scraper.canonical_url(event.detailsPageUrl), events)
+
+    with FixtureServer(fixtures_dir, manifest) as server:
+        configure_scraper(scraper, server.base_url, manifest)
+        # One worker: an event listed on several pages is then always credited to the same one
+        scraper.CRAWL_CONCURRENCY = 1
+        matcher = scraper.StandupMatcher(list(enumerate(manifest['standups'], start=1)))
+        scraper.ScheduledCrawl = RecordingCrawl
+        try:
+            with quiet():
+                scraper.run_sync_crawl(FixtureSession(), matcher, lambda events: None)
+        finally:
+            scraper.ScheduledCrawl = base
+    return found, sorted(set(server.misses))
+
+
+def bench_crawl(scraper, matcher, repeat, verbose):
+    """Crawl the fixtures `repeat` times. Returns the events of the last crawl and the timings."""
+    metrics = scraper.get_metrics()
+    best = None
+    for _ in range(repeat):
+        metrics.reset()
+        events = []
+        started = time.perf_counter()
+        with quiet(verbose):
+            scraper.run_sync_crawl(FixtureSession(), matcher, events.extend)
+        elapsed = time.perf_counter() - started
+
+        pages = metrics.total('pages', source='http')
+        parse_count, parse_seconds = metrics.timing('parse_seconds')
+        _, extraction_seconds = metrics.timing('extraction_seconds', source='http')
+        run = {
+            'pages': pages,
+            'details_from_structured_data': metrics.total('pages', source='structured_data'),
+            'events': len(events),
+            'crawl_seconds': elapsed,
+            'pages_per_second': pages / elapsed if elapsed else 0.0,
+            'extraction_ms_per_page': (parse_seconds + extraction_seconds) * 1000 / parse_count if parse_count else 0.0
+        }
+        if best is None or run['crawl_seconds'] < best['crawl_seconds']:
+            best = run
+    return events, best
+
+
+def bench_matching(scraper, standups, locations, events, rounds):
+    """Standup matches/sec and location resolutions/sec over the crawled titles and venues."""
+    # Every title is made unique, so the matchers' memo never answers for them
+    titles = [f"{event.title} #{number}" for number in range(rounds) for event in events]
+    venues = [f"{event.location} {number}" for number in range(rounds) for event in events]
+
+    matcher = scraper.StandupMatcher(standups)
+    started = time.perf_counter()
+    matched = sum(1 for title in titles if matcher.match(title))
+    match_seconds = time.perf_counter() - started
+
+    index = scraper.LocationIndex(locations, scraper.LOCATION_FUZZY_THRESHOLD)
+    started = time.perf_counter()
+    resolved = sum(1 for venue in venues if index.resolve(venue))
+    resolve_seconds = time.perf_counter() - started
+
+    return {
+        'standup_matches_per_second': len(titles) / match_seconds if match_seconds else 0.0,
+        'standup_match_rate': matched / len(titles) if titles else 0.0,
+        'location_resolutions_per_second': len(venues) / resolve_seconds if resolve_seconds else 0.0,
+        'location_match_rate': resolved / len(venues) if venues else 0.0
+    }
+
+
+@contextmanager
+def throwaway_database():
+    """
+    Yield (psycopg2 connection kwargs, description) of an empty scratch database, or (None, reason)
+    when there is none to use.
+    """
+    import psycopg2
+
+    url = os.environ.get('BENCH_DATABASE_URL')
+    if url:
+        schema = f"ticketline_bench_{os.getpid()}"
+        conn = psycopg2.connect(url)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f'CREATE SCHEMA "{schema}"')
+        try:
+            yield {'dsn': url, 'options': f'-c search_path={schema}'}, f"BENCH_DATABASE_URL, schema {schema}"
+        finally:
+            with conn.cursor() as cursor:
+                cursor.execute(f'DROP SCHEMA "{schema}" CASCADE')
+            conn.close()
+        return
+
+    try:
+        import pgserver
+    except ImportError:
+        yield None, "BENCH_DATABASE_URL is not set and pgserver is not installed"
+        return
+
+    data_dir = tempfile.mkdtemp(prefix='ticketline-bench-')
+    try:
+        server = pgserver.get_server(data_dir, cleanup_mode='stop')
+        try:
+            yield {'dsn': server.get_uri()}, "temporary pgserver cluster"
+        finally:
+            server.cleanup()
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def seed_database(db_config, fixtures_dir, manifest):
+    """Create the tables and the standups, comedians and locations the crawl is matched against."""
+    import psycopg2
+
+    with open(os.path.join(fixtures_dir, SCHEMA_NAME), encoding='utf-8') as schema_file:
+        schema = schema_file.read()
+    conn = psycopg2.connect(**db_config)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(schema)
+            for number, name in enumerate(manifest['standups'], start=1):
+                cursor.execute("INSERT INTO standup (name) VALUES (%s) RETURNING id", (name,))
+                standup_id = cursor.fetchone()[0]
+                cursor.execute(
+                    "INSERT INTO standup_comedian (standup_id, comedian_id) VALUES (%s, %s), (%s, %s)",
+                    (standup_id, number * 2, standup_id, number * 2 + 1)
+                )
+            for name, city in manifest['locations']:
+                cursor.execute("INSERT INTO location (name, city) VALUES (%s, %s)", (name, city))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def synthetic_events(scraper, events, matcher, count):
+    """
+    `count` events built from the crawled ones that match a standup, each on its own date so
+    every one of them is a new row.
+    """
+    matching = [event for event in events if matcher.match(event.title) and event.date != 'N/A']
+    if not matching:
+        return []
+    rows = []
+    for number in range(count):
+        event = matching[number % len(matching)]
+        date = scraper.parse_date_to_offset_datetime(event.date) + timedelta(minutes=number)
+        rows.append(replace(event, date=date.isoformat()))
+    return rows
+
+
+def bench_database(scraper, db_config, fixtures_dir, manifest, events, rows, verbose):
+    """Rows/sec written by EventWriter, for new events and for events that are all duplicates."""
+    seed_database(db_config, fixtures_dir, manifest)
+    db_pool = scraper.DatabasePool(1, 2, **db_config)
+    try:
+        with quiet(verbose), scraper.UnitOfWork(db_pool) as uow:
+            matcher = scraper.StandupMatcher(scraper.get_standups_from_db(uow))
+            batch = synthetic_events(scraper, events, matcher, rows)
+            if not batch:
+                return {'rows': 0}
+            writer = scraper.EventWriter(matcher, uow)
+
+            timings = {}
+            for label in ('insert', 'duplicate'):
+                started = time.perf_counter()
+                for start in range(0, len(batch), scraper.PIPELINE_BATCH_SIZE):
+                    writer.write(batch[start:start + scraper.PIPELINE_BATCH_SIZE])
+                timings[label] = time.perf_counter() - started
+
+        return {
+            'rows': writer.saved_count,
+            'batch_size': scraper.PIPELINE_BATCH_SIZE,
+            'rows_per_second': writer.saved_count / timings['insert'] if timings['insert'] else 0.0,
+            'duplicate_rows_per_second': len(batch) / timings['duplicate'] if timings['duplicate'] else 0.0
+        }
+    finally:
+        db_pool.close()
+
+
+def run(args):
+    manifest = load_manifest(args.fixtures)
+    scraper = load_scraper()
+
+    results = {'fixtures': len(manifest['pages'])}
+    with FixtureServer(args.fixtures, manifest) as server:
+        configure_scraper(scraper, server.base_url, manifest)
+        matcher = scraper.StandupMatcher(list(enumerate(manifest['standups'], start=1)))
+        try:
+            events, results['crawl'] = bench_crawl(scraper, matcher, args.repeat, args.verbose)
+        except FixtureMiss as e:
+            print(f"❌ {e}")
+            print("   Re-record the fixtures (python benchmark.py record) or fix the parser.")
+            return 1
+        results['crawl']['unrecorded_pages'] = sorted(set(server.misses))
+
+    results['matching'] = bench_matching(
+        scraper,
+        list(enumerate(manifest['standups'], start=1)),
+        [(number, name, city) for number, (name, city) in enumerate(manifest['locations'], start=1)],
+        events,
+        args.match_rounds
+    )
+
+    if args.db_rows:
+        with throwaway_database() as (db_config, description):
+            if db_config is None:
+                print(f"⚠️ Skipping the database phase: {description}")
+            else:
+                print(f"🗄️ Database phase on {description}")
+                results['database'] = bench_database(
+                    scraper, db_config, args.fixtures, manifest, events, args.db_rows, args.verbose
+                )
+
+    flat = flatten(results)
+    previous = flatten(load_results(args.compare)) if args.compare else {}
+    print_results(flat, previous)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+        print(f"\n📝 Results written to {args.output}")
+    return 0
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as results_file:
+        return json.load(results_file)
+
+
+def flatten(results, prefix=''):
+    """{'crawl': {'pages': 3}} -> {'crawl.pages': 3}, numbers only."""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def print_results(flat, previous):
+    print("\n📊 Benchmark results")
+    for key, value in flat.items():
+        line = f"   {key:<45} {value:>14,.2f}"
+        before = previous.get(key)
+        if before:
+            change = (value - before) / before * 100
+            line += f"   {change:+7.1f}%"
+            if key.endswith(HIGHER_IS_BETTER + LOWER_IS_BETTER):
+                better = change < 0 if key.endswith(LOWER_IS_BETTER) else change > 0
+                line += ' ✅' if better else ' ⚠️' if abs(change) >= 10 else ''
+        print(line)
+
+
+def record(args):
+    """Fetch the current listing and details pages from the live site into the fixtures directory."""
+    scraper = load_scraper()
+    os.makedirs(args.fixtures, exist_ok=True)
+    manifest_path = os.path.join(args.fixtures, MANIFEST_NAME)
+    manifest = load_manifest(args.fixtures) if os.path.exists(manifest_path) else {'standups': [], 'locations': []}
+    months = scraper.get_crawl_months()[:args.months]
+    manifest['months'] = [list(month) for month in months]
+    manifest['categories'] = list(scraper.CATEGORIES)
+    manifest['pages'] = {}
+
+    def save(url, file_name):
+        scraper.pace()
+        print(f"⬇️ {url}")
+        response = scraper.http_get(url)
+        if response is None or response.status_code != 200 or scraper.looks_like_challenge(response.text):
+            raise SystemExit(f"❌ Could not record {url}: the site didn't answer with a page")
+        html = response.text.replace(scraper.BASE_URL, '')  # Links stay on the fixture server
+        with open(os.path.join(args.fixtures, file_name), 'w', encoding='utf-8') as page_file:
+            page_file.write(html)
+        manifest['pages'][page_key(url)] = file_name
+        return scraper.BeautifulSoup(html, 'html.parser')
+
+    details = {}
+    for category, month, year in [(category, month, year) for category in scraper.CATEGORIES for month, year in months]:
+        page_number = 0
+        while True:
+            page_number += 1
+            url = scraper.listing_url(category, month, year, page_number)
+            records = scraper.parse_listing_records(save(url, f"listing-{category}-{year}-{month:02d}-p{page_number}.html"))
+            if not records or scraper.is_empty_listing(records):
+                break
+            for record in records:
+                if 'has_multiple_sessions' in record['classes'] and record['href']:
+                    details.setdefault(scraper.canonical_url(record['href']), scraper.absolute_url(record['href']))
+
+    for number, url in enumerate(list(details.values())[:args.details], start=1):
+        soup = save(url, f"details-{number}.html")
+        if not scraper.parse_session_records(soup):
+            print(f"⚠️ No sessions parsed from {url}")
+
+    manifest['events'], _ = crawl_by_page(scraper, args.fixtures, manifest)
+    with open(manifest_path, 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, ensure_ascii=False)
+        manifest_file.write('\n')
+    print(f"✅ Recorded {len(manifest['pages'])} pages into {args.fixtures}")
+    print("⚠️ Check the events expected from each page ('events' in the manifest) against the site before committing them")
+    if not manifest['standups']:
+        print("⚠️ Add the standup names to match to 'standups' in the manifest")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the scraper against recorded Ticketline pages.")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help="directory with the recorded pages and manifest.json")
+    commands = parser.add_subparsers(dest='command')
+
+    run_parser = commands.add_parser('run', help="benchmark against the recorded pages (default)")
+    run_parser.add_argument('--repeat', type=int, default=5, help="crawls to run; the fastest one is reported")
+    run_parser.add_argument('--match-rounds', type=int, default=200, help="times every crawled title is matched")
+    run_parser.add_argument('--db-rows', type=int, default=2000, help="rows to write in the database phase (0 skips it)")
+    run_parser.add_argument('--output', help="write the results to this JSON file")
+    run_parser.add_argument('--compare', help="show the change against results written by an earlier --output")
+    run_parser.add_argument('--verbose', action='store_true', help="keep the scraper's logging")
+
+    record_parser = commands.add_parser('record', help="refresh the fixtures from the live site")
+    record_parser.add_argument('--months', type=int, default=2, help="months of listings to record")
+    record_parser.add_argument('--details', type=int, default=4, help="multi-session details pages to record")
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        return record(args)
+    if args.command is None:
+        args = parser.parse_args(sys.argv[1:] + ['run'])
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
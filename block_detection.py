@@ -0,0 +1,141 @@
+"""
+Detection of rate limiting and bot-protection challenges from network responses.
+"""
+
+import threading
+from collections import Counter
+
+# Statuses the site answers with when it wants us to slow down
+BLOCK_STATUSES = (429, 403, 503)
+
+# Block reasons that are about the request rate, not about the browser (its context is kept)
+RATE_LIMIT_REASONS = ('HTTP 429',)
+
+# Parts of the URL of a page document that is a challenge instead of the page asked for. Only
+# checked on main documents: normal pages load scripts and widgets from these hosts too
+# (Cloudflare's bot-management script, a reCAPTCHA on a newsletter form)
+CHALLENGE_URL_MARKERS = (
+    '/cdn-cgi/challenge-platform/',
+    'challenges.cloudflare.com',
+    'captcha-delivery.com'
+)
+
+# Response headers set by bot-protection services on a challenge (header -> value it contains)
+CHALLENGE_HEADERS = {
+    'cf-mitigated': 'challenge',
+    'x-amzn-waf-action': 'captcha'
+}
+
+# Elements of challenge interstitials (captcha widgets alone don't count: normal pages embed them in forms)
+CHALLENGE_SELECTOR = '#challenge-form, #challenge-running, #cf-challenge-running, #challenge-stage, #cf-error-details'
+
+
+def challenge_url_reason(url):
+    """Return why a URL looks like part of a challenge, or None."""
+    url = url.lower()
+    for marker in CHALLENGE_URL_MARKERS:
+        if marker in url:
+            return f"challenge URL ({marker})"
+    return None
+
+
+def challenge_header_reason(headers):
+    """Return why response headers look like a challenge, or None. `headers` needs a .get()."""
+    for name, value in CHALLENGE_HEADERS.items():
+        if value in (headers.get(name) or '').lower():
+            return f"{name}: {value}"
+    return None
+
+
+def response_block_reason(status, headers, url):
+    """Return why a document response looks like a block ('HTTP 429', a challenge header or URL), or None."""
+    if status in BLOCK_STATUSES:
+        return f"HTTP {status}"
+    return challenge_header_reason(headers) or challenge_url_reason(url)
+
+
+class BlockDetector:
+    """
+    Watches the responses of browser pages through page.on('response').
+    Main document responses are checked for block statuses, challenge headers and URLs;
+    other responses (sub-resources, iframes) only for challenge headers, since a 403 on a tracking
+    pixel or a captcha widget in a form doesn't mean we are blocked. After a navigation, check() combines what
+    was seen with one targeted selector query, without copying the page's HTML.
+    Pages challenged for something other than the request rate are remembered until
+    take_challenge(), so that their browser context can be retired.
+    Works with sync and async pages; safe to share between pages and threads.
+    """
+
+    def __init__(self):
+        self.checks = 0
+        self.reasons = Counter()
+        self._lock = threading.Lock()
+        self._flagged = {}
+        self._challenged = {}
+
+    def reset_stats(self):
+        """Start a new run's statistics (checks and block reasons)."""
+        with self._lock:
+            self.checks = 0
+            self.reasons = Counter()
+
+    def watch(self, page):
+        """Start watching every response of a page."""
+        page.on('response', lambda response: self._on_response(page, response))
+
+    def _on_response(self, page, response):
+        try:
+            is_document = response.request.resource_type == 'document' and response.frame.parent_frame is None
+        except Exception:
+            is_document = False
+        headers = response.headers
+        if is_document:
+            reason = response_block_reason(response.status, headers, response.url)
+        else:
+            reason = challenge_header_reason(headers)
+        if reason:
+            with self._lock:
+                self._flagged.setdefault(page, reason)
+
+    def _navigation_reason(self, page, response):
+        """What the responses of the last navigation said, forgetting it for the next one."""
+        with self._lock:
+            reason = self._flagged.pop(page, None)
+        if reason is None and response is not None:
+            reason = response_block_reason(response.status, response.headers, response.url)
+        return reason
+
+    def _count(self, page, reason):
+        with self._lock:
+            self.checks += 1
+            if reason:
+                self.reasons[reason] += 1
+                if reason not in RATE_LIMIT_REASONS:
+                    self._challenged.setdefault(page, reason)
+        return reason
+
+    def check(self, page, response=None):
+        """Return why the navigation that just finished was blocked, or None."""
+        reason = self._navigation_reason(page, response)
+        if reason is None and page.query_selector(CHALLENGE_SELECTOR) is not None:
+            reason = "challenge element on page"
+        return self._count(page, reason)
+
+    async def async_check(self, page, response=None):
+        """Async counterpart of check."""
+        reason = self._navigation_reason(page, response)
+        if reason is None and await page.query_selector(CHALLENGE_SELECTOR) is not None:
+            reason = "challenge element on page"
+        return self._count(page, reason)
+
+    def take_challenge(self, page):
+        """Return why the page was challenged since the last call (forgetting it), or None."""
+        with self._lock:
+            return self._challenged.pop(page, None)
+
+    def summary(self):
+        """One-line human readable summary of the blocks seen during the run."""
+        with self._lock:
+            blocked = sum(self.reasons.values())
+            details = ', '.join(f"{reason} x{count}" for reason, count in self.reasons.most_common())
+        return f"Block detection: {blocked} of {self.checks} navigations blocked" + (f" ({details})" if details else "")
@@ -0,0 +1,147 @@
+"""
+Browser profiles: the fingerprint and cookies of each browser context, kept between runs.
+"""
+
+import json
+import os
+import random
+import secrets
+import threading
+import time
+
+
+def describe(profile):
+    """A profile's fingerprint, for the log."""
+    viewport = profile['viewport']
+    return f"User-Agent: {profile['user_agent'][:50]}..., Viewport: {viewport['width']}x{viewport['height']}"
+
+
+class BrowserProfiles:
+    """
+    A fixed number of browser profiles, each a stable fingerprint (user agent and viewport) plus
+    the storage_state (cookies, localStorage) its context had when it was last closed. Profiles
+    and their storage are kept in `directory`, so a context reopens with the same fingerprint and
+    without going through the cookie/consent warm-up again (with a `directory` of None, they are
+    only kept in memory).
+
+    A profile whose context gets challenged is retired: its storage is deleted and a profile with
+    a new fingerprint takes its place. New profiles avoid the fingerprints of the other profiles
+    while there are unused ones. Safe to share between threads.
+    """
+
+    def __init__(self, directory, size, user_agents, viewports):
+        self.directory = directory
+        self.size = size
+        self.user_agents = list(user_agents)
+        self.viewports = list(viewports)
+        self.retired = 0
+        self.created = 0
+        self._lock = threading.Lock()
+        self._profiles = []
+        self._storage = {}
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            index_path = self._path('profiles')
+            if os.path.exists(index_path):
+                try:
+                    with open(index_path, encoding='utf-8') as index_file:
+                        self._profiles = json.load(index_file)[:size]
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Could not read browser profiles '{index_path}', starting fresh: {e}")
+        while len(self._profiles) < size:
+            self._profiles.append(self._new_profile())
+        self._save_index()
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _new_profile(self):
+        used = {(profile['user_agent'], profile['viewport']['width']) for profile in self._profiles}
+        fingerprints = [
+            (user_agent, viewport)
+            for user_agent in self.user_agents for viewport in self.viewports
+            if (user_agent, viewport['width']) not in used
+        ]
+        user_agent, viewport = random.choice(fingerprints) if fingerprints else (random.choice(self.user_agents), random.choice(self.viewports))
+        self.created += 1
+        return {'id': secrets.token_hex(4), 'user_agent': user_agent, 'viewport': viewport, 'created': time.time()}
+
+    def _save_index(self):
+        if not self.directory:
+            return
+        temp_path = self._path('profiles') + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump(self._profiles, index_file, indent=2)
+        os.replace(temp_path, self._path('profiles'))
+
+    def _has_storage(self, profile):
+        if not self.directory:
+            return profile['id'] in self._storage
+        return os.path.exists(self._path(profile['id']))
+
+    @property
+    def profiles(self):
+        with self._lock:
+            return list(self._profiles)
+
+    def is_active(self, profile):
+        """Check if a profile is still in use (not retired)."""
+        with self._lock:
+            return profile in self._profiles
+
+    def storage_state(self, profile):
+        """The profile's saved storage_state for new_context (a path, or a dict in memory), or None if it has none yet."""
+        if not self.directory:
+            return self._storage.get(profile['id'])
+        path = self._path(profile['id'])
+        return path if os.path.exists(path) else None
+
+    def load_storage(self, profile):
+        """The profile's saved storage_state as a dict, or None if it has none (or it can't be read)."""
+        state = self.storage_state(profile)
+        if state is None or isinstance(state, dict):
+            return state
+        try:
+            with open(state, encoding='utf-8') as state_file:
+                return json.load(state_file)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read the storage of browser profile {profile['id']}: {e}")
+            return None
+
+    def save_storage(self, profile, state):
+        """Keep the storage_state of a profile's context (unless the profile was retired meanwhile)."""
+        with self._lock:
+            if profile not in self._profiles:
+                return
+            if not self.directory:
+                self._storage[profile['id']] = state
+                return
+            temp_path = self._path(profile['id']) + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as state_file:
+                json.dump(state, state_file)
+            os.replace(temp_path, self._path(profile['id']))
+
+    def retire(self, profile, reason):
+        """Drop a challenged profile and its storage. Returns the profile that replaces it."""
+        with self._lock:
+            if profile not in self._profiles:
+                return None
+            replacement = self._new_profile()
+            self._profiles[self._profiles.index(profile)] = replacement
+            self.retired += 1
+            self._save_index()
+            self._storage.pop(profile['id'], None)
+            if self.directory and os.path.exists(self._path(profile['id'])):
+                os.remove(self._path(profile['id']))
+        print(f"🪪 Retired browser profile {profile['id']} ({reason}), replaced by {replacement['id']}: {describe(replacement)}")
+        return replacement
+
+    def stats(self):
+        with self._lock:
+            return {
+                'profiles': len(self._profiles),
+                'with_storage': sum(1 for profile in self._profiles if self._has_storage(profile)),
+                'created': self.created,
+                'retired': self.retired
+            }
@@ -0,0 +1,77 @@
+"""
+Priority order of a crawl run's pages, under an optional run deadline.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+
+class CrawlScheduler:
+    """
+    The pages of a run still to be crawled, most valuable first.
+
+    pop() returns the task with the lowest priority value (ties in the order they were pushed).
+    Once `deadline` seconds have passed since the scheduler was created, pop() returns None: the
+    run stops starting pages and finishes with what it has, and what it leaves out are the least
+    valuable pages. A deadline of None never expires. Safe to share between threads.
+    """
+
+    def __init__(self, deadline=None):
+        self.deadline = deadline
+        self.started = time.monotonic()
+        self.pushed = 0
+        self.done = 0
+        self.in_flight = 0
+        self._heap = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def expired(self):
+        return self.deadline is not None and time.monotonic() - self.started >= self.deadline
+
+    @property
+    def pending(self):
+        """Tasks pushed but not started."""
+        with self._lock:
+            return len(self._heap)
+
+    def push(self, priority, task):
+        with self._lock:
+            heapq.heappush(self._heap, (priority, next(self._order), task))
+            self.pushed += 1
+
+    def pop(self):
+        """The next task to run, or None if there is none left or the deadline has passed."""
+        if self.expired:
+            return None
+        with self._lock:
+            if not self._heap:
+                return None
+            self.in_flight += 1
+            return heapq.heappop(self._heap)[2]
+
+    def task_done(self):
+        """A task returned by pop() is finished (and has pushed the tasks it leads to)."""
+        with self._lock:
+            self.in_flight -= 1
+            self.done += 1
+
+    @property
+    def finished(self):
+        """No task left to start or waiting to finish (the pages that lead to more are all done)."""
+        with self._lock:
+            return not self._heap and not self.in_flight
+
+    def summary(self):
+        """One-line human readable summary of the run's schedule."""
+        elapsed = time.monotonic() - self.started
+        pending = self.pending
+        if pending and self.expired:
+            return (
+                f"Deadline of {self.deadline:.0f}s reached after {self.done} of {self.pushed} pages: "
+                f"{pending} lowest-priority pages not crawled"
+            )
+        return f"Schedule: {self.done} pages in {elapsed:.0f}s" + (f" (deadline {self.deadline:.0f}s)" if self.deadline else "")
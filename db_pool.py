@@ -0,0 +1,146 @@
+"""
+Pooled Postgres connections shared by every database function of the scraper.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from psycopg2 import pool
+
+
+class _CountingConnectionPool(pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool that counts how many physical connections it opened."""
+
+    def __init__(self, *args, **kwargs):
+        self.connects = 0
+        super().__init__(*args, **kwargs)
+
+    def _connect(self, key=None):
+        self.connects += 1
+        return super()._connect(key)
+
+
+class DatabasePool:
+    """
+    Thread-safe connection pool that waits for a free connection instead of failing when
+    all of them are checked out, and keeps statistics about how it is used.
+    """
+
+    def __init__(self, minconn, maxconn, **db_config):
+        self._pool = _CountingConnectionPool(minconn, maxconn, **db_config)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self.maxconn = maxconn
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.checkout_time = 0.0
+        self.max_checkout_time = 0.0
+
+    @contextmanager
+    def connection(self):
+        """Check a connection out of the pool for the duration of the block."""
+        if not self._slots.acquire(blocking=False):
+            started = time.monotonic()
+            self._slots.acquire()
+            with self._lock:
+                self.waits += 1
+                self.wait_time += time.monotonic() - started
+
+        try:
+            conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        checked_out = time.monotonic()
+        try:
+            yield conn
+        finally:
+            held = time.monotonic() - checked_out
+            with self._lock:
+                self.checkouts += 1
+                self.checkout_time += held
+                self.max_checkout_time = max(self.max_checkout_time, held)
+            # Broken connections are dropped so the next checkout gets a fresh one
+            self._pool.putconn(conn, close=bool(conn.closed))
+            self._slots.release()
+
+    def close(self):
+        self._pool.closeall()
+
+    def reset_stats(self):
+        """Start a new run's statistics. The open connections are kept."""
+        with self._lock:
+            self._pool.connects = 0
+            self.checkouts = 0
+            self.waits = 0
+            self.wait_time = 0.0
+            self.checkout_time = 0.0
+            self.max_checkout_time = 0.0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'connects': self._pool.connects,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_time': round(self.wait_time, 3),
+                'checkout_time': round(self.checkout_time, 3),
+                'max_checkout_time': round(self.max_checkout_time, 3)
+            }
+
+    def summary(self):
+        """One-line human readable summary of the statistics."""
+        stats = self.stats()
+        return (
+            f"DB pool: {stats['connects']} connects, {stats['checkouts']} checkouts, "
+            f"{stats['waits']} waits ({stats['wait_time']:.2f}s), "
+            f"checkout time {stats['checkout_time']:.2f}s (max {stats['max_checkout_time']:.2f}s)"
+        )
+
+
+class UnitOfWork:
+    """
+    One pooled connection for a whole run.
+    Work is committed at explicit checkpoints, and whatever is pending is rolled back
+    if the run fails or committed when it ends normally.
+    """
+
+    def __init__(self, db_pool):
+        self.db_pool = db_pool
+        self.conn = None
+        self.checkpoints = 0
+        self._checkout = None
+
+    def __enter__(self):
+        self._checkout = self.db_pool.connection()
+        self.conn = self._checkout.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.conn.closed:
+                pass
+            elif exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self._checkout.__exit__(exc_type, exc, tb)
+            self.conn = None
+        return False
+
+    def cursor(self):
+        return self.conn.cursor()
+
+    def checkpoint(self, label):
+        """Commit everything done since the previous checkpoint."""
+        self.conn.commit()
+        self.checkpoints += 1
+        print(f"📌 Checkpoint {self.checkpoints}: {label}")
+
+    def rollback(self):
+        """Discard everything done since the previous checkpoint."""
+        self.conn.rollback()
@@ -0,0 +1,89 @@
+"""
+Event discovery: crawling whole categories, or searching the site for each standup.
+"""
+
+import json
+import os
+
+from standup_matcher import normalize_text
+
+DISCOVERY_MODES = ('category', 'search')
+
+
+def search_queries(names):
+    """
+    The search queries that find every standup: one per distinct name, leaving out the names that
+    contain a shorter query as whole words (its results include theirs). Queries keep the
+    name's original spelling.
+    """
+    keys = {}
+    for name in names:
+        key = normalize_text(name)
+        if key and key not in keys:
+            keys[key] = name.strip()
+
+    queries = []
+    chosen = []
+    for key in sorted(keys, key=len):
+        if any(f" {query} " in f" {key} " for query in chosen):
+            continue
+        chosen.append(key)
+        queries.append(keys[key])
+    return queries
+
+
+class DiscoveryPlanner:
+    """
+    Picks the discovery mode expected to need fewer listing page loads: crawling the
+    (category, month) targets, or one search per query. Details pages are left out, since both
+    modes open the same ones.
+
+    The listing pages per category month and per search query are measured on each complete run
+    and remembered in a JSON file (not with a `path` of None); until a mode has been measured,
+    the given defaults are used.
+    """
+
+    def __init__(self, path, category_pages=3.0, search_pages=1.0):
+        self.path = path
+        self._state = {'category': category_pages, 'search': search_pages}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as state_file:
+                    self._state.update(json.load(state_file))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not read discovery state '{path}', using the defaults: {e}")
+
+    def estimate(self, targets, queries):
+        """Expected listing page loads of each mode, for `targets` category months and `queries` searches."""
+        return {'category': targets * self._state['category'], 'search': queries * self._state['search']}
+
+    def choose(self, mode, targets, queries):
+        """The mode to run: `mode` itself, or for 'auto' the one with the lower estimate. Returns (mode, estimates)."""
+        estimates = self.estimate(targets, queries)
+        if mode == 'auto':
+            mode = 'search' if queries and estimates['search'] < estimates['category'] else 'category'
+        elif mode not in DISCOVERY_MODES:
+            raise ValueError(f"Unknown discovery mode '{mode}' (expected 'auto', 'category' or 'search')")
+        return mode, estimates
+
+    def record(self, mode, units, pages):
+        """Remember the listing pages a complete run of `mode` loaded for its `units` (category months or queries)."""
+        if units:
+            self._state[mode] = pages / units
+
+    def save(self):
+        if not self.path:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as state_file:
+            json.dump(self._state, state_file)
+        os.replace(temp_path, self.path)
+
+    def summary(self, mode, estimates):
+        """One-line human readable summary of the choice."""
+        return (
+            f"Discovery: {mode} (estimated listing pages: {estimates['category']:.0f} for the category crawl, "
+            f"{estimates['search']:.0f} for the standup search)"
+        )
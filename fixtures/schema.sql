@@ -0,0 +1,15 @@
+-- Tables the scraper reads and writes, for the throwaway benchmark database.
+CREATE TABLE standup (id SERIAL PRIMARY KEY, name VARCHAR(500) NOT NULL);
+CREATE TABLE location (id SERIAL PRIMARY KEY, name VARCHAR(500) NOT NULL, city VARCHAR(255), street VARCHAR(255), "number" VARCHAR(50));
+CREATE TABLE event (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(500) NOT NULL,
+    date TIMESTAMPTZ NOT NULL,
+    url VARCHAR(1000) NOT NULL,
+    location INTEGER NOT NULL REFERENCES location(id),
+    standup_id INTEGER NOT NULL REFERENCES standup(id),
+    priority INTEGER,
+    UNIQUE (standup_id, date)
+);
+CREATE TABLE standup_comedian (standup_id INTEGER NOT NULL REFERENCES standup(id), comedian_id INTEGER NOT NULL, PRIMARY KEY (standup_id, comedian_id));
+CREATE TABLE comedian_event (comedian_id INTEGER NOT NULL, event_id INTEGER NOT NULL REFERENCES event(id), PRIMARY KEY (comedian_id, event_id));
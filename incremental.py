@@ -0,0 +1,70 @@
+"""
+Incremental crawling: remembers what each details page looked like on previous runs.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+
+def listing_fingerprint(event):
+    """Hash of what the listing page shows for an event; changes when the listing entry changes."""
+    key = '|'.join((event.title, event.date, event.location, event.detailsPageUrl))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class DetailsTracker:
+    """
+    Remembers, per details page URL, the listing entry and the sessions seen the last time the
+    page was opened. A details page only has to be opened again when it is new, when its listing
+    entry changed, or when one of its sessions is missing from the event table.
+    """
+
+    def __init__(self, path, known_keys):
+        self.path = path
+        self.known_keys = known_keys
+        self.visits_needed = 0
+        self.visits_skipped = 0
+        self._state = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as state_file:
+                    self._state = json.load(state_file)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not read details state '{path}', starting fresh: {e}")
+
+    def needs_visit(self, event):
+        """Check if the details page of a multi-session event has to be opened."""
+        entry = self._state.get(event.detailsPageUrl)
+        stored = (
+            entry is not None
+            and entry['listing'] == listing_fingerprint(event)
+            and entry['sessions']
+            and all((standup_id, datetime.fromisoformat(date)) in self.known_keys for standup_id, date in entry['sessions'])
+        )
+        if stored:
+            self.visits_skipped += 1
+            print(f"⏭️ Sessions of '{event.title}' already stored, not opening details page")
+            return False
+        self.visits_needed += 1
+        return True
+
+    def record(self, event, session_keys):
+        """Remember the sessions (standup_id, date) found on an event's details page."""
+        self._state[event.detailsPageUrl] = {
+            'listing': listing_fingerprint(event),
+            'sessions': [[standup_id, date.isoformat()] for standup_id, date in session_keys]
+        }
+
+    def save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as state_file:
+            json.dump(self._state, state_file)
+        os.replace(temp_path, self.path)
+
+    def summary(self):
+        """One-line human readable summary of this run's decisions."""
+        return f"Incremental: {self.visits_skipped} details pages skipped, {self.visits_needed} opened"
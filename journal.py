@@ -0,0 +1,116 @@
+"""
+Crash-safe journal of a crawl in progress, so a failed run can be resumed where it stopped.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class CrawlJournal:
+    """
+    Append-only JSONL log of the crawl frontier: every listing page and details page is written
+    (and fsynced) as soon as it is scraped, together with what was extracted.
+
+    A run that starts while an unfinished journal exists resumes it: journaled pages are not
+    fetched again. complete() deletes the journal once the events are saved. Journals older
+    than `max_age` seconds are discarded, since their listings would be out of date.
+    A line cut short by a crash is ignored (and cut off before resuming). Only the completed
+    pages' keys and where their line starts are kept in memory: the extracted data is read back
+    from the file when a page is reused. Safe to share between threads.
+    """
+
+    def __init__(self, path, max_age=None):
+        self.path = path
+        self.resumed = False
+        self.reused = 0
+        self.written = 0
+        self._lock = threading.Lock()
+        self._offsets = {}  # (kind, key) -> where its line starts in the file
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        started = self._load()
+        if started is not None and max_age is not None and time.time() - started > max_age:
+            print(f"🗑️ Crawl journal '{path}' is {(time.time() - started) / 3600:.1f}h old, starting over")
+            self._offsets = {}
+            started = None
+
+        if started is None:
+            self._file = open(path, 'wb')
+            self._write({'kind': 'run', 'started': time.time()})
+        else:
+            self.resumed = True
+            self._file = open(path, 'ab')
+            print(f"↩️ Resuming crawl journal '{path}' ({len(self._offsets)} pages already scraped)")
+
+    def _load(self):
+        """Index an existing journal. Returns when its run started, or None if there is none."""
+        if not os.path.exists(self.path):
+            return None
+        started = None
+        with open(self.path, 'rb') as journal_file:
+            while True:
+                offset = journal_file.tell()
+                line = journal_file.readline()
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry['kind'] == 'run':
+                    started = entry['started']
+                else:
+                    self._offsets[(entry['kind'], entry['key'])] = offset
+        if line:
+            os.truncate(self.path, offset)  # Partial line from a crash, the next entries go after the last whole one
+        return started
+
+    def _write(self, entry):
+        """Append an entry. Returns where its line starts."""
+        offset = self._file.tell()
+        self._file.write(json.dumps(entry, ensure_ascii=False).encode('utf-8') + b'\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return offset
+
+    def _read(self, offset):
+        with open(self.path, 'rb') as journal_file:
+            journal_file.seek(offset)
+            return json.loads(journal_file.readline())['data']
+
+    def get(self, kind, key):
+        """Return what was journaled for a unit of work ('listing', 'details'), or None."""
+        with self._lock:
+            offset = self._offsets.get((kind, key))
+            if offset is None:
+                return None
+            data = self._read(offset)
+            if data is not None:
+                self.reused += 1
+        return data
+
+    def record(self, kind, key, data):
+        """Journal a finished unit of work and what it produced (anything JSON serializable)."""
+        with self._lock:
+            self._offsets[(kind, key)] = self._write({'kind': kind, 'key': key, 'data': data})
+            self.written += 1
+
+    def close(self):
+        """Stop writing but keep the journal, so the next run can resume it."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def complete(self):
+        """The crawl's events are saved: the journal is no longer needed."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def summary(self):
+        """One-line human readable summary of this run's journal use."""
+        state = "resumed" if self.resumed else "new"
+        return f"Crawl journal ({state}): {self.reused} pages reused, {self.written} written"
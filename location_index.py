@@ -0,0 +1,99 @@
+"""
+Resolution of scraped location strings ("Venue - City") against the location table.
+"""
+
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from standup_matcher import normalize_text
+
+# Words too common to tell two venues apart
+STOPWORDS = {'a', 'o', 'e', 'de', 'do', 'da', 'dos', 'das', 'em', 'no', 'na', 'the'}
+
+
+def split_location(location_string):
+    """Split a 'Venue - City' string into (venue, city). City is None when there is no ' - '."""
+    if " - " in location_string:
+        venue, city = location_string.split(" - ", 1)
+        return venue.strip(), city.strip() or None
+    return location_string.strip(), None
+
+
+def tokenize(text):
+    """Normalized word tokens of a name, without stopwords."""
+    return {token for token in re.split(r'[^a-z0-9]+', normalize_text(text)) if token and token not in STOPWORDS}
+
+
+class LocationIndex:
+    """
+    In-memory index of locations keyed on normalized venue names and tokens.
+    A location string is resolved by exact venue name, then by containment (like the old
+    substring check), then fuzzily, only looking at locations that share a token with it.
+    The city, when known, breaks ties. Resolutions are cached for the whole run.
+    """
+
+    def __init__(self, locations=(), fuzzy_threshold=0.88):
+        self.fuzzy_threshold = fuzzy_threshold
+        self._entries = []
+        self._by_key = defaultdict(list)
+        self._by_token = defaultdict(set)
+        self._cache = {}
+        for location in locations:
+            self.add(*location)
+
+    def add(self, location_id, name, city=None):
+        """Index a location (id, name, city)."""
+        index = len(self._entries)
+        self._entries.append((location_id, name, normalize_text(city) if city else None, normalize_text(name)))
+        self._by_key[normalize_text(name)].append(index)
+        for token in tokenize(name):
+            self._by_token[token].add(index)
+        # New locations can resolve strings that previously missed
+        self._cache = {key: value for key, value in self._cache.items() if value is not None}
+
+    def _pick(self, indices, city):
+        """Prefer a location in the same city, then the longest name, then the oldest row."""
+        def rank(index):
+            location_id, name, location_city, _ = self._entries[index]
+            return (city is not None and location_city == city, len(name), -index)
+        location_id, name, _, _ = self._entries[max(indices, key=rank)]
+        return location_id, name
+
+    def _resolve(self, location_string):
+        venue, city = split_location(location_string)
+        venue_key = normalize_text(venue)
+        full_key = normalize_text(location_string)
+        city_key = normalize_text(city) if city else None
+
+        exact = self._by_key.get(venue_key) or self._by_key.get(full_key)
+        if exact:
+            return self._pick(exact, city_key)
+
+        candidates = set()
+        for token in tokenize(location_string):
+            candidates |= self._by_token.get(token, set())
+        if not candidates:
+            return None
+
+        contained = [
+            index for index in candidates
+            if any(key in self._entries[index][3] or self._entries[index][3] in key for key in (full_key, venue_key))
+        ]
+        if contained:
+            return self._pick(contained, city_key)
+
+        scored = [(SequenceMatcher(None, venue_key, self._entries[index][3]).ratio(), index) for index in candidates]
+        best_score = max(score for score, _ in scored)
+        if best_score < self.fuzzy_threshold:
+            return None
+        return self._pick([index for score, index in scored if score == best_score], city_key)
+
+    def resolve(self, location_string):
+        """Return (location_id, location_name) for a scraped location string, or None."""
+        if location_string not in self._cache:
+            self._cache[location_string] = self._resolve(location_string)
+        return self._cache[location_string]
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,191 @@
+"""
+Run instrumentation: counters and timing histograms, written out as a JSON run report
+and optionally as a Prometheus text-format file (for node_exporter's textfile collector).
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the histogram buckets, from in-memory work to long backoffs
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with count, sum, min and max."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'avg': round(self.sum / self.count, 6) if self.count else 0.0,
+            'min': round(self.min, 6) if self.count else 0.0,
+            'max': round(self.max, 6),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets, self.bucket_counts)}
+        }
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _label_text(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{str(value)}"' for name, value in pairs) + '}'
+
+
+class Metrics:
+    """
+    Registry of counters and histograms, each identified by a name and optional labels.
+    Safe to use from worker threads and asyncio tasks.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded, e.g. at the start of each run of the service."""
+        with self._lock:
+            self.started = time.time()
+            self._counters = {}
+            self._histograms = {}
+
+    def inc(self, name, amount=1, **labels):
+        """Add to a counter."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """Record one value (in seconds, for timings) in a histogram."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time the block into a histogram."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def total(self, name, **labels):
+        """Sum of a counter over every label set that includes `labels`."""
+        wanted = set(_label_key(labels))
+        with self._lock:
+            return sum(value for (counter, key), value in self._counters.items() if counter == name and wanted <= set(key))
+
+    def timing(self, name, **labels):
+        """(count, total seconds) of a histogram over every label set that includes `labels`."""
+        wanted = set(_label_key(labels))
+        with self._lock:
+            matching = [
+                histogram for (histogram_name, key), histogram in self._histograms.items()
+                if histogram_name == name and wanted <= set(key)
+            ]
+            return sum(histogram.count for histogram in matching), sum(histogram.sum for histogram in matching)
+
+    def snapshot(self):
+        """All counters and histograms as plain data, keyed 'name' or 'name{label="value"}'."""
+        with self._lock:
+            return {
+                'counters': {name + _label_text(key): value for (name, key), value in sorted(self._counters.items())},
+                'histograms': {
+                    name + _label_text(key): histogram.to_dict()
+                    for (name, key), histogram in sorted(self._histograms.items())
+                }
+            }
+
+    def write_json(self, path, **extra):
+        """Write the run report: timings, counters and whatever else is passed in `extra`."""
+        finished = time.time()
+        report = {
+            'started_at': self.started,
+            'finished_at': finished,
+            'duration_seconds': round(finished - self.started, 3),
+            **extra,
+            **self.snapshot()
+        }
+        _atomic_write(path, json.dumps(report, indent=2, default=str))
+
+    def write_prometheus(self, path, prefix='ticketline'):
+        """Write the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+
+        typed = set()
+        for (name, key), value in counters:
+            metric = f'{prefix}_{name}_total'
+            if metric not in typed:
+                lines.append(f'# TYPE {metric} counter')
+                typed.add(metric)
+            lines.append(f'{metric}{_label_text(key)} {value}')
+
+        for (name, key), histogram in histograms:
+            metric = f'{prefix}_{name}'
+            if metric not in typed:
+                lines.append(f'# TYPE {metric} histogram')
+                typed.add(metric)
+            for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                lines.append(f'{metric}_bucket{_label_text(key, [("le", bound)])} {count}')
+            lines.append(f'{metric}_bucket{_label_text(key, [("le", "+Inf")])} {histogram.count}')
+            lines.append(f'{metric}_sum{_label_text(key)} {histogram.sum:.6f}')
+            lines.append(f'{metric}_count{_label_text(key)} {histogram.count}')
+
+        lines.append(f'# TYPE {prefix}_last_run_timestamp_seconds gauge')
+        lines.append(f'{prefix}_last_run_timestamp_seconds {time.time():.0f}')
+        _atomic_write(path, '\n'.join(lines) + '\n')
+
+    def summary(self):
+        """Where the run's time went, one line per timed phase."""
+        with self._lock:
+            rows = sorted(self._histograms.items(), key=lambda item: -item[1].sum)
+        return '\n'.join(
+            f"   {name + _label_text(key)}: {histogram.sum:.2f}s over {histogram.count} "
+            f"(avg {histogram.sum / histogram.count * 1000:.1f} ms, max {histogram.max * 1000:.0f} ms)"
+            for (name, key), histogram in rows
+        )
+
+
+def _atomic_write(path, text):
+    """Replace a file in one step, so readers (e.g. node_exporter) never see half of it."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as report_file:
+        report_file.write(text)
+    os.replace(temp_path, path)
@@ -0,0 +1,222 @@
+"""
+Persistent on-disk cache of fetched pages, revalidated with conditional requests.
+
+Each entry keeps the page body, a hash of its content, the ETag / Last-Modified validators,
+the fetch time and the records extracted from it, so an unchanged page is never parsed twice.
+
+Usage:
+    python page_cache.py stats
+    python page_cache.py list [--type listing|details]
+    python page_cache.py prune [--older-than HOURS]   (default: entries past their TTL)
+    python page_cache.py clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+CachedPage = namedtuple('CachedPage', 'url page_type content_hash etag last_modified fetched_at extracted')
+
+
+class PageCache:
+    """SQLite-backed page cache keyed by URL, with a TTL per page type. Safe to share between threads."""
+
+    def __init__(self, path, ttls):
+        self.path = path
+        self.ttls = ttls
+        self.hits = 0
+        self.revalidated = 0
+        self.unchanged = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+        CREATE TABLE IF NOT EXISTS pages (
+            url           TEXT PRIMARY KEY,
+            page_type     TEXT NOT NULL,
+            body          BLOB,
+            content_hash  TEXT NOT NULL,
+            etag          TEXT,
+            last_modified TEXT,
+            fetched_at    REAL NOT NULL,
+            extracted     TEXT
+        )
+        """)
+        self._db.commit()
+
+    @staticmethod
+    def content_hash(body):
+        return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+    def get(self, url):
+        """Return the CachedPage for a URL, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, page_type, content_hash, etag, last_modified, fetched_at, extracted FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        extracted = json.loads(row[6]) if row[6] is not None else None
+        return CachedPage(*row[:6], extracted)
+
+    def is_fresh(self, entry):
+        """Check if an entry is still within the TTL of its page type."""
+        return time.time() - entry.fetched_at < self.ttls.get(entry.page_type, 0)
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Headers that let the server answer 304 Not Modified for an entry."""
+        headers = {}
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, url, page_type, body, etag=None, last_modified=None, extracted=None):
+        """Store a freshly fetched page (and optionally what was extracted from it)."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, page_type, body, content_hash, etag, last_modified, fetched_at, extracted) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url, page_type, zlib.compress(body.encode('utf-8')), self.content_hash(body),
+                    etag, last_modified, time.time(),
+                    json.dumps(extracted) if extracted is not None else None
+                )
+            )
+            self._db.commit()
+
+    def touch(self, url, etag=None, last_modified=None):
+        """Mark an entry as fetched now (after a 304 or an unchanged body)."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE pages SET fetched_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (time.time(), etag, last_modified, url)
+            )
+            self._db.commit()
+
+    def body(self, url):
+        """Return the stored body of a URL, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT body FROM pages WHERE url = ?", (url,)).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row and row[0] is not None else None
+
+    def entries(self, page_type=None):
+        """List (url, page_type, fetched_at, size) of the cached pages, newest first."""
+        sql = "SELECT url, page_type, fetched_at, LENGTH(body) FROM pages"
+        params = ()
+        if page_type:
+            sql += " WHERE page_type = ?"
+            params = (page_type,)
+        with self._lock:
+            return self._db.execute(sql + " ORDER BY fetched_at DESC", params).fetchall()
+
+    def prune(self, older_than=None):
+        """
+        Delete entries older than `older_than` seconds, or past their page type's TTL if not given.
+        Returns the number of entries deleted.
+        """
+        now = time.time()
+        with self._lock:
+            if older_than is not None:
+                cursor = self._db.execute("DELETE FROM pages WHERE fetched_at < ?", (now - older_than,))
+                deleted = cursor.rowcount
+            else:
+                deleted = 0
+                for page_type, ttl in self.ttls.items():
+                    cursor = self._db.execute(
+                        "DELETE FROM pages WHERE page_type = ? AND fetched_at < ?", (page_type, now - ttl)
+                    )
+                    deleted += cursor.rowcount
+            self._db.commit()
+            self._db.execute("VACUUM")
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM pages")
+            self._db.commit()
+            self._db.execute("VACUUM")
+
+    def reset_stats(self):
+        """Start a new run's hit and miss counts. The cached pages are kept."""
+        with self._lock:
+            self.hits = 0
+            self.revalidated = 0
+            self.unchanged = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT page_type, COUNT(*), COALESCE(SUM(LENGTH(body)), 0), MIN(fetched_at) FROM pages GROUP BY page_type"
+            ).fetchall()
+        return {
+            'entries': {page_type: {'count': count, 'bytes': size, 'oldest': oldest} for page_type, count, size, oldest in rows},
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'unchanged': self.unchanged,
+            'misses': self.misses
+        }
+
+    def summary(self):
+        """One-line human readable summary of this run's cache use."""
+        return (
+            f"Page cache: {self.hits} fresh hits, {self.revalidated} revalidated (304), "
+            f"{self.unchanged} unchanged bodies, {self.misses} fetched"
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main():
+    from scraping_config import PAGE_CACHE_PATH, PAGE_CACHE_TTL
+
+    parser = argparse.ArgumentParser(description="Inspect and prune the page cache.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help="Show entry counts and sizes per page type")
+    list_parser = subparsers.add_parser('list', help="List cached URLs, newest first")
+    list_parser.add_argument('--type', choices=sorted(PAGE_CACHE_TTL), help="Only this page type")
+    prune_parser = subparsers.add_parser('prune', help="Delete old entries (default: past their TTL)")
+    prune_parser.add_argument('--older-than', type=float, metavar='HOURS', help="Delete entries older than this")
+    subparsers.add_parser('clear', help="Delete every entry")
+    args = parser.parse_args()
+
+    cache = PageCache(PAGE_CACHE_PATH, PAGE_CACHE_TTL)
+    try:
+        if args.command == 'stats':
+            entries = cache.stats()['entries']
+            if not entries:
+                print("🗄️ Cache is empty")
+            for page_type, info in sorted(entries.items()):
+                age = (time.time() - info['oldest']) / 3600
+                print(f"🗄️ {page_type}: {info['count']} pages, {info['bytes'] / 1024:.0f} KB compressed, oldest {age:.1f}h ago")
+        elif args.command == 'list':
+            now = time.time()
+            for url, page_type, fetched_at, size in cache.entries(args.type):
+                state = 'fresh' if now - fetched_at < PAGE_CACHE_TTL.get(page_type, 0) else 'stale'
+                print(f"{page_type:8} {state:5} {(now - fetched_at) / 60:7.0f} min {size or 0:8} B  {url}")
+        elif args.command == 'prune':
+            older_than = args.older_than * 3600 if args.older_than is not None else None
+            print(f"🧹 Deleted {cache.prune(older_than)} entries")
+        elif args.command == 'clear':
+            cache.clear()
+            print("🧹 Cache cleared")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
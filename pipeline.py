@@ -0,0 +1,104 @@
+"""
+Streaming hand-off from the crawl to the database writer.
+"""
+
+import queue
+import threading
+import time
+
+_DONE = object()
+
+
+class BatchingPipeline:
+    """
+    Bounded queue between a producer (the crawl) and a consumer thread that handles the items
+    in micro-batches. A batch is flushed when it holds `batch_size` items or when its oldest item
+    has waited `flush_interval` seconds, so items reach the consumer within seconds.
+    put() blocks while the queue is full: a slow consumer slows the producer down instead of
+    letting memory grow. If the consumer fails, the next put() or close() raises its error.
+    """
+
+    def __init__(self, handle_batch, queue_size=1000, batch_size=100, flush_interval=2.0):
+        self.handle_batch = handle_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.items = 0
+        self.batches = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.peak_depth = 0
+        self._queue = queue.Queue(queue_size)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='pipeline-consumer', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _put(self, entry):
+        while True:
+            if self._error is not None:
+                raise RuntimeError(f"Pipeline consumer failed: {self._error}") from self._error
+            try:
+                self._queue.put(entry, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def put(self, items):
+        """Hand items to the consumer, waiting while the queue is full."""
+        for item in items:
+            self._put((time.monotonic(), item))
+            self.peak_depth = max(self.peak_depth, self._queue.qsize())
+
+    def close(self):
+        """Flush what is left and wait for the consumer to finish."""
+        if self._thread.is_alive():
+            self._put(_DONE)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        batch = []
+        deadline = None
+        done = False
+        while not done:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                entry = None
+
+            if entry is _DONE:
+                done = True
+            elif entry is not None:
+                batch.append(entry)
+                if deadline is None:
+                    deadline = entry[0] + self.flush_interval
+
+            if batch and (done or entry is None or len(batch) >= self.batch_size):
+                try:
+                    self._flush(batch)
+                except BaseException as e:
+                    self._error = e
+                    return
+                batch = []
+                deadline = None
+
+    def _flush(self, batch):
+        self.handle_batch([item for _, item in batch])
+        flushed = time.monotonic()
+        self.items += len(batch)
+        self.batches += 1
+        for queued, _ in batch:
+            self.total_latency += flushed - queued
+            self.max_latency = max(self.max_latency, flushed - queued)
+
+    def summary(self):
+        """One-line human readable summary of how the pipeline flowed."""
+        average = self.total_latency / self.items if self.items else 0.0
+        return (
+            f"Pipeline: {self.items} events in {self.batches} batches, "
+            f"queue-to-row latency {average:.1f}s avg ({self.max_latency:.1f}s max), peak queue {self.peak_depth}"
+        )
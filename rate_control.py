@@ -0,0 +1,149 @@
+"""
+Request pacing shared by every worker of a crawl.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+
+class RateBudget:
+    """
+    Global request budget for the site.
+    Hands out request slots at a fixed rate no matter how many workers ask for them,
+    so concurrency never changes how fast we hit the site.
+    Can be used from threads (wait) and from asyncio tasks (acquire).
+    """
+
+    def __init__(self, requests_per_minute, jitter=0.0):
+        self.requests_per_minute = requests_per_minute
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    @property
+    def interval(self):
+        """Seconds between two consecutive requests."""
+        return 60.0 / self.requests_per_minute
+
+    def _reserve(self):
+        """Reserve the next free slot and return how long the caller has to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            spacing = self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            self._next_slot = slot + spacing
+            return slot - now
+
+    def pause(self, seconds):
+        """Push every pending and future slot back, e.g. after the site starts rate limiting us."""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic()) + seconds
+
+    def wait(self):
+        """Block the calling thread until it may send its request. Returns the time waited."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire(self):
+        """Wait (without blocking the event loop) until the task may send its request."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+# Responses that mean the site wants us to slow down
+BACKOFF_STATUSES = (429, 403, 503)
+
+
+class AdaptiveRateController(RateBudget):
+    """
+    Request budget whose rate follows how the site responds (additive increase, multiplicative decrease).
+    Every clean response raises the rate by `increase_step` requests/minute, up to `max_rpm`.
+    A slow response or a server error holds it. A 429/403/503 or a challenge page cuts it by
+    `decrease_factor` (down to `min_rpm`) and pauses every worker for a backoff that doubles
+    with each block in a row, up to `backoff_max` seconds.
+    """
+
+    def __init__(self, requests_per_minute, min_rpm, max_rpm, increase_step=1.0, decrease_factor=0.5,
+                 slow_response=5.0, backoff_base=30.0, backoff_max=600.0, jitter=0.0):
+        super().__init__(requests_per_minute, jitter)
+        self.min_rpm = min_rpm
+        self.max_rpm = max_rpm
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.slow_response = slow_response
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clean = 0
+        self.held = 0
+        self.backoffs = 0
+        self.backoff_time = 0.0
+        self.lowest_rpm = requests_per_minute
+        self.highest_rpm = requests_per_minute
+        self._blocks_in_a_row = 0
+
+    def reset_stats(self):
+        """Start a new run's statistics. The rate itself carries over from the previous run."""
+        with self._lock:
+            self.clean = 0
+            self.held = 0
+            self.backoffs = 0
+            self.backoff_time = 0.0
+            self.lowest_rpm = self.highest_rpm = self.requests_per_minute
+
+    @property
+    def target_rpm(self):
+        """The rate the controller climbs toward while the site is healthy."""
+        return self.max_rpm
+
+    def record(self, status=None, latency=None, challenged=False):
+        """
+        Feed the outcome of one request back into the controller.
+        Returns the backoff pause in seconds, or 0 if the response wasn't a block.
+        """
+        backoff = 0
+        with self._lock:
+            if challenged or status in BACKOFF_STATUSES:
+                self._blocks_in_a_row += 1
+                self.backoffs += 1
+                self.requests_per_minute = max(self.min_rpm, self.requests_per_minute * self.decrease_factor)
+                backoff = min(self.backoff_max, self.backoff_base * 2 ** (self._blocks_in_a_row - 1))
+                backoff *= random.uniform(1, 1 + self.jitter)
+                self.backoff_time += backoff
+                self._next_slot = max(self._next_slot, time.monotonic()) + backoff
+            elif (status is not None and status >= 500) or (latency is not None and latency > self.slow_response):
+                self.held += 1
+            else:
+                self._blocks_in_a_row = 0
+                self.clean += 1
+                self.requests_per_minute = min(self.max_rpm, self.requests_per_minute + self.increase_step)
+            self.lowest_rpm = min(self.lowest_rpm, self.requests_per_minute)
+            self.highest_rpm = max(self.highest_rpm, self.requests_per_minute)
+        return backoff
+
+    def stats(self):
+        with self._lock:
+            return {
+                'current_rpm': round(self.requests_per_minute, 2),
+                'target_rpm': self.target_rpm,
+                'lowest_rpm': round(self.lowest_rpm, 2),
+                'highest_rpm': round(self.highest_rpm, 2),
+                'clean': self.clean,
+                'held': self.held,
+                'backoffs': self.backoffs,
+                'backoff_time': round(self.backoff_time, 1)
+            }
+
+    def summary(self):
+        """One-line human readable summary of how the rate moved during the run."""
+        stats = self.stats()
+        return (
+            f"Pacing: {stats['current_rpm']:.1f} req/min now, target {stats['target_rpm']:.0f} "
+            f"(range {stats['lowest_rpm']:.1f}-{stats['highest_rpm']:.1f}), {stats['clean']} clean, "
+            f"{stats['held']} slow, {stats['backoffs']} backoffs ({stats['backoff_time']:.0f}s paused)"
+        )
@@ -0,0 +1,80 @@
+"""
+Request routing policy for browser contexts.
+Aborts heavy resources (images, media, fonts, stylesheets) and third-party trackers
+so pages only download what the scraper actually reads.
+"""
+
+from urllib.parse import urlparse
+
+
+class ResourcePolicy:
+    """
+    Routing handler for a Playwright browser context, with counters of what it blocked.
+    Blocked bytes are estimated from the resource type, since aborted requests are never downloaded.
+    """
+
+    def __init__(self, blocked_types, blocked_domains, bytes_estimate=None):
+        self.blocked_types = set(blocked_types)
+        self.blocked_domains = tuple(blocked_domains)
+        self.bytes_estimate = bytes_estimate or {}
+        self.allowed_requests = 0
+        self.blocked_requests = 0
+        self.blocked_bytes = 0
+        self.blocked_by_type = {}
+
+    def should_block(self, request):
+        """Check if a request matches the policy."""
+        if request.resource_type in self.blocked_types:
+            return True
+        host = urlparse(request.url).hostname or ''
+        return any(host == domain or host.endswith('.' + domain) for domain in self.blocked_domains)
+
+    def _check(self, request):
+        """Decide on a request and update the counters."""
+        if not self.should_block(request):
+            self.allowed_requests += 1
+            return False
+
+        resource_type = request.resource_type
+        self.blocked_requests += 1
+        self.blocked_bytes += self.bytes_estimate.get(resource_type, 0)
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        return True
+
+    def handle(self, route):
+        """Route handler for the sync API."""
+        if self._check(route.request):
+            route.abort()
+        else:
+            route.continue_()
+
+    async def async_handle(self, route):
+        """Route handler for the async API."""
+        if self._check(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def attach(self, context):
+        """Route every request of a sync browser context through the policy."""
+        context.route('**/*', self.handle)
+
+    async def async_attach(self, context):
+        """Route every request of an async browser context through the policy."""
+        await context.route('**/*', self.async_handle)
+
+    def stats(self):
+        return {
+            'allowed_requests': self.allowed_requests,
+            'blocked_requests': self.blocked_requests,
+            'blocked_bytes_estimate': self.blocked_bytes,
+            'blocked_by_type': dict(self.blocked_by_type)
+        }
+
+    def summary(self):
+        """One-line human readable summary of the counters."""
+        by_type = ', '.join(f"{name}: {count}" for name, count in sorted(self.blocked_by_type.items()))
+        return (
+            f"Blocked {self.blocked_requests} requests (~{self.blocked_bytes / 1024 / 1024:.1f} MB), "
+            f"allowed {self.allowed_requests}" + (f" [{by_type}]" if by_type else "")
+        )
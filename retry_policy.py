@@ -0,0 +1,130 @@
+"""
+Retry decisions shared by every navigation of a crawl: bounded backoff and a circuit breaker.
+"""
+
+import random
+import threading
+import time
+from collections import Counter, deque
+from urllib.parse import urlsplit
+
+
+class CircuitBreakerOpen(Exception):
+    """The site kept failing after every pause: the run is aborted instead of hanging on it."""
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed navigation is tried again and how long to wait first.
+
+    Each URL gets `max_retries` retries, and the whole run `run_budget` of them; the delay before
+    the n-th retry of a URL is `base_delay` * 2^(n-1), capped at `max_delay`, with jitter.
+
+    Every request outcome also feeds a circuit breaker per host. When `failure_rate` of the last
+    `window` requests to a host failed, the circuit opens: before() makes every worker wait
+    `cooldown` seconds, then requests go through again with a fresh window. After `max_trips`
+    trips in a run, before() raises CircuitBreakerOpen.
+    Safe to share between threads and asyncio tasks.
+    """
+
+    def __init__(self, max_retries=3, base_delay=30.0, max_delay=300.0, run_budget=100,
+                 window=20, failure_rate=0.5, cooldown=300.0, max_trips=3):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.run_budget = run_budget
+        self.window = window
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.max_trips = max_trips
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start a new run: fresh retry counts, budget and circuits."""
+        with self._lock:
+            self.retries = 0
+            self.gave_up = 0
+            self.trips = 0
+            self.retry_time = 0.0
+            self.circuit_time = 0.0
+            self.reasons = Counter()
+            self._attempts = Counter()
+            self._outcomes = {}
+            self._open_until = {}
+
+    @staticmethod
+    def _host(url):
+        return urlsplit(url).netloc.lower()
+
+    def record(self, url, ok):
+        """Feed the outcome of one request to the host's circuit breaker."""
+        host = self._host(url)
+        with self._lock:
+            outcomes = self._outcomes.setdefault(host, deque(maxlen=self.window))
+            outcomes.append(ok)
+            if ok or len(outcomes) < self.window:
+                return
+            if outcomes.count(False) / len(outcomes) >= self.failure_rate:
+                self.trips += 1
+                self._open_until[host] = time.monotonic() + self.cooldown
+                outcomes.clear()
+                print(
+                    f"🔌 Circuit breaker tripped for {host} ({self.failure_rate:.0%} of the last {self.window} "
+                    f"requests failed), pausing the crawl for {self.cooldown:.0f}s"
+                )
+
+    def before(self, url):
+        """
+        Seconds to wait before sending a request to the URL's host (0 unless its circuit is open).
+        Raises CircuitBreakerOpen once the breaker has tripped more than `max_trips` times.
+        """
+        host = self._host(url)
+        with self._lock:
+            if self.trips > self.max_trips:
+                raise CircuitBreakerOpen(
+                    f"Circuit breaker for {host} tripped {self.trips} times in this run, giving up"
+                )
+            wait = max(0.0, self._open_until.get(host, 0.0) - time.monotonic())
+            self.circuit_time += wait
+            return wait
+
+    def retry(self, url, reason):
+        """
+        Count a failed attempt at a URL. Returns the delay (seconds) before trying it again, or None
+        if the URL's retries or the run's budget are used up.
+        """
+        with self._lock:
+            self.reasons[reason] += 1
+            self._attempts[url] += 1
+            attempt = self._attempts[url]
+            if attempt > self.max_retries or self.retries >= self.run_budget:
+                self.gave_up += 1
+                return None
+            self.retries += 1
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+            delay = random.uniform(delay / 2, delay)
+            self.retry_time += delay
+            return delay
+
+    def stats(self):
+        with self._lock:
+            return {
+                'retries': self.retries,
+                'run_budget': self.run_budget,
+                'gave_up': self.gave_up,
+                'retry_time': round(self.retry_time, 1),
+                'circuit_trips': self.trips,
+                'circuit_time': round(self.circuit_time, 1),
+                'reasons': dict(self.reasons)
+            }
+
+    def summary(self):
+        """One-line human readable summary of the run's retries."""
+        stats = self.stats()
+        reasons = ', '.join(f"{reason} x{count}" for reason, count in self.reasons.most_common(5))
+        return (
+            f"Retries: {stats['retries']} of {stats['run_budget']} ({stats['retry_time']:.0f}s waited), "
+            f"{stats['gave_up']} pages given up, circuit breaker tripped {stats['circuit_trips']} times "
+            f"({stats['circuit_time']:.0f}s paused)" + (f" - {reasons}" if reasons else "")
+        )
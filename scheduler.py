@@ -0,0 +1,185 @@
+"""
+Service mode plumbing: run schedules (interval or cron), process memory and the health endpoint.
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class IntervalSchedule:
+    """Runs every `seconds`, counted from the start of the previous run."""
+
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError("Schedule interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, moment):
+        return moment + timedelta(seconds=self.seconds)
+
+    def __str__(self):
+        return f"every {self.seconds}s"
+
+
+class CronSchedule:
+    """
+    Standard 5-field cron expression (minute hour day-of-month month day-of-week), in local time.
+    Fields accept '*', numbers, ranges ('1-5'), lists ('0,30') and steps ('*/15', '8-20/2').
+    Day of week runs from 0 (Sunday) to 6, 7 is Sunday as well. As in cron, when both day fields
+    are restricted a day matches if either of them does.
+    """
+
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: '{expression}'")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.FIELD_RANGES)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse_field(field, low, high):
+        values = set()
+        for item in field.split(','):
+            step = 1
+            if '/' in item:
+                item, step = item.split('/', 1)
+                step = int(step)
+            if item == '*':
+                start, end = low, high
+            elif '-' in item:
+                start, end = (int(value) for value in item.split('-', 1))
+            else:
+                start = int(item)
+                end = high if step != 1 else start
+            if step < 1 or not low <= start <= end <= high:
+                raise ValueError(f"Invalid cron field '{field}' (allowed {low}-{high})")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays  # cron counts from Sunday
+        if self._any_day and self._any_weekday:
+            return True
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment):
+        """Return the first matching minute strictly after `moment`."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 4)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never matches: '{self.expression}'")
+
+    def __str__(self):
+        return f"cron '{self.expression}'"
+
+
+def parse_schedule(spec):
+    """
+    Build a schedule from a setting: an interval ('90', '30m', '6h', '1d'; plain numbers are
+    seconds) or a 5-field cron expression ('0 */6 * * *').
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*([smhd]?)\s*', str(spec))
+    if match:
+        return IntervalSchedule(int(match.group(1)) * INTERVAL_UNITS[match.group(2) or 's'])
+    return CronSchedule(spec)
+
+
+def process_tree_rss_mb(pid=None):
+    """
+    Resident memory (MB) of a process and all its descendants, e.g. this script plus the
+    Playwright driver and every Chromium process. Returns None where /proc isn't available.
+    """
+    pid = pid or os.getpid()
+    children = {}
+    rss = {}
+    try:
+        entries = [entry for entry in os.listdir('/proc') if entry.isdigit()]
+    except OSError:
+        return None
+    for entry in entries:
+        try:
+            with open(f'/proc/{entry}/status', encoding='utf-8') as status_file:
+                fields = dict(line.split(':', 1) for line in status_file if ':' in line)
+        except OSError:
+            continue  # Process ended while we were looking
+        children.setdefault(int(fields['PPid']), []).append(int(entry))
+        rss[int(entry)] = int(fields.get('VmRSS', '0 kB').split()[0])
+
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        total += rss.get(current, 0)
+        pending.extend(children.get(current, []))
+    return total / 1024
+
+
+class HealthServer:
+    """
+    Local HTTP endpoint for the service's status, served from a daemon thread.
+    GET /health (or /status) returns the JSON produced by `status()`; the response is 200
+    when its 'healthy' key is true and 503 otherwise.
+    """
+
+    def __init__(self, host, port, status):
+        self.status = status
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/health', '/status'):
+                    self.send_error(404)
+                    return
+                state = server.status()
+                body = json.dumps(state, default=str, indent=2).encode('utf-8')
+                self.send_response(200 if state.get('healthy') else 503)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Health probes would flood the crawl log
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='health-server', daemon=True)
+
+    @property
+    def address(self):
+        return self._httpd.server_address
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
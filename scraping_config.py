@@ -1,16 +1,16 @@
 # Scraping Configuration
 # Modify these settings to adjust scraping behavior
 
-# Timing settings
-MIN_DELAY = 3.0  # Minimum delay between requests (seconds)
-MAX_DELAY = 6.0  # Maximum delay between requests (seconds)
-LONG_BREAK_CHANCE = 0.1  # 10% chance of taking a longer break
-LONG_BREAK_MIN = 5.0  # Minimum long break duration
-LONG_BREAK_MAX = 15.0  # Maximum long break duration
+# Adaptive pacing
+MIN_REQUESTS_PER_MINUTE = 4  # Floor the request rate never drops below
+MAX_REQUESTS_PER_MINUTE = 40  # Ceiling the request rate climbs toward while responses are clean
+RATE_INCREASE_STEP = 1.0  # Requests/minute added after each clean response
+RATE_DECREASE_FACTOR = 0.5  # Rate multiplier on a 429/403/503 or a challenge page
+SLOW_RESPONSE_SECONDS = 5.0  # Slower responses hold the rate instead of raising it
 
 # Rate limiting settings
-RATE_LIMIT_WAIT_MIN = 60  # Minimum wait time when rate limited (seconds)
-RATE_LIMIT_WAIT_MAX = 180  # Maximum wait time when rate limited (seconds)
+BACKOFF_BASE = 30  # Pause after a 429/403/503 or challenge page (seconds), doubled for each one in a row
+BACKOFF_MAX = 600  # Longest backoff pause (seconds)
 
 # Human behavior simulation
 SCROLL_CHANCE = 0.3  # 30% chance of scrolling
@@ -20,17 +20,120 @@ SCROLL_MAX = 500  # Maximum scroll amount
 
 # Browser settings
 HEADLESS = True  # Set to False to see the browser in action
-DISABLE_IMAGES = True  # Disable images to speed up loading
+DISABLE_IMAGES = True  # Block image requests to speed up loading
 DISABLE_JAVASCRIPT = False  # Set to True if JS is not needed
 
 # Request settings
 TIMEOUT = 30000  # Page load timeout (milliseconds)
-WAIT_UNTIL = 'networkidle'  # Wait until network is idle
+WAIT_UNTIL = 'domcontentloaded'  # Readiness is decided by waiting for the content selectors below
+READY_SELECTOR_TIMEOUT = 10000  # Max wait for '#eventos' / '#sessoes' / '#eventList' (milliseconds)
 
 # Error handling
-ERROR_WAIT_MIN = 10  # Minimum wait time on errors (seconds)
-ERROR_WAIT_MAX = 20  # Maximum wait time on errors (seconds)
+MAX_RETRIES = 3  # Retries of a page that failed to load or was blocked, before it is given up
+RETRY_DELAY = 30  # Delay before the first retry of a page (seconds), doubled on each further retry (with jitter)
+RETRY_MAX_DELAY = 300  # Cap on the delay between retries (seconds)
+RUN_RETRY_BUDGET = 100  # Retries allowed in a whole run; once used up, failed pages are given up at once
+CIRCUIT_WINDOW = 20  # Last requests to the site the circuit breaker looks at
+CIRCUIT_FAILURE_RATE = 0.5  # Failed share of those requests (errors, 5xx, blocks) that opens the circuit
+CIRCUIT_COOLDOWN = 300  # Pause of every request while the circuit is open (seconds)
+CIRCUIT_MAX_TRIPS = 3  # The run is aborted when the circuit opens more often than this
 
-# Session management
-MAX_RETRIES = 3  # Maximum number of retries for failed requests
-RETRY_DELAY = 30  # Delay between retries (seconds)
+# Fetch settings
+FETCH_MODE = 'http'  # 'http' uses a plain HTTP client and falls back to the browser when needed, 'browser' always uses Playwright
+HTTP_POOL_SIZE = 10  # Keep-alive connections each HTTP session (one per browser profile) keeps open to the site
+HTTP_TIMEOUT = 15  # HTTP request timeout (seconds)
+
+# Crawl mode
+CRAWL_MODE = 'sync'  # 'sync' crawls one page at a time, 'async' crawls months and details pages concurrently
+ASYNC_PAGE_POOL_SIZE = 4  # Browser pages shared by the async workers
+REQUESTS_PER_MINUTE = 20  # Starting request rate for the site, shared by every worker (adapted during the run)
+RATE_JITTER = 0.3  # Random +/- fraction applied to each request interval
+CRAWL_CONCURRENCY = 4  # Pages (listing and details) fetched in parallel over HTTP, most valuable first (HTTP mode)
+
+# Structured data
+STRUCTURED_DATA_ENABLED = True  # Take a show's sessions from the listing's schema.org Event/subEvent data (JSON-LD or microdata) instead of opening its details page, when every session has a date and a venue
+
+# Crawl scope
+CRAWL_MONTHS = 4  # Months crawled, starting with the current one
+CATEGORIES = [253]  # Search categories crawled (253 is stand-up comedy)
+DISCOVERY_MODE = 'category'  # 'category' crawls every listing page of CATEGORIES, 'search' searches the site once per standup name in each of CATEGORIES, 'auto' picks the one expected to load fewer listing pages
+DISCOVERY_STATE_PATH = '.cache/discovery_state.json'  # Listing pages per category month / per search measured on previous runs (for 'auto'; None = don't remember)
+CATEGORY_PAGES_ESTIMATE = 3  # Listing pages per category month assumed until a run has measured it
+SEARCH_PAGES_ESTIMATE = 1  # Result pages per search assumed until a run has measured it
+SEARCH_PARAM = 'query'  # Query string parameter of the site's text search (/pesquisa/?query=...)
+RUN_DEADLINE_SECONDS = None  # Stop starting new pages after this long and save what was scraped (None = no deadline); keep it below any external timeout, leaving time to finish the pages in flight and flush the pipeline
+
+# Resource blocking
+BLOCK_RESOURCES = True  # Abort heavy resources and trackers in the browser
+BLOCKED_RESOURCE_TYPES = ['media', 'font', 'stylesheet']  # 'image' is added when DISABLE_IMAGES is True
+BLOCKED_DOMAINS = [  # Third-party trackers / ads (subdomains included)
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'facebook.net',
+    'facebook.com',
+    'hotjar.com',
+    'scorecardresearch.com',
+    'criteo.com',
+    'taboola.com',
+    'outbrain.com'
+]
+BLOCKED_BYTES_ESTIMATE = {  # Average size per blocked request, used for the blocked bytes counter
+    'image': 40000,
+    'media': 500000,
+    'font': 35000,
+    'stylesheet': 25000,
+    'script': 60000
+}
+
+# Database writes
+DB_BATCH_SIZE = 500  # Rows per multi-row INSERT statement
+DB_POOL_MIN = 1  # Connections opened up front
+DB_POOL_MAX = 4  # Max connections checked out at the same time
+PIPELINE_BATCH_SIZE = 50  # Events saved (and committed) together while the crawl runs
+PIPELINE_FLUSH_SECONDS = 2.0  # Max time an event waits for its batch to fill up
+PIPELINE_QUEUE_SIZE = 1000  # Scraped events waiting to be saved before the crawl has to wait
+
+# Location matching
+LOCATION_FUZZY_THRESHOLD = 0.88  # Min similarity (0-1) for a venue to match an existing location with a different spelling
+
+# Page cache (HTTP fetch mode)
+PAGE_CACHE_ENABLED = True  # Keep fetched pages on disk and revalidate them instead of re-downloading
+PAGE_CACHE_PATH = '.cache/pages.sqlite3'  # Cache file (inspect / prune with: python page_cache.py)
+PAGE_CACHE_TTL = {  # Seconds a cached page is used without asking the site again
+    'listing': 30 * 60,  # /pesquisa/?category=253... search pages change often
+    'details': 12 * 60 * 60  # Event details pages rarely change
+}
+
+# Incremental crawling
+INCREMENTAL_MODE = True  # Don't open details pages whose sessions are all stored already
+DETAILS_STATE_PATH = '.cache/details_state.json'  # What each details page showed on previous runs
+
+# Service mode (python ticketline-ws.py --service)
+SERVICE_SCHEDULE = '0 */6 * * *'  # Cron expression, or an interval like '30m' / '6h'
+SERVICE_RUN_ON_START = True  # Crawl right away instead of waiting for the first scheduled time
+HEALTH_HOST = '127.0.0.1'  # Health/status endpoint address
+HEALTH_PORT = 8080
+BROWSER_RECYCLE_NAVIGATIONS = 200  # Navigations before the browser context is replaced
+BROWSER_RECYCLE_RSS_MB = 1500  # Memory of the script + browser processes before the browser is relaunched
+
+# Browser contexts
+BROWSER_CONTEXTS = 3  # Browser profiles used in turn by the browser contexts and HTTP sessions, each with its own fingerprint and cookies
+BROWSER_PROFILES_DIR = '.cache/browser_profiles'  # Fingerprint and saved cookies/storage of each context, kept between runs
+
+# Crawl journal
+JOURNAL_ENABLED = True  # Journal scraped pages so a failed run resumes where it stopped
+JOURNAL_PATH = '.cache/crawl_journal.jsonl'
+JOURNAL_MAX_AGE_HOURS = 12  # Older unfinished journals are discarded instead of resumed
+
+# Run report
+RUN_REPORT_PATH = '.cache/run_report.json'  # JSON report with the timings and counters of the last run
+PROMETHEUS_TEXTFILE_PATH = None  # Also write the metrics here in Prometheus text format (e.g. node_exporter's textfile directory)
+
+# Distributed crawl (python ticketline-ws.py --seed once, then --worker in as many containers as needed)
+WORK_QUEUE_TABLE = 'crawl_task'  # Task table, created in the scraper's database on first use
+TASK_LEASE_SECONDS = 900  # A claimed task goes back to the queue if its worker hasn't finished it by then (longer than BACKOFF_MAX)
+TASK_MAX_ATTEMPTS = 3  # Claims of a task before it is marked failed
+WORKER_POLL_SECONDS = 10  # Wait between claims while the remaining tasks are leased by other workers
@@ -0,0 +1,92 @@
+"""
+Matching of event titles against the standup names stored in the database.
+"""
+
+import unicodedata
+from collections import deque
+
+
+def normalize_text(text):
+    """Casefold, strip accents and collapse whitespace, so 'Humor  à Séria' matches 'humor a seria'."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(without_accents.casefold().split())
+
+
+class StandupMatcher:
+    """
+    Aho-Corasick automaton over the normalized standup names, built once per run.
+    A title is scanned once no matter how many standups there are. When several names
+    are contained in a title the longest one wins, and ties go to the standup listed first.
+    Results are memoized per title.
+    """
+
+    def __init__(self, standups):
+        self.standups = list(standups)
+        self.hits = 0
+        self.misses = 0
+        self._cache = {}
+        # Trie transitions, failure links and the best standup ending at each node
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [None]
+
+        for order, standup in enumerate(self.standups):
+            key = normalize_text(standup[1])
+            if key:
+                self._add(key, (-len(key), order, standup))
+        self._build_failure_links()
+
+    def _add(self, key, candidate):
+        node = 0
+        for char in key:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+            node = child
+        # Same normalized name twice: keep the standup listed first
+        if self._best[node] is None or candidate < self._best[node]:
+            self._best[node] = candidate
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                # A node's own name is longer than anything reachable through its failure link
+                if self._best[child] is None:
+                    self._best[child] = self._best[self._fail[child]]
+
+    def _scan(self, text):
+        best = None
+        node = 0
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            candidate = self._best[node]
+            if candidate is not None and (best is None or candidate < best):
+                best = candidate
+        return best[2] if best else None
+
+    def match(self, title):
+        """Return the (standup_id, standup_name) contained in the title, or None."""
+        if title in self._cache:
+            self.hits += 1
+            return self._cache[title]
+        self.misses += 1
+        result = self._scan(normalize_text(title))
+        self._cache[title] = result
+        return result
+
+    def __len__(self):
+        return len(self.standups)
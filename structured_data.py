@@ -0,0 +1,189 @@
+"""
+Extraction of schema.org Event data (JSON-LD and microdata) from Ticketline pages.
+"""
+
+import json
+import re
+
+from standup_matcher import normalize_text
+
+# Attribute holding the value of an itemprop, by tag (text content otherwise)
+MICRODATA_VALUE_ATTRIBUTES = {
+    'meta': 'content',
+    'a': 'href',
+    'link': 'href',
+    'area': 'href',
+    'img': 'src',
+    'source': 'src',
+    'time': 'datetime',
+    'data': 'value',
+    'meter': 'value'
+}
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _first(value):
+    values = _as_list(value)
+    return values[0] if values else None
+
+
+def _text(value):
+    """A property as plain text ('' if missing); objects give their name."""
+    value = _first(value)
+    if isinstance(value, dict):
+        value = _first(value.get('name'))
+    return str(value).strip() if value is not None else ''
+
+
+def item_types(item):
+    """The schema.org type names of an item, without the vocabulary URL ('Event', 'ComedyEvent')."""
+    return [str(item_type).rstrip('/').rsplit('/', 1)[-1] for item_type in _as_list(item.get('@type'))]
+
+
+def parse_json_ld(texts):
+    """
+    Parse the contents of JSON-LD script tags into a list of top-level items (nested ones, like the
+    entries of an ItemList or a @graph, are found by find_events). Blocks that aren't valid JSON are skipped.
+    """
+    items = []
+    for text in texts:
+        text = re.sub(r'^\s*(<!--|<!\[CDATA\[)|(-->|\]\]>)\s*$', '', text or '')
+        try:
+            value = json.loads(text)
+        except ValueError:
+            continue
+        items.extend(item for item in _as_list(value) if isinstance(item, dict))
+    return items
+
+
+def extract_json_ld(soup):
+    """The JSON-LD items of a parsed page."""
+    return parse_json_ld(script.string or script.get_text() for script in soup.select('script[type="application/ld+json"]'))
+
+
+def _microdata_properties(element):
+    """The itemprop elements that belong to an item (not to an item nested in it)."""
+    for child in element.find_all(True, recursive=False):
+        if child.has_attr('itemprop'):
+            yield child
+        if not child.has_attr('itemscope'):
+            yield from _microdata_properties(child)
+
+
+def _microdata_value(element):
+    if element.has_attr('itemscope'):
+        return _microdata_item(element)
+    if element.has_attr('content'):
+        return element['content']
+    attribute = MICRODATA_VALUE_ATTRIBUTES.get(element.name)
+    if attribute and element.has_attr(attribute):
+        return element[attribute]
+    return element.get_text(' ', strip=True)
+
+
+def _microdata_item(element):
+    item = {'@type': element.get('itemtype', '').split()}
+    for prop in _microdata_properties(element):
+        value = _microdata_value(prop)
+        for name in prop['itemprop'].split():
+            item.setdefault(name, []).append(value)
+    return {name: values[0] if len(values) == 1 and name != '@type' else values for name, values in item.items()}
+
+
+def extract_microdata(soup):
+    """The top-level microdata items of a parsed page, as JSON-LD shaped dicts."""
+    return [_microdata_item(element) for element in soup.select('[itemscope]:not([itemprop])')]
+
+
+def extract_items(soup):
+    """Every structured data item of a parsed page: JSON-LD first, then microdata."""
+    return extract_json_ld(soup) + extract_microdata(soup)
+
+
+def find_events(items):
+    """The Event items (any *Event type) among `items`, including the ones nested in other items."""
+    events = []
+    pending = list(items)
+    while pending:
+        item = pending.pop(0)
+        if any(item_type.endswith('Event') for item_type in item_types(item)):
+            events.append(item)
+        else:
+            pending.extend(value for values in item.values() for value in _as_list(values) if isinstance(value, dict))
+    return events
+
+
+def event_url(event):
+    """The page of an Event item: its url, or its @id when that is a URL."""
+    url = _text(event.get('url'))
+    if not url:
+        item_id = _text(event.get('@id'))
+        url = item_id if item_id.startswith(('http', '/')) else ''
+    return url
+
+
+def session_record(session, parent_name=''):
+    """
+    A session record like the ones read from a details page ({'date', 'name', 'venue', 'district', 'href'})
+    from an Event item. The show's name is left out of the session's name when it is repeated there.
+    """
+    location = _first(session.get('location'))
+    venue = district = ''
+    if isinstance(location, dict):
+        venue = _text(location.get('name'))
+        address = _first(location.get('address'))
+        if isinstance(address, dict):
+            district = _text(address.get('addressRegion')) or _text(address.get('addressLocality'))
+        elif address:
+            district = str(address).strip()
+    elif location:
+        venue = str(location).strip()
+
+    name = _text(session.get('name'))
+    if parent_name:
+        if normalize_text(name) in normalize_text(parent_name):
+            name = ''
+        elif name.lower().startswith(parent_name.lower()):
+            name = name[len(parent_name):].strip(' -–:|')
+    return {
+        'date': _text(session.get('startDate')),
+        'name': name,
+        'venue': venue,
+        'district': district,
+        'href': event_url(session)
+    }
+
+
+def event_sessions(event):
+    """Session records of an Event item's subEvents. Sessions without a page of their own link to the show's."""
+    parent_name = _text(event.get('name'))
+    sessions = [
+        session_record(session, parent_name)
+        for session in _as_list(event.get('subEvent')) + _as_list(event.get('subEvents'))
+        if isinstance(session, dict)
+    ]
+    for session in sessions:
+        session['href'] = session['href'] or event_url(event)
+    return sessions
+
+
+def page_sessions(items):
+    """
+    Session records of a details page: the subEvents of its events, or else every event with a
+    start date (pages that list each session as an Event of its own).
+    """
+    events = find_events(items)
+    sessions = [session for event in events for session in event_sessions(event)]
+    if sessions:
+        return sessions
+    return [session_record(event) for event in events if _text(event.get('startDate'))]
+
+
+def is_complete(sessions):
+    """Check if session records say everything the details page would: a date and a venue for each session."""
+    return bool(sessions) and all(session['date'] and session['venue'] for session in sessions)
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import psycopg2
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import FIXTURES_DIR, SCHEMA_NAME, load_scraper, throwaway_database
+
+
+@pytest.fixture(scope='session')
+def scraper():
+    """ticketline-ws.py imported as a module (see benchmark.load_scraper)."""
+    return load_scraper()
+
+
+@pytest.fixture
+def offline_scraper(scraper, monkeypatch):
+    """The scraper fetching over HTTP, with fresh run state and no page cache, journal or pacing delays."""
+    monkeypatch.setattr(scraper, 'FETCH_MODE', 'http')
+    monkeypatch.setattr(scraper, 'PAGE_CACHE_ENABLED', False)
+    monkeypatch.setattr(scraper, 'INCREMENTAL_MODE', False)
+    monkeypatch.setattr(scraper, 'BROWSER_PROFILES_DIR', None)
+    for name in ('_page_cache', '_crawl_journal', '_rate_budget', '_retry_policy', '_browser_profiles'):
+        monkeypatch.setattr(scraper, name, None)
+    monkeypatch.setattr(scraper, '_http_sessions', {})
+    monkeypatch.setattr(scraper, '_http_turn', 0)
+    monkeypatch.setattr(scraper, 'pace', lambda budget=None, url=None: None)
+    scraper.get_metrics().reset()
+    return scraper
+
+
+@pytest.fixture(scope='session')
+def database_server():
+    """Connection kwargs of a scratch database (see benchmark.throwaway_database); skips without one."""
+    with throwaway_database() as (db_config, description):
+        if db_config is None:
+            pytest.skip(description)
+        yield db_config
+
+
+@pytest.fixture
+def database(database_server):
+    """The scraper's tables (fixtures/schema.sql), empty, with standups 'Foo Show' (comedians 10, 11) and 'Bar Comedy' (12)."""
+    with open(os.path.join(FIXTURES_DIR, SCHEMA_NAME), encoding='utf-8') as schema_file:
+        schema = schema_file.read()
+    conn = psycopg2.connect(**database_server)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS comedian_event, standup_comedian, event, location, standup CASCADE")
+            cursor.execute(schema)
+            cursor.execute("INSERT INTO standup (name) VALUES ('Foo Show'), ('Bar Comedy')")
+            cursor.execute("INSERT INTO standup_comedian VALUES (1, 10), (1, 11), (2, 12)")
+        conn.commit()
+    finally:
+        conn.close()
+    return database_server
+
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+from block_detection import BlockDetector
+
+NEWSLETTER_PAGE = """<html><head><title>Ticketline</title>
+<script src="/cdn-cgi/challenge-platform/scripts/jsd/main.js"></script></head>
+<body><div id="eventos"><ul class="events_list"></ul></div>
+<form class="newsletter"><div class="g-recaptcha" data-sitekey="key"></div></form></body></html>"""
+
+
+class FakePage:
+    """A browser page whose responses are fed by hand, with or without a challenge interstitial."""
+
+    def __init__(self, interstitial=False):
+        self.interstitial = interstitial
+        self.handlers = []
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+    def receive(self, url, resource_type, status=200, headers=None, main_frame=True):
+        frame = SimpleNamespace(parent_frame=None if main_frame else object())
+        response = SimpleNamespace(
+            url=url, status=status, headers=headers or {}, frame=frame,
+            request=SimpleNamespace(resource_type=resource_type)
+        )
+        for handler in self.handlers:
+            handler(response)
+        return response
+
+    def query_selector(self, selector):
+        return object() if self.interstitial else None
+
+
+def test_embedded_captcha_is_not_a_block():
+    detector = BlockDetector()
+    page = FakePage()
+    detector.watch(page)
+    document = page.receive('https://ticketline.pt/pesquisa/?category=253', 'document')
+    page.receive('https://www.google.com/recaptcha/api2/anchor?k=key', 'document', main_frame=False)
+    page.receive('https://ticketline.pt/cdn-cgi/challenge-platform/scripts/jsd/main.js', 'script')
+
+    assert detector.check(page, document) is None
+    assert detector.take_challenge(page) is None
+
+
+def test_challenge_document_is_a_block():
+    detector = BlockDetector()
+    page = FakePage()
+    detector.watch(page)
+    document = page.receive('https://ticketline.pt/pesquisa/', 'document', status=403, headers={'cf-mitigated': 'challenge'})
+
+    assert detector.check(page, document) == 'HTTP 403'
+    assert detector.take_challenge(page) == 'HTTP 403'
+    assert detector.check(FakePage(interstitial=True)) == 'challenge element on page'
+
+
+def test_embedded_captcha_page_is_read_over_http(offline_scraper):
+    assert not offline_scraper.looks_like_challenge(NEWSLETTER_PAGE)
+    assert offline_scraper.looks_like_challenge('<html><head><title>Just a moment...</title></head></html>')
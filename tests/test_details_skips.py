@@ -0,0 +1,23 @@
+def multi_session_event(scraper, href):
+    return scraper.Event('Foo Show', '2026-11-20T21:30:00Z', 'Coliseu dos Recreios', True, scraper.absolute_url(href))
+
+
+def test_duplicate_details_links_are_counted(offline_scraper):
+    scraper = offline_scraper
+    registry = scraper.DetailsPageRegistry()
+
+    assert registry.claim(multi_session_event(scraper, '/evento/foo-show-81234'))
+    assert not registry.claim(multi_session_event(scraper, '/evento/foo-show-81234?utm_source=listing'))
+    assert scraper.get_metrics().total('details_skipped', reason='duplicate') == 1
+
+
+def test_incremental_skips_are_counted(offline_scraper, tmp_path):
+    scraper = offline_scraper
+    event = multi_session_event(scraper, '/evento/foo-show-81234')
+    session_date = scraper.parse_date_to_offset_datetime('2026-11-20T21:30:00')
+    tracker = scraper.DetailsTracker(str(tmp_path / 'details_state.json'), {(1, session_date)})
+    tracker.record(event, [(1, session_date)])
+
+    assert not scraper.details_visit_needed(event, tracker)
+    assert scraper.details_visit_needed(event, None)
+    assert scraper.get_metrics().total('details_skipped', reason='incremental') == 1
@@ -0,0 +1,23 @@
+from urllib.parse import parse_qs, urlsplit
+
+
+def test_search_tasks_stay_within_the_crawled_categories(offline_scraper, monkeypatch, tmp_path):
+    scraper = offline_scraper
+    monkeypatch.setattr(scraper, 'DISCOVERY_MODE', 'search')
+    monkeypatch.setattr(scraper, 'CATEGORIES', [253, 300])
+    planner = scraper.DiscoveryPlanner(None)
+
+    mode, tasks = scraper.discovery_tasks([(1, 'Foo Show'), (2, 'Bar Comedy')], planner)
+
+    assert mode == 'search'
+    assert sorted((task[2]['query'], task[2]['category']) for task in tasks) == [
+        ('Bar Comedy', 253), ('Bar Comedy', 300), ('Foo Show', 253), ('Foo Show', 300)
+    ]
+    for _, url, payload in tasks:
+        assert parse_qs(urlsplit(url).query)['category'] == [str(payload['category'])]
+    next_page = scraper.listing_page_task(tasks[0][2], 2)
+    assert parse_qs(urlsplit(next_page[1]).query)['category'] == [str(tasks[0][2]['category'])]
+
+
+def test_category_crawl_is_the_default(scraper):
+    assert scraper.DISCOVERY_MODE == 'category'
@@ -0,0 +1,96 @@
+import psycopg2
+
+
+def query(db_config, sql):
+    conn = psycopg2.connect(**db_config)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def write_events(scraper, db_config, *batches):
+    """Write each batch with one EventWriter, as the pipeline does. Returns the writer."""
+    db_pool = scraper.DatabasePool(1, 2, **db_config)
+    try:
+        with scraper.UnitOfWork(db_pool) as uow:
+            writer = scraper.EventWriter(scraper.StandupMatcher(scraper.get_standups_from_db(uow)), uow)
+            for batch in batches:
+                writer.write(batch)
+        return writer
+    finally:
+        db_pool.close()
+
+
+def event(scraper, title, date, location='Coliseu dos Recreios'):
+    return scraper.Event(title, date, location, False, f"https://ticketline.pt/evento/{abs(hash((title, date)))}")
+
+
+def test_dates_without_offset_are_saved_and_linked(offline_scraper, database):
+    scraper = offline_scraper
+    writer = write_events(scraper, database, [
+        event(scraper, 'Foo Show', '2026-11-20T21:30:00'),
+        event(scraper, 'Foo Show', '2026-11-22'),
+        event(scraper, 'Bar Comedy', '2026-11-21T21:30:00Z')
+    ])
+
+    assert writer.saved_count == 3
+    assert scraper.get_metrics().total('events', outcome='saved') == 3
+    assert query(database, "SELECT event_id, comedian_id FROM comedian_event ORDER BY 1, 2") == [
+        (1, 10), (1, 11), (2, 10), (2, 11), (3, 12)
+    ]
+
+
+def test_known_keys_match_dates_without_offset(offline_scraper, database):
+    scraper = offline_scraper
+    write_events(scraper, database, [event(scraper, 'Foo Show', '2099-11-20T21:30:00')])
+
+    db_pool = scraper.DatabasePool(1, 2, **database)
+    try:
+        with scraper.UnitOfWork(db_pool) as uow:
+            known_keys = scraper.get_known_event_keys(uow)
+    finally:
+        db_pool.close()
+    assert (1, scraper.parse_date_to_offset_datetime('2099-11-20T21:30:00')) in known_keys
+
+
+def test_rolled_back_batch_leaves_locations_and_totals_alone(offline_scraper, database, monkeypatch):
+    scraper = offline_scraper
+    link_comedians = scraper.link_comedians_to_events
+    calls = []
+
+    def fail_first_batch(cursor, event_ids):
+        calls.append(event_ids)
+        if len(calls) == 1:
+            raise psycopg2.OperationalError("connection reset")
+        return link_comedians(cursor, event_ids)
+
+    monkeypatch.setattr(scraper, 'link_comedians_to_events', fail_first_batch)
+    writer = write_events(
+        scraper, database,
+        [event(scraper, 'Foo Show', '2026-11-20T21:30:00Z', 'Teatro Novo - Porto')],
+        [event(scraper, 'Bar Comedy', '2026-11-21T21:30:00Z', 'Teatro Novo - Porto')]
+    )
+
+    assert writer.saved_count == 1
+    assert scraper.get_metrics().total('events', outcome='saved') == 1
+    assert scraper.get_metrics().total('events', outcome='rolled_back') == 1
+    assert query(database, "SELECT e.name, l.name FROM event e JOIN location l ON l.id = e.location") == [
+        ('Bar Comedy', 'Teatro Novo')
+    ]
+
+
+def test_match_counters(offline_scraper, database):
+    scraper = offline_scraper
+    write_events(scraper, database, [
+        event(scraper, 'Foo Show', '2026-11-20T21:30:00Z'),
+        event(scraper, 'Bar Comedy', '2026-11-21T21:30:00Z', 'Teatro Novo - Porto'),
+        event(scraper, 'Nobody Knows', '2026-11-22T21:30:00Z')
+    ])
+
+    metrics = scraper.get_metrics()
+    assert metrics.total('matches', kind='standup', outcome='hit') == 2
+    assert metrics.total('matches', kind='standup', outcome='miss') == 1
+    assert metrics.total('matches', kind='location', outcome='created') == 2
@@ -0,0 +1,39 @@
+import pytest
+
+from benchmark import FIXTURES_DIR, crawl_by_page, load_manifest
+
+# Settings configure_scraper changes for the crawl, restored after each test
+CRAWL_SETTINGS = (
+    'BASE_URL', 'JOURNAL_ENABLED', 'DISCOVERY_MODE', 'DISCOVERY_STATE_PATH', 'RATE_JITTER',
+    'REQUESTS_PER_MINUTE', 'MAX_REQUESTS_PER_MINUTE', 'CATEGORIES', 'get_crawl_months', 'CRAWL_CONCURRENCY'
+)
+
+
+@pytest.fixture(scope='module')
+def manifest():
+    return load_manifest(FIXTURES_DIR)
+
+
+@pytest.fixture
+def fixture_crawl(offline_scraper, manifest, monkeypatch):
+    """Crawl the recorded pages over HTTP. Returns the events of each page and the pages that weren't recorded."""
+    for name in CRAWL_SETTINGS:
+        monkeypatch.setattr(offline_scraper, name, getattr(offline_scraper, name))
+    return crawl_by_page(offline_scraper, FIXTURES_DIR, manifest)
+
+
+def test_every_page_the_crawl_needs_is_recorded(fixture_crawl):
+    _, misses = fixture_crawl
+    assert misses == []
+
+
+@pytest.mark.parametrize('file_name', sorted(load_manifest(FIXTURES_DIR)['events']))
+def test_page_yields_the_expected_events(fixture_crawl, manifest, file_name):
+    found, _ = fixture_crawl
+    assert found[file_name] == manifest['events'][file_name]
+
+
+def test_crawl_yields_no_unexpected_events(fixture_crawl, manifest):
+    found, _ = fixture_crawl
+    assert set(found) == set(manifest['events'])
+    assert sum(len(events) for events in found.values()) == 63
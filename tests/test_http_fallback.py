@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+CHALLENGE_PAGE = '<html><head><title>Just a moment...</title></head><body><form id="challenge-form"></form></body></html>'
+
+
+def http_response(html, status=200):
+    return SimpleNamespace(status_code=status, text=html, headers={})
+
+
+def test_challenge_page_falls_back_to_browser(offline_scraper, monkeypatch):
+    scraper = offline_scraper
+    url = f"{scraper.BASE_URL}/pesquisa?categoria=253&page=1"
+    requests = []
+    monkeypatch.setattr(scraper, 'pace', lambda budget=None, url=None: requests.append(('pace', url)))
+    monkeypatch.setattr(scraper.requests.Session, 'get', lambda self, url, headers=None, timeout=None: requests.append(('http', url)) or http_response(CHALLENGE_PAGE))
+    monkeypatch.setattr(scraper, 'open_in_browser', lambda page, url, *args, **kwargs: requests.append(('browser', url)) or True)
+    monkeypatch.setattr(scraper, 'extract_listing_records', lambda page: [])
+    monkeypatch.setattr(scraper, 'extract_page_count', lambda page, count: 1)
+
+    listing = scraper.load_listing_page(object(), url)
+
+    # The browser waits for its own slot, after the backoff the challenge imposed
+    assert requests == [('pace', url), ('http', url), ('pace', url), ('browser', url)]
+    assert listing == {'records': [], 'page_count': 1}
+    assert scraper.get_metrics().total('pages', source='browser') == 1
+
+
+def test_details_page_is_fetched_at_its_canonical_url(offline_scraper, monkeypatch):
+    scraper = offline_scraper
+    fetched = []
+    monkeypatch.setattr(scraper, 'fetch_session_records', lambda url: fetched.append(url) or [])
+    for href in ('/evento/foo-show-81234?utm_source=newsletter&utm_medium=email', '/evento/foo-show-81234/'):
+        event = scraper.Event('Foo Show', '2026-11-20T21:30:00Z', 'Coliseu dos Recreios', True, scraper.absolute_url(href))
+        scraper.scrape_additional_sessions(None, event, try_browser=False)
+
+    assert fetched == [f"{scraper.BASE_URL}/evento/foo-show-81234"] * 2
+
+
+def test_challenge_page_is_reported_once(offline_scraper, monkeypatch):
+    scraper = offline_scraper
+    reports = []
+    monkeypatch.setattr(scraper.requests.Session, 'get', lambda self, url, headers=None, timeout=None: http_response(CHALLENGE_PAGE))
+    monkeypatch.setattr(scraper, 'report_response', lambda *args, **kwargs: reports.append((args, kwargs)))
+
+    assert scraper.fetch_listing_page(f"{scraper.BASE_URL}/pesquisa/?category=253&page=1") is None
+
+    assert len(reports) == 1
+    (status, _, challenged), _ = reports[0]
+    assert (status, challenged) == (200, True)
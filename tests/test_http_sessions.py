@@ -0,0 +1,64 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+@pytest.fixture
+def site():
+    """A local site recording each request's User-Agent and Cookie; /challenge answers with a Cloudflare challenge."""
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            seen.append((self.path, self.headers.get('User-Agent'), self.headers.get('Cookie')))
+            self.send_response(200)
+            if self.path == '/challenge':
+                self.send_header('cf-mitigated', 'challenge')
+            self.send_header('Set-Cookie', 'consent=yes; Path=/')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", seen
+    server.shutdown()
+
+
+def test_http_sessions_take_turns_with_their_profiles_cookies(offline_scraper, site):
+    scraper = offline_scraper
+    base_url, seen = site
+    profiles = scraper.get_browser_profiles()
+    first = profiles.profiles[0]
+    profiles.save_storage(first, {'cookies': [{'name': 'session', 'value': 'abc', 'domain': '127.0.0.1', 'path': '/'}], 'origins': []})
+
+    for _ in profiles.profiles:
+        assert scraper.http_get(f"{base_url}/page") is not None
+
+    assert [user_agent for _, user_agent, _ in seen] == [profile['user_agent'] for profile in profiles.profiles]
+    assert seen[0][2] == 'session=abc'
+    assert seen[1][2] is None
+
+    scraper.save_http_sessions()
+    assert sorted(cookie['name'] for cookie in profiles.load_storage(first)['cookies']) == ['consent', 'session']
+
+
+def test_challenged_http_session_retires_its_profile(offline_scraper, site):
+    scraper = offline_scraper
+    base_url, seen = site
+    profiles = scraper.get_browser_profiles()
+    challenged = profiles.profiles[0]
+
+    assert scraper.http_get(f"{base_url}/challenge") is None
+
+    assert not profiles.is_active(challenged)
+    assert profiles.stats()['retired'] == 1
+    replacement = profiles.profiles[0]
+    for _ in profiles.profiles:
+        scraper.http_get(f"{base_url}/page")
+    # The replacement takes the retired profile's turn, with a fresh session
+    assert seen[-1][1:] == (replacement['user_agent'], None)
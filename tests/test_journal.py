@@ -0,0 +1,47 @@
+from journal import CrawlJournal
+
+
+def test_resumed_journal_reads_pages_back_from_the_file(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = CrawlJournal(path)
+    journal.record('listing', 'page-1', {'records': [{'title': 'Sem Filtro'}], 'page_count': 2})
+    journal.record('details', 'event-1', [{'title': 'Sem Filtro - Porto'}])
+    assert journal.get('listing', 'page-1') == {'records': [{'title': 'Sem Filtro'}], 'page_count': 2}
+    journal.close()
+
+    resumed = CrawlJournal(path)
+    assert resumed.resumed
+    assert resumed.get('details', 'event-1') == [{'title': 'Sem Filtro - Porto'}]
+    assert resumed.get('listing', 'page-2') is None
+    resumed.record('listing', 'page-2', {'records': [], 'page_count': 2})
+    assert resumed.get('listing', 'page-2') == {'records': [], 'page_count': 2}
+    assert resumed.reused == 2
+    resumed.close()
+
+
+def test_line_cut_short_by_a_crash_is_dropped(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = CrawlJournal(path)
+    journal.record('listing', 'page-1', {'records': []})
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as journal_file:
+        journal_file.write('{"kind": "listing", "key": "page-2", "da')
+
+    resumed = CrawlJournal(path)
+    assert resumed.get('listing', 'page-2') is None
+    resumed.record('listing', 'page-2', {'records': ['Ego Trip']})
+    resumed.close()
+
+    again = CrawlJournal(path)
+    assert again.get('listing', 'page-1') == {'records': []}
+    assert again.get('listing', 'page-2') == {'records': ['Ego Trip']}
+    again.close()
+
+
+def test_completed_journal_is_removed(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = CrawlJournal(str(path))
+    journal.record('listing', 'page-1', {'records': []})
+    journal.complete()
+    assert not path.exists()
+    assert not CrawlJournal(str(path)).resumed
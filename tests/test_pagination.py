@@ -0,0 +1,28 @@
+def listing_record(number):
+    return {'classes': '', 'title': f"Show {number}", 'date': '2026-11-20T21:30:00Z', 'venues': 'Coliseu dos Recreios', 'href': f"/evento/show-{number}"}
+
+
+def plan(scraper, page_number, records, page_count=None, **hints):
+    payload = {'category': 253, 'month': 11, 'year': 2026, 'page': page_number, **hints}
+    matcher = scraper.StandupMatcher([])
+    return scraper.plan_listing(payload, {'records': records, 'page_count': page_count}, matcher)[2]
+
+
+def test_empty_page_ends_the_listing(offline_scraper):
+    scraper = offline_scraper
+    assert scraper.is_empty_listing([])
+    assert plan(scraper, 3, []) == []
+    assert plan(scraper, 3, [], per_page=0) == []
+
+
+def test_full_page_without_paginator_leads_to_the_next(offline_scraper):
+    scraper = offline_scraper
+    next_pages = plan(scraper, 1, [listing_record(n) for n in range(3)])
+    assert [task[2]['page'] for task in next_pages] == [2]
+    assert plan(scraper, 2, [listing_record(0)], page_count=2, per_page=3) == []
+
+
+def test_paginator_schedules_every_page_from_the_first(offline_scraper):
+    scraper = offline_scraper
+    next_pages = plan(scraper, 1, [listing_record(n) for n in range(3)], page_count=3)
+    assert [task[2]['page'] for task in next_pages] == [2, 3]
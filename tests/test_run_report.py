@@ -0,0 +1,44 @@
+import json
+
+
+class FakeSession:
+    """A browser session whose crawl makes one clean request and sees one block, and finds no events."""
+
+    policy = None
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+
+    def crawl(self, matcher, emit, tracker=None):
+        self.scraper.get_rate_budget().record(status=200, latency=0.1)
+        self.scraper.get_block_detector().reasons['status_429'] += 1
+        return True
+
+    def stats(self):
+        return {'mode': 'fake'}
+
+
+def run_twice(scraper, db_config, report_path):
+    """Run two crawls on the same pool. Returns the report of the second one."""
+    db_pool = scraper.DatabasePool(1, 2, **db_config)
+    try:
+        for _ in range(2):
+            scraper.run_crawl(db_pool, FakeSession(scraper))
+    finally:
+        db_pool.close()
+    with open(report_path, encoding='utf-8') as report_file:
+        return json.load(report_file)
+
+
+def test_report_covers_only_its_own_run(offline_scraper, database, tmp_path, monkeypatch):
+    scraper = offline_scraper
+    report_path = tmp_path / 'run_report.json'
+    monkeypatch.setattr(scraper, 'RUN_REPORT_PATH', str(report_path))
+    monkeypatch.setattr(scraper, 'JOURNAL_ENABLED', False)
+    monkeypatch.setattr(scraper, '_block_detector', None)
+
+    report = run_twice(scraper, database, report_path)
+    assert report['pacing']['clean'] == 1
+    assert report['blocks'] == {'status_429': 1}
+    assert report['db_pool']['connects'] == 0  # The first run's connection is reused
+    assert report['db_pool']['checkouts'] == 1
@@ -0,0 +1,58 @@
+import json
+
+from bs4 import BeautifulSoup
+
+SESSIONS = [
+    {'@type': 'ComedyEvent', 'name': 'Foo Show', 'startDate': '2026-11-20T21:30:00Z',
+     'location': {'@type': 'Place', 'name': 'Coliseu dos Recreios', 'address': {'addressRegion': 'Lisboa'}}},
+    {'@type': 'ComedyEvent', 'name': 'Foo Show', 'startDate': '2026-11-21T21:30:00Z',
+     'location': {'@type': 'Place', 'name': 'Coliseu do Porto', 'address': {'addressRegion': 'Porto'}}}
+]
+
+JSON_LD_DETAILS_PAGE = f"""<html><head>
+<script type="application/ld+json">{json.dumps({'@type': 'Event', 'name': 'Foo Show', 'url': '/evento/foo-show-81234', 'subEvent': SESSIONS})}</script>
+</head><body><h1>Foo Show</h1></body></html>"""
+
+MICRODATA_DETAILS_PAGE = """<html><body>
+<div itemscope itemtype="https://schema.org/ComedyEvent">
+  <span itemprop="name">Foo Show</span><meta itemprop="startDate" content="2026-11-20T21:30:00Z">
+  <div itemprop="location" itemscope itemtype="https://schema.org/Place"><span itemprop="name">Coliseu dos Recreios</span></div>
+</div>
+</body></html>"""
+
+
+class FakePage:
+    """A browser page running the extraction scripts over a static document, the way the browser would."""
+
+    def __init__(self, html):
+        self.soup = BeautifulSoup(html, 'html.parser')
+
+    def evaluate(self, script):
+        if 'jsonLd' in script:
+            return {
+                'jsonLd': [tag.string or '' for tag in self.soup.select('script[type="application/ld+json"]')],
+                'microdata': [str(tag) for tag in self.soup.select('[itemscope]:not([itemprop])')]
+            }
+        return []  # Neither sessions list is on the page
+
+
+def test_details_page_with_only_json_ld_is_read_over_http(offline_scraper, monkeypatch):
+    scraper = offline_scraper
+    monkeypatch.setattr(scraper, 'http_get', lambda url, headers=None: type('Response', (), {
+        'status_code': 200, 'text': JSON_LD_DETAILS_PAGE, 'headers': {}
+    })())
+
+    records = scraper.fetch_session_records(f"{scraper.BASE_URL}/evento/foo-show-81234")
+
+    assert [(record['date'], record['venue']) for record in records] == [
+        ('2026-11-20T21:30:00Z', 'Coliseu dos Recreios'), ('2026-11-21T21:30:00Z', 'Coliseu do Porto')
+    ]
+
+
+def test_browser_and_http_give_the_same_structured_sessions(offline_scraper):
+    scraper = offline_scraper
+    for html in (JSON_LD_DETAILS_PAGE, MICRODATA_DETAILS_PAGE):
+        soup = BeautifulSoup(html, 'html.parser')
+        assert soup.select_one(scraper.details_ready_selector()) is not None
+        assert scraper.extract_session_records(FakePage(html)) == scraper.parse_session_records(soup)
+        assert scraper.structured_items(FakePage(html).evaluate(scraper.STRUCTURED_DATA_EXTRACT_JS)) == scraper.extract_items(soup)
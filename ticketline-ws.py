@@ -1,15 +1,45 @@
-from playwright.sync_api import sync_playwright, TimeoutError
-from dataclasses import dataclass
+from playwright.sync_api import sync_playwright, Error, TimeoutError
+from playwright.async_api import async_playwright
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+import asyncio
+import math
+import threading
 import time
 import random
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 import re
+import signal
+import socket
 from datetime import datetime, timezone
 import os
 import sys
 from dotenv import load_dotenv
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from scraping_config import *
+from rate_control import AdaptiveRateController
+from retry_policy import CircuitBreakerOpen, RetryPolicy
+from resource_policy import ResourcePolicy
+from block_detection import BlockDetector, challenge_header_reason
+from browser_profiles import BrowserProfiles, describe
+from scheduler import HealthServer, parse_schedule, process_tree_rss_mb
+from db_pool import DatabasePool, UnitOfWork
+from standup_matcher import StandupMatcher
+from location_index import LocationIndex, split_location
+from page_cache import PageCache
+from incremental import DetailsTracker
+from journal import CrawlJournal
+from structured_data import event_sessions, event_url, extract_items, extract_microdata, find_events, is_complete, page_sessions, parse_json_ld
+from pipeline import BatchingPipeline
+from work_queue import WorkQueue
+from discovery import DiscoveryPlanner, search_queries
+from crawl_scheduler import CrawlScheduler
+from metrics import Metrics
 
 # Load environment variables from .env file (for local development)
 # Try .env.local first (for local dev), then .env (for production-like local setup)
@@ -53,6 +83,73 @@ VIEWPORTS = [
     {'width': 1280, 'height': 720}
 ]
 
+# Launch arguments for Chromium
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--disable-extensions',
+    '--disable-plugins',
+    '--disable-gpu',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--disable-features=TranslateUI',
+    '--disable-ipc-flooding-protection'
+]
+
+# Headers sent by every browser context
+BROWSER_HEADERS = {
+    'Accept-Language': 'pt-PT,pt;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Injected in every page to hide automation traces
+STEALTH_INIT_SCRIPT = """
+    // Override webdriver property
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined,
+    });
+    
+    // Add some random mouse movements
+    const originalMouseEvent = window.MouseEvent;
+    window.MouseEvent = function(type, init) {
+        if (init) {
+            init.clientX += Math.random() * 2 - 1;
+            init.clientY += Math.random() * 2 - 1;
+        }
+        return new originalMouseEvent(type, init);
+    };
+"""
+
+# Selectors that tell a page has rendered the content we scrape
+LISTING_READY_SELECTOR = '#eventos'
+DETAILS_READY_SELECTOR = '#sessoes, #eventList.available_events'
+# Structured data that can stand in for a details page's sessions list (see details_ready_selector)
+STRUCTURED_DATA_SELECTOR = 'script[type="application/ld+json"], [itemscope][itemtype*="Event"]'
+
+# Where a listing page tells how many result pages there are
+PAGINATION_LINK_SELECTOR = '.pagination a[href*="page="], .paginator a[href*="page="], .pager a[href*="page="], nav.pages a[href*="page="]'
+RESULT_COUNTER_SELECTOR = '.results_count, .total_results, .search_results_count, #eventos .count'
+RESULT_COUNT_PATTERN = re.compile(r'(\d[\d.\s]*)\s*(?:resultados|eventos|results)', re.IGNORECASE)
+PAGE_PARAM_PATTERN = re.compile(r'[?&]page=(\d+)')
+
+# Markers that only show up on bot-protection / challenge pages. Captcha widgets and the
+# challenge-platform script are left out: normal pages carry them too
+CHALLENGE_MARKERS = [
+    'cf-browser-verification',
+    'cf_chl_opt',
+    'id="challenge-form"',
+    '<title>just a moment',
+    '<title>attention required'
+]
+
 @dataclass
 class Event:
     title: str
@@ -60,6 +157,7 @@ class Event:
     location: str
     has_multi_sessions: bool
     detailsPageUrl: str
+    sessions: list = field(default=None, repr=False, compare=False)  # Session records from the listing's structured data
 
     def __repr__(self):
         return (
@@ -74,12 +172,16 @@ def parse_date_to_offset_datetime(date_str):
     """
     Parse the date string from the website and convert it to OffsetDateTime format.
     The date format from the website appears to be in ISO format or similar.
+    The result is always timezone-aware, so it compares equal to the timestamptz the database
+    gives back for it (and (standup_id, date) keys match the stored rows).
     """
     try:
         # Try to parse as ISO format first
         if 'T' in date_str:
-            # ISO format with time
+            # ISO format with time, assume UTC when it has no offset
             dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
         else:
             # Date only format, assume midnight UTC
             dt = datetime.strptime(date_str, '%Y-%m-%d')
@@ -91,94 +193,80 @@ def parse_date_to_offset_datetime(date_str):
         # Return current time as fallback
         return datetime.now(timezone.utc)
 
-def setup_anti_detection(page):
-    """Setup anti-detection measures for the browser page."""
-    # Set random user agent
-    user_agent = random.choice(USER_AGENTS)
-    page.set_extra_http_headers({'User-Agent': user_agent})
-    
-    # Set random viewport
-    viewport = random.choice(VIEWPORTS)
-    page.set_viewport_size(viewport)
-    
-    # Set language and timezone
-    page.set_extra_http_headers({
-        'Accept-Language': 'pt-PT,pt;q=0.9,en;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    })
-    
-    # Add some randomness to make behavior more human-like
-    page.add_init_script("""
-        // Override webdriver property
-        Object.defineProperty(navigator, 'webdriver', {
-            get: () => undefined,
-        });
-        
-        // Add some random mouse movements
-        const originalMouseEvent = window.MouseEvent;
-        window.MouseEvent = function(type, init) {
-            if (init) {
-                init.clientX += Math.random() * 2 - 1;
-                init.clientY += Math.random() * 2 - 1;
-            }
-            return new originalMouseEvent(type, init);
-        };
-    """)
-    
-    print(f"🕵️ Anti-detection setup: User-Agent: {user_agent[:50]}..., Viewport: {viewport['width']}x{viewport['height']}")
+def browser_context_options(profile, profiles):
+    """
+    new_context() options for a browser profile: its user agent and viewport (set on the context,
+    so every page and request shows the same ones), the site's locale and the profile's saved
+    cookies and storage.
+    """
+    return {
+        'viewport': profile['viewport'],
+        'user_agent': profile['user_agent'],
+        'locale': 'pt-PT',
+        'timezone_id': 'Europe/Lisbon',
+        'permissions': ['geolocation'],
+        'extra_http_headers': BROWSER_HEADERS,
+        'storage_state': profiles.storage_state(profile)
+    }
 
-def human_like_delay():
-    """Add human-like delays with randomness."""
-    # Base delay with some randomness
-    base_delay = random.uniform(MIN_DELAY, MAX_DELAY)
-    
-    # Add occasional longer delays (like a human taking a break)
-    if random.random() < LONG_BREAK_CHANCE:
-        base_delay += random.uniform(LONG_BREAK_MIN, LONG_BREAK_MAX)
-        print(f"⏸️ Taking a longer break: {base_delay:.1f}s")
-    
-    time.sleep(base_delay)
+_browser_profiles = None
 
-def check_for_rate_limiting(page):
-    """Check if we're being rate limited and handle accordingly."""
+def get_browser_profiles():
+    """Return the browser profiles the contexts of the session are opened with."""
+    global _browser_profiles
+    if _browser_profiles is None:
+        _browser_profiles = BrowserProfiles(BROWSER_PROFILES_DIR, BROWSER_CONTEXTS, USER_AGENTS, VIEWPORTS)
+    return _browser_profiles
+
+_block_detector = None
+
+def get_block_detector():
+    """Return the block detector watching every browser page of the run."""
+    global _block_detector
+    if _block_detector is None:
+        _block_detector = BlockDetector()
+    return _block_detector
+
+def check_for_rate_limiting(page, response=None):
+    """
+    Check if the navigation that just finished was rate limited or challenged, from its
+    response, the responses seen on the page and one targeted selector query.
+    """
     try:
-        # Check for common rate limiting indicators
-        rate_limit_indicators = [
-            "rate limit",
-            "too many requests",
-            "please wait",
-            "temporarily blocked",
-            "access denied",
-            "captcha"
-        ]
-        
-        page_content = page.content().lower()
-        for indicator in rate_limit_indicators:
-            if indicator in page_content:
-                print(f"🚨 Rate limiting detected: {indicator}")
-                return True
-        
-        # Check HTTP status
-        response = page.response_for_request(page.request)
-        if response and response.status in [429, 403, 503]:
-            print(f"🚨 HTTP {response.status} - Rate limiting detected")
-            return True
-            
+        reason = get_block_detector().check(page, response)
+    except Exception as e:
+        # If we can't check, assume we're not rate limited
         return False
-        
+    if reason:
+        print(f"🚨 Rate limiting detected: {reason}")
+    return reason is not None
+
+async def async_check_for_rate_limiting(page, response=None):
+    """Async counterpart of check_for_rate_limiting."""
+    try:
+        reason = await get_block_detector().async_check(page, response)
     except Exception as e:
         # If we can't check, assume we're not rate limited
         return False
+    if reason:
+        print(f"🚨 Rate limiting detected: {reason}")
+    return reason is not None
 
-def handle_rate_limiting():
-    """Handle rate limiting by waiting and potentially changing strategy."""
-    wait_time = random.uniform(RATE_LIMIT_WAIT_MIN, RATE_LIMIT_WAIT_MAX)
-    print(f"⏳ Rate limited. Waiting {wait_time:.0f} seconds...")
-    time.sleep(wait_time)
+def report_response(status=None, latency=None, challenged=False, source='browser', url=None):
+    """
+    Feed one response back to the adaptive rate controller, the circuit breaker (and the run's metrics).
+    Returns True if it was a block (429/403/503 or challenge page); every request then backs off.
+    """
+    budget = get_rate_budget()
+    backoff = budget.record(status=status, latency=latency, challenged=challenged)
+    get_retry_policy().record(url or BASE_URL, not backoff and (status is None or status < 500))
+    if latency is not None:
+        get_metrics().observe('navigation_seconds', latency, source=source)
+    get_metrics().inc('responses', source=source, status=status or 'none')
+    if backoff:
+        get_metrics().inc('blocks', source=source)
+        print(f"⏳ Blocked ({status or 'challenge page'}). Backing off {backoff:.0f}s, rate now {budget.requests_per_minute:.1f} req/min")
+    return backoff > 0
 
 def simulate_human_behavior(page):
     """Simulate human-like behavior on the page."""
@@ -200,98 +288,584 @@ def simulate_human_behavior(page):
         # Ignore errors in human simulation
         pass
 
-def get_db_connection():
-    """Create and return a database connection."""
+_http_sessions = {}
+_http_turn = 0
+_http_lock = threading.Lock()
+
+def jar_cookies(jar):
+    """The cookies of a requests cookie jar, in storage_state format."""
+    return [{
+        'name': cookie.name,
+        'value': cookie.value,
+        'domain': cookie.domain,
+        'path': cookie.path,
+        'expires': cookie.expires if cookie.expires is not None else -1,
+        'httpOnly': cookie.has_nonstandard_attr('HttpOnly'),
+        'secure': cookie.secure,
+        'sameSite': 'Lax'
+    } for cookie in jar]
+
+def new_http_session(profile, state):
+    """A keep-alive HTTP session with a browser profile's user agent and the cookies of its storage_state."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': profile['user_agent'],
+        'Accept-Language': 'pt-PT,pt;q=0.9,en;q=0.8',
+        'Accept-Encoding': 'gzip, deflate, br',  # br is decoded as long as the brotli package is installed
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'DNT': '1',
+        'Upgrade-Insecure-Requests': '1'
+    })
+    for cookie in (state or {}).get('cookies', []):
+        expires = cookie.get('expires', -1)
+        session.cookies.set(
+            cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie.get('path', '/'),
+            secure=cookie.get('secure', False), expires=int(expires) if expires and expires > 0 else None,
+            rest={'HttpOnly': None} if cookie.get('httpOnly') else {}
+        )
+    return session
+
+def get_http_session():
+    """
+    Return (profile, session) for the next HTTP request: the browser profiles take turns, each
+    with its own session (its user agent and cookies), so one fingerprint doesn't take all the
+    traffic. Sessions of profiles retired meanwhile (over HTTP or in the browser) are dropped.
+    """
+    global _http_turn
+    profiles = get_browser_profiles()
+    active = profiles.profiles
+    with _http_lock:
+        for profile_id in [profile_id for profile_id, (profile, _) in _http_sessions.items() if profile not in active]:
+            del _http_sessions[profile_id]
+        profile = active[_http_turn % len(active)]
+        _http_turn += 1
+        if profile['id'] not in _http_sessions:
+            _http_sessions[profile['id']] = (profile, new_http_session(profile, profiles.load_storage(profile)))
+        return _http_sessions[profile['id']]
+
+def retire_http_session(profile, reason):
+    """Drop the HTTP session of a challenged profile, and retire the profile."""
+    with _http_lock:
+        _http_sessions.pop(profile['id'], None)
+    get_browser_profiles().retire(profile, reason)
+
+def save_http_sessions():
+    """Merge the cookies of the HTTP sessions into their profiles' storage_state, for the next run and the browser."""
+    profiles = get_browser_profiles()
+    with _http_lock:
+        sessions = list(_http_sessions.values())
+    for profile, session in sessions:
+        state = profiles.load_storage(profile) or {'cookies': [], 'origins': []}
+        cookies = {(cookie['name'], cookie['domain'], cookie['path']): cookie for cookie in state.get('cookies', [])}
+        cookies.update({(cookie['name'], cookie['domain'], cookie['path']): cookie for cookie in jar_cookies(session.cookies)})
+        try:
+            profiles.save_storage(profile, {**state, 'cookies': list(cookies.values())})
+        except OSError as e:
+            print(f"⚠️ Could not save the cookies of browser profile {profile['id']}: {e}")
+
+def looks_like_challenge(html):
+    """Check if an HTML document is a bot-protection / challenge page."""
+    html_lower = html.lower()
+    return any(marker in html_lower for marker in CHALLENGE_MARKERS)
+
+def http_get(url, headers=None):
+    """
+    GET a URL with the next HTTP session (see get_http_session). The response is reported to the
+    rate controller once, after its headers and body have been checked for a challenge; a
+    challenge retires the session's browser profile.
+    Returns the response, or None if the request failed or was challenged.
+    """
+    profile, session = get_http_session()
+    started = time.monotonic()
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        return conn
-    except psycopg2.Error as e:
-        print(f"❌ Database connection failed: {e}")
+        response = session.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"⚠️ HTTP fetch failed, falling back to browser: {e}")
+        get_retry_policy().record(url, False)
         return None
+    challenge = challenge_header_reason(response.headers)
+    if challenge:
+        print(f"🚨 Challenge response over HTTP: {challenge}")
+    elif response.status_code == 200 and looks_like_challenge(response.text):
+        challenge = "challenge page"
+        print("🚨 Challenge page in HTTP response, falling back to browser")
+    report_response(response.status_code, time.monotonic() - started, challenge is not None, source='http', url=url)
+    if challenge:
+        retire_http_session(profile, challenge)
+        return None
+    return response
 
-def get_standups_from_db():
+def parse_html(html, ready_selector):
+    """
+    Parse an HTML page fetched over HTTP (challenge pages are already left out by http_get).
+    Returns a BeautifulSoup document, or None if the page has to be loaded in the browser
+    (the expected container is missing).
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    if soup.select_one(ready_selector) is None:
+        print(f"⚠️ '{ready_selector}' not in HTTP response, falling back to browser")
+        return None
+
+    return soup
+
+_page_cache = None
+_rate_budget = None
+_retry_policy = None
+_crawl_journal = None
+_metrics = None
+
+def get_metrics():
+    """Return the counters and timers of the current run."""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+def circuit_wait(url):
+    """How long the circuit breaker holds requests to the URL's host (raises CircuitBreakerOpen when it gave up)."""
+    wait = get_retry_policy().before(url or BASE_URL)
+    if wait:
+        print(f"🔌 Circuit open, waiting {wait:.0f}s before the next request")
+        get_metrics().observe('sleep_seconds', wait, reason='circuit')
+    return wait
+
+def pace(budget=None, url=None):
+    """Wait for the circuit breaker and the next request slot of the shared budget, timing the waits."""
+    time.sleep(circuit_wait(url))
+    delay = (budget or get_rate_budget()).wait()
+    get_metrics().observe('sleep_seconds', max(delay, 0.0), reason='pacing')
+
+async def async_pace(budget, url=None):
+    """Async counterpart of pace."""
+    await asyncio.sleep(circuit_wait(url))
+    delay = await budget.acquire()
+    get_metrics().observe('sleep_seconds', max(delay, 0.0), reason='pacing')
+
+def next_retry(kind, url, reason):
+    """
+    Count a failed load of a page against the retry budgets.
+    Returns how long to wait before trying it again, or None if the page has to be given up.
+    """
+    delay = get_retry_policy().retry(url, reason)
+    if delay is None:
+        get_metrics().inc('retries_exhausted', kind=kind)
+        print(f"🛑 Giving up on {url}: retries used up")
+        return None
+    get_metrics().inc('retries', kind=kind, reason=reason)
+    return delay
+
+def retry_pause(delay):
+    """Log and time the wait before a retry; returns the delay for the caller to sleep."""
+    print(f"🔁 Retrying in {delay:.0f}s")
+    get_metrics().observe('sleep_seconds', delay, reason='retry')
+    return delay
+
+def open_crawl_journal():
+    """Open this run's crawl journal, resuming an unfinished one. None if journaling is disabled."""
+    global _crawl_journal
+    _crawl_journal = CrawlJournal(JOURNAL_PATH, JOURNAL_MAX_AGE_HOURS * 3600) if JOURNAL_ENABLED else None
+    return _crawl_journal
+
+def read_journal(kind, key):
+    """What the crawl journal holds for a unit of work, or None if it still has to be scraped."""
+    data = _crawl_journal.get(kind, key) if _crawl_journal else None
+    if data is not None:
+        get_metrics().inc('pages', kind=kind, source='journal')
+    return data
+
+def write_journal(kind, key, data):
+    if _crawl_journal:
+        _crawl_journal.record(kind, key, data)
+
+def read_journal_events(kind, key):
+    data = read_journal(kind, key)
+    return [Event(**event) for event in data] if data is not None else None
+
+def write_journal_events(kind, key, events):
+    write_journal(kind, key, [asdict(event) for event in events])
+
+def get_retry_policy():
+    """Return the retry budgets and circuit breaker shared by every navigation of the run."""
+    global _retry_policy
+    if _retry_policy is None:
+        _retry_policy = RetryPolicy(
+            MAX_RETRIES,
+            RETRY_DELAY,
+            RETRY_MAX_DELAY,
+            RUN_RETRY_BUDGET,
+            window=CIRCUIT_WINDOW,
+            failure_rate=CIRCUIT_FAILURE_RATE,
+            cooldown=CIRCUIT_COOLDOWN,
+            max_trips=CIRCUIT_MAX_TRIPS
+        )
+    return _retry_policy
+
+def get_rate_budget():
+    """Return the adaptive request budget shared by every fetch of the run."""
+    global _rate_budget
+    if _rate_budget is None:
+        _rate_budget = AdaptiveRateController(
+            REQUESTS_PER_MINUTE,
+            MIN_REQUESTS_PER_MINUTE,
+            MAX_REQUESTS_PER_MINUTE,
+            increase_step=RATE_INCREASE_STEP,
+            decrease_factor=RATE_DECREASE_FACTOR,
+            slow_response=SLOW_RESPONSE_SECONDS,
+            backoff_base=BACKOFF_BASE,
+            backoff_max=BACKOFF_MAX,
+            jitter=RATE_JITTER
+        )
+    return _rate_budget
+
+def get_page_cache():
+    """Return the shared page cache, or None if caching is disabled."""
+    global _page_cache
+    if _page_cache is None and PAGE_CACHE_ENABLED:
+        _page_cache = PageCache(PAGE_CACHE_PATH, PAGE_CACHE_TTL)
+    return _page_cache
+
+def absolute_url(href):
+    """Turn a site-relative href into an absolute URL."""
+    return BASE_URL + href if href.startswith('/') else href
+
+# Query parameters that only track where a click came from
+TRACKING_PARAM_PREFIXES = ('utm_', 'fbclid', 'gclid', 'mc_')
+
+def canonical_url(url):
+    """
+    Normalize a URL so every link to the same page compares equal: lowercase scheme and host,
+    sorted query without tracking parameters, no fragment and no trailing slash.
+    """
+    parts = urlsplit(absolute_url(url))
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/') or '/', urlencode(query), ''))
+
+def _node_text(node):
+    return node.get_text() if node is not None else ''
+
+def _node_attr(node, name):
+    return node.get(name, '') if node is not None else ''
+
+def parse_listing_records(soup):
+    """Extract one plain record per '#eventos ul.events_list li' from a parsed listing page."""
+    records = []
+    for item in soup.select('#eventos ul.events_list li'):
+        records.append({
+            'classes': ' '.join(item.get('class', [])),
+            'title': _node_text(item.select_one('.title')),
+            'date': _node_attr(item.select_one('.date'), 'data-date'),
+            'venues': _node_text(item.select_one('.venues')),
+            'href': _node_attr(item.select_one('a'), 'href')
+        })
+    return records
+
+def parse_session_records(soup):
+    """
+    Extract the sessions from a parsed details page.
+    Handles both the classic '#sessoes' list and the '#eventList.available_events' variant, and
+    falls back to the page's schema.org Event data when neither lists any session.
+    """
+    # Variant 1: classic sessions list under #sessoes
+    sessions = soup.select('#sessoes ul.sessions_list li')
+    if sessions:
+        return [{
+            'date': _node_attr(item.select_one('.date'), 'content'),
+            'name': _node_attr(item.select_one('.details'), 'content'),
+            'venue': _node_text(item.select_one('.venue')),
+            'district': _node_text(item.select_one('.district')),
+            'href': _node_attr(item.select_one('a'), 'href')
+        } for item in sessions]
+
+    # Variant 2: available events list under #eventList.available_events
+    container = soup.select_one('#eventList.available_events')
+    items = (container.select('ul.events_list li') or container.select('li')) if container is not None else []
+    records = []
+    for item in items:
+        date = item.select_one('.date')
+        records.append({
+            'date': _node_attr(date, 'content') or _node_attr(date, 'data-date'),
+            'name': _node_text(item.select_one('.title')) or _node_text(item.select_one('[itemprop="name"]')),
+            'venue': _node_text(item.select_one('.venues')) or _node_text(item.select_one('.venue')),
+            'district': '',
+            'href': _node_attr(item.select_one('a'), 'href')
+        })
+    if not records and STRUCTURED_DATA_ENABLED:
+        records = page_sessions(extract_items(soup))  # Sessions only published as schema.org data
+    return records
+
+def attach_listed_sessions(records, items):
+    """
+    Give each multi-session listing record the sessions that the page's structured data (`items`)
+    lists for its show, as 'sessions'. It stays None unless every session has a date and a venue,
+    in which case the show's details page doesn't have to be opened.
+    """
+    listed = {}
+    if STRUCTURED_DATA_ENABLED:
+        listed = {canonical_url(event_url(event)): event_sessions(event) for event in find_events(items) if event_url(event)}
+    for record in records:
+        sessions = None
+        if 'has_multiple_sessions' in (record['classes'] or '') and record['href']:
+            sessions = listed.get(canonical_url(record['href']))
+        record['sessions'] = sessions if sessions and is_complete(sessions) else None
+    return records
+
+def is_fresh_in_cache(url):
+    """Check if a page will be served from the page cache without touching the site (no need to pace it)."""
+    cache = get_page_cache() if FETCH_MODE == 'http' else None
+    if not cache:
+        return False
+    entry = cache.get(url)
+    return entry is not None and entry.extracted is not None and cache.is_fresh(entry)
+
+def fetch_records(url, page_type, ready_selector, parse):
+    """
+    Fetch a page over HTTP through the page cache and extract its records with `parse`.
+    Fresh cache entries are used as they are, stale ones are revalidated with a conditional
+    request, and a body whose hash didn't change is not parsed again.
+    Returns the records, or None if the page has to be loaded in the browser.
+    """
+    cache = get_page_cache()
+    entry = cache.get(url) if cache else None
+    if entry is not None and entry.extracted is None:
+        entry = None
+
+    if entry and cache.is_fresh(entry):
+        cache.hits += 1
+        get_metrics().inc('pages', kind=page_type, source='cache')
+        print("🗄️ Fresh in page cache")
+        return entry.extracted
+
+    response = http_get(url, PageCache.conditional_headers(entry))
+    if response is None:
+        return None
+
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+
+    if response.status_code == 304 and entry:
+        cache.revalidated += 1
+        get_metrics().inc('pages', kind=page_type, source='revalidated')
+        cache.touch(url, etag, last_modified)
+        print("🗄️ Not modified (304), using cached records")
+        return entry.extracted
+
+    if response.status_code != 200:
+        print(f"⚠️ HTTP {response.status_code}, falling back to browser")
+        return None
+
+    html = response.text
+    if entry and PageCache.content_hash(html) == entry.content_hash:
+        cache.unchanged += 1
+        get_metrics().inc('pages', kind=page_type, source='unchanged')
+        cache.touch(url, etag, last_modified)
+        print("🗄️ Content unchanged, using cached records")
+        return entry.extracted
+
+    with get_metrics().timer('parse_seconds', kind=page_type):
+        soup = parse_html(html, ready_selector)
+    if soup is None:
+        return None
+
+    with get_metrics().timer('extraction_seconds', kind=page_type, source='http'):
+        records = parse(soup)
+    get_metrics().inc('pages', kind=page_type, source='http')
+    if cache:
+        cache.misses += 1
+        cache.store(url, page_type, html, etag, last_modified, records)
+    return records
+
+def fetch_listing_page(url):
+    """Listing page records and page count over HTTP, or None if the browser is needed."""
+    return fetch_records(url, 'listing', LISTING_READY_SELECTOR, parse_listing_page)
+
+def fetch_session_records(url):
+    """Details page session records over HTTP, or None if the browser is needed."""
+    return fetch_records(url, 'details', details_ready_selector(), parse_session_records)
+
+def page_count_from_hints(max_page, counter_text, per_page):
+    """
+    Work out how many result pages a listing has, from the highest page linked by the paginator
+    or from the result counter. Returns None if the page shows neither.
+    """
+    if max_page:
+        return max_page
+    match = RESULT_COUNT_PATTERN.search(counter_text or '')
+    if match and per_page:
+        total = int(re.sub(r'\D', '', match.group(1)))
+        return max(1, math.ceil(total / per_page))
+    return None
+
+def parse_listing_page(soup):
+    """Extract the records (with their structured data sessions) and the page count from a parsed listing page."""
+    records = attach_listed_sessions(parse_listing_records(soup), extract_items(soup))
+    linked_pages = [
+        int(match.group(1))
+        for link in soup.select(PAGINATION_LINK_SELECTOR)
+        for match in [PAGE_PARAM_PATTERN.search(link.get('href', ''))]
+        if match
+    ]
+    counter_text = _node_text(soup.select_one(RESULT_COUNTER_SELECTOR))
+    return {'records': records, 'page_count': page_count_from_hints(max(linked_pages, default=0), counter_text, len(records))}
+
+def listing_record_to_event(record):
+    """Build an Event from a listing page record."""
+    return Event(
+        (record['title'] or 'N/A').strip(),
+        (record['date'] or 'N/A').strip(),
+        (record['venues'] or 'N/A').strip(),
+        'has_multiple_sessions' in (record['classes'] or ''),
+        absolute_url(record['href'] or ''),
+        record.get('sessions')
+    )
+
+def listed_sessions(event):
+    """The sessions of a multi-session event, from the listing's structured data instead of its details page."""
+    get_metrics().inc('pages', kind='details', source='structured_data')
+    extra_events = session_records_to_events(event, event.sessions)
+    print(f"🧩 {len(extra_events)} sessions of '{event.title}' taken from the listing's structured data")
+    return extra_events
+
+def session_records_to_events(event, records):
+    """Build one Event per available session of a multi-session event."""
+    extra_events = []
+    for record in records:
+        if not record['date']:
+            print("⚠️ Session is no longer available.")
+            continue
+
+        name = (record['name'] or '').strip()
+        title_text = f"{event.title} - {name}" if name else event.title
+
+        # Build the location string same as in main scrape
+        location_str = f"{(record['venue'] or '').strip()} - {(record['district'] or '').strip()}".strip(" -")
+
+        extra_events.append(Event(
+            title=title_text.strip(),
+            date=record['date'].strip(),
+            location=location_str,
+            has_multi_sessions=False,
+            detailsPageUrl=absolute_url(record['href'] or '')
+        ))
+    return extra_events
+
+_db_pool = None
+
+def get_db_pool():
+    """Return the shared connection pool, creating it on first use. Returns None if the database is unreachable."""
+    global _db_pool
+    if _db_pool is None:
+        try:
+            _db_pool = DatabasePool(
+                DB_POOL_MIN,
+                DB_POOL_MAX,
+                keepalives=1,  # The run's connection idles while the crawl is running
+                keepalives_idle=30,
+                **DB_CONFIG
+            )
+        except psycopg2.Error as e:
+            print(f"❌ Database connection failed: {e}")
+            return None
+    return _db_pool
+
+def get_standups_from_db(uow):
     """Fetch all standups from the database."""
-    conn = get_db_connection()
-    if not conn:
-        print("❌ Cannot fetch standups - no database connection")
-        return []
-    
+    cursor = uow.cursor()
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM standup")
+        with get_metrics().timer('db_seconds', statement='select_standups'):
+            cursor.execute("SELECT id, name FROM standup")
         standups = cursor.fetchall()
         print(f"📋 Found {len(standups)} standups in database")
         return standups
     except psycopg2.Error as e:
         print(f"❌ Error fetching standups: {e}")
+        uow.rollback()
         return []
     finally:
         cursor.close()
-        conn.close()
 
-def find_matching_standup(event_title, standups):
+def get_known_event_keys(uow):
+    """Fetch the (standup_id, date) keys of the upcoming events already stored."""
+    cursor = uow.cursor()
+    try:
+        with get_metrics().timer('db_seconds', statement='select_known_events'):
+            cursor.execute("SELECT standup_id, date FROM event WHERE date >= now() - interval '1 day'")
+        known_keys = set(cursor.fetchall())
+        print(f"📋 Found {len(known_keys)} upcoming events in database")
+        return known_keys
+    except psycopg2.Error as e:
+        print(f"❌ Error fetching stored events: {e}")
+        uow.rollback()
+        return set()
+    finally:
+        cursor.close()
+
+def session_keys(events, matcher):
+    """The (standup_id, date) keys the events will be stored under, for the ones matching a standup."""
+    keys = []
+    for event in events:
+        match = matcher.match(event.title)
+        if match:
+            keys.append((match[0], parse_date_to_offset_datetime(event.date)))
+    return keys
+
+def find_matching_standup(event_title, matcher):
     """
-    Find a standup whose name is contained in the event title (case-insensitive).
+    Find a standup whose name is contained in the event title (ignoring case, accents and extra whitespace).
+    If several names are contained, the longest one wins.
     Returns (standup_id, standup_name) if found, None otherwise.
     """
-    event_title_lower = event_title.lower()
-    
-    for standup_id, standup_name in standups:
-        if standup_name.lower() in event_title_lower:
-            print(f"🎯 Event '{event_title}' matches standup '{standup_name}' (ID: {standup_id})")
-            return standup_id, standup_name
-    
-    return None
+    with get_metrics().timer('match_seconds', kind='standup'):
+        match = matcher.match(event_title)
+    if match:
+        standup_id, standup_name = match
+        print(f"🎯 Event '{event_title}' matches standup '{standup_name}' (ID: {standup_id})")
+    return match
 
-def get_locations_from_db():
+def get_locations_from_db(uow):
     """Fetch all locations from the database."""
-    conn = get_db_connection()
-    if not conn:
-        print("❌ Cannot fetch locations - no database connection")
-        return []
-    
+    cursor = uow.cursor()
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM location")
+        with get_metrics().timer('db_seconds', statement='select_locations'):
+            cursor.execute("SELECT id, name, city FROM location")
         locations = cursor.fetchall()
         print(f"📍 Found {len(locations)} locations in database")
         return locations
     except psycopg2.Error as e:
         print(f"❌ Error fetching locations: {e}")
+        uow.rollback()
         return []
     finally:
         cursor.close()
-        conn.close()
         print("\n")
 
-def find_matching_location(event_location, locations):
+def find_matching_location(event_location, location_index):
     """
-    Find a location whose name is contained in the event location (case-insensitive).
+    Find the location an event location string refers to (exact, contained or fuzzy match on the venue).
     Returns (location_id, location_name) if found, None otherwise.
     """
-    event_location_lower = event_location.lower()
-    
-    for location_id, location_name in locations:
-        if location_name.lower() in event_location_lower or event_location_lower in location_name.lower():
-            print(f"📍 Event location '{event_location}' matches location '{location_name}' (ID: {location_id})")
-            return location_id, location_name
-    
-    return None
+    with get_metrics().timer('match_seconds', kind='location'):
+        match = location_index.resolve(event_location)
+    if match:
+        location_id, location_name = match
+        print(f"📍 Event location '{event_location}' matches location '{location_name}' (ID: {location_id})")
+    return match
 
-def create_location_in_db(location_string, cursor, conn):
+def create_location_in_db(location_string, cursor):
     """
     Create a new location in the database from the location string.
     Tries to parse city from location string if it contains " - " (format: "Venue - City").
+    The row is committed with the rest of the run's unit of work; a failed insert only
+    rolls back to its own savepoint.
     Returns (location_id, location_name) tuple if successful, None otherwise.
     """
     # Try to parse location string: "Venue - City" or just "Venue"
-    if " - " in location_string:
-        parts = location_string.split(" - ", 1)
-        name = parts[0].strip()
-        city = parts[1].strip() if len(parts) > 1 else None
-    else:
-        name = location_string.strip()
-        city = None
+    name, city = split_location(location_string)
     
     insert_location_sql = """
     INSERT INTO location (name, city, street, "number")
@@ -300,406 +874,1621 @@ def create_location_in_db(location_string, cursor, conn):
     """
     
     try:
-        cursor.execute(insert_location_sql, (name, city))
+        cursor.execute("SAVEPOINT create_location")
+        with get_metrics().timer('db_seconds', statement='insert_location'):
+            cursor.execute(insert_location_sql, (name, city))
         location_id = cursor.fetchone()[0]
-        conn.commit()
+        cursor.execute("RELEASE SAVEPOINT create_location")
         print(f"✅ Created new location: '{name}' (ID: {location_id})" + (f" in city '{city}'" if city else ""))
         return location_id, name
     except psycopg2.Error as e:
         print(f"❌ Error creating location '{name}': {e}")
-        conn.rollback()
+        cursor.execute("ROLLBACK TO SAVEPOINT create_location")
         return None
 
-def save_events_to_db(events, standups):
-    """Save events to the database."""
-    # First, fetch all standups and locations from the database
+def create_locations_in_db(location_strings, cursor, fuzzy_threshold=LOCATION_FUZZY_THRESHOLD):
+    """
+    Create all the given locations with one multi-row INSERT.
+    Strings that point at the same new venue (e.g. "Tivoli - Lisboa" and "Tivoli BBVA - Lisboa")
+    are created once. If the batch fails, falls back to creating the locations one by one.
+    Returns a dict of location string -> (location_id, location_name), without the ones that failed,
+    and the (location_id, name, city) of the rows created, to index once they are committed.
+    """
+    # Group the strings that resolve to the same new location
+    pending = LocationIndex(fuzzy_threshold=fuzzy_threshold)
+    groups = []
+    for location_string in location_strings:
+        match = pending.resolve(location_string)
+        if match:
+            groups[match[0]][2].append(location_string)
+            continue
+        name, city = split_location(location_string)
+        pending.add(len(groups), name, city)
+        groups.append((name, city, [location_string]))
 
-    if not standups:
-        print("❌ No standups found in database. Cannot save events.")
-        return
-    
-    locations = get_locations_from_db()
-    # Note: We can create locations on the fly if they don't exist, so we don't need to return early
-    
-    conn = get_db_connection()
-    if not conn:
-        print("❌ Cannot save events - no database connection")
-        return
-    
+    insert_locations_sql = """
+    INSERT INTO location (name, city, street, "number")
+    VALUES %s
+    RETURNING id, name, city
+    """
+
+    created = {}
     try:
-        cursor = conn.cursor()
-        
-        # create_table_sql = """
-        # CREATE TABLE IF NOT EXISTS event_script
-        # (
-        #     id         SERIAL PRIMARY KEY,
-        #     name       VARCHAR(500)             NOT NULL,
-        #     date       TIMESTAMP WITH TIME ZONE NOT NULL,
-        #     url        VARCHAR(1000)            NOT NULL,
-        #     location   INTEGER                  NOT NULL,
-        #     standup_id INTEGER                  NOT NULL,
-        #     UNIQUE (name, date)
-        # );
-        # """
-        # cursor.execute(create_table_sql)
-
-        insert_sql = """
-        INSERT INTO event (name, date, url, location, standup_id, priority) 
-        VALUES (%s, %s, %s, %s, %s, 1)
-        ON CONFLICT (standup_id, date) DO NOTHING
-        RETURNING id
-        """
-        
-        saved_count = 0
-        skipped_standup_count = 0
-        skipped_location_count = 0
-        unmatched_locations = set()
-        
-        for event in events:
-            # Check if event matches any standup
-            matching_standup = find_matching_standup(event.title, standups)
-            
-            if matching_standup:
-                standup_id, standup_name = matching_standup
-                
+        cursor.execute("SAVEPOINT create_locations")
+        with get_metrics().timer('db_seconds', statement='insert_locations'):
+            rows = execute_values(
+                cursor,
+                insert_locations_sql,
+                [(name, city) for name, city, _ in groups],
+                template="(%s, %s, NULL, NULL)",
+                page_size=DB_BATCH_SIZE,
+                fetch=True
+            )
+        cursor.execute("RELEASE SAVEPOINT create_locations")
+        location_ids = {(name, city): location_id for location_id, name, city in rows}
+        for name, city, strings in groups:
+            location_id = location_ids[(name, city)]
+            print(f"✅ Created new location: '{name}' (ID: {location_id})" + (f" in city '{city}'" if city else ""))
+            created[strings[0]] = (location_id, name)
+    except psycopg2.Error as e:
+        print(f"⚠️ Batch location insert failed, creating locations one by one: {e}")
+        cursor.execute("ROLLBACK TO SAVEPOINT create_locations")
+        for name, city, strings in groups:
+            result = create_location_in_db(strings[0], cursor)
+            if result:
+                created[strings[0]] = result
+
+    results = {}
+    new_locations = []
+    for name, city, strings in groups:
+        if strings[0] not in created:
+            continue
+        location_id, location_name = created[strings[0]]
+        new_locations.append((location_id, location_name, city))
+        for location_string in strings:
+            results[location_string] = (location_id, location_name)
+    return results, new_locations
+
+def insert_events_batch(cursor, rows):
+    """
+    Insert event rows (name, date, url, location_id, standup_id) with a multi-row INSERT.
+    Rows whose (standup_id, date) already exists are skipped by the database.
+    Returns (id, standup_id, date) for every inserted row.
+    """
+    insert_sql = """
+    INSERT INTO event (name, date, url, location, standup_id, priority)
+    VALUES %s
+    ON CONFLICT (standup_id, date) DO NOTHING
+    RETURNING id, standup_id, date
+    """
+    if not rows:
+        return []
+    with get_metrics().timer('db_seconds', statement='insert_events'):
+        return execute_values(cursor, insert_sql, rows, template="(%s, %s, %s, %s, %s, 1)", page_size=DB_BATCH_SIZE, fetch=True)
+
+def link_comedians_to_events(cursor, event_ids):
+    """
+    Link every new event to the comedians of its standup in one set-based statement.
+    Returns the number of comedian_event rows created.
+    """
+    if not event_ids:
+        return 0
+    with get_metrics().timer('db_seconds', statement='link_comedians'):
+        cursor.execute("""
+        INSERT INTO comedian_event (comedian_id, event_id)
+        SELECT sc.comedian_id, e.id
+        FROM event e
+        JOIN standup_comedian sc ON sc.standup_id = e.standup_id
+        WHERE e.id = ANY(%s)
+        ON CONFLICT DO NOTHING
+        """, (list(event_ids),))
+    return cursor.rowcount
+
+class EventWriter:
+    """
+    Writes events to the database in batches, each committed as a checkpoint of the run's unit of work.
+    The location index is loaded once and grows as locations are created, so batches can keep
+    coming in while the crawl runs. Created locations and saved events only count once their batch
+    is committed: a batch that is rolled back leaves the index and the totals as they were.
+    report() prints the totals at the end.
+    """
+
+    def __init__(self, matcher, uow):
+        self.matcher = matcher
+        self.uow = uow
+        self.batches = 0
+        self.saved_count = 0
+        self.skipped_standup_count = 0
+        self.skipped_location_count = 0
+        self.unmatched_locations = set()
+
+        if not matcher.standups:
+            print("❌ No standups found in database. Cannot save events.")
+            self.location_index = None
+        else:
+            self.location_index = LocationIndex(get_locations_from_db(uow), LOCATION_FUZZY_THRESHOLD)
+            # Note: We can create locations on the fly if they don't exist
+
+    def write(self, events):
+        """Save a batch of events and commit it."""
+        if self.location_index is None:
+            return
+
+        cursor = self.uow.cursor()
+        matched_events = []
+        try:
+            # Resolve standup and location for every event, then write them all at once
+            missing_locations = {}
+            for event in events:
+                # Check if event matches any standup
+                matching_standup = find_matching_standup(event.title, self.matcher)
+                get_metrics().inc('matches', kind='standup', outcome='hit' if matching_standup else 'miss')
+
+                if not matching_standup:
+                    self.skipped_standup_count += 1
+                    get_metrics().inc('events', outcome='no_standup')
+                    print(f"🚫 Skipped (no matching standup): {event.title}")
+                    continue
+
                 # Check if event location matches any location
-                matching_location = find_matching_location(event.location, locations)
-                
-                if matching_location:
-                    location_id, location_name = matching_location
-                else:
-                    # Location doesn't exist, create it
+                matching_location = find_matching_location(event.location, self.location_index)
+                if not matching_location and event.location not in missing_locations:
                     print(f"📍 Location not found, creating new location: {event.location}")
-                    result = create_location_in_db(event.location, cursor, conn)
-                    
-                    if result:
-                        location_id, location_name = result
-                        # Add the new location to the locations list to avoid duplicates
-                        locations.append((location_id, location_name))
-                    else:
-                        # Failed to create location, skip this event
-                        skipped_location_count += 1
-                        unmatched_locations.add(event.location)
-                        print(f"🚫 Skipped (failed to create location): {event.title} - Location: {event.location}")
-                        continue
-                
-                # Continue with event creation using the location_id
-                try:
-                    # Parse the date string to OffsetDateTime
-                    parsed_date = parse_date_to_offset_datetime(event.date)
-                    
-                    # Map fields: title -> name, detailsPageUrl -> url
-                    cursor.execute(insert_sql, (
-                        event.title,
-                        parsed_date,
-                        event.detailsPageUrl,
-                        location_id,
-                        standup_id
-                    ))
-                    
-                    result = cursor.fetchone()
-                    
-                    if result:
-                        # New event was created, get the event_id
-                        event_id = result[0]
-                        saved_count += 1
-                        print(f"💾 Saved: {event.title} (Standup: {standup_name}, Location: {location_name})")
-                        
-                        # Fetch comedians for this standup from standup_comedian table
-                        cursor.execute(
-                            "SELECT comedian_id FROM standup_comedian WHERE standup_id = %s",
-                            (standup_id,)
-                        )
-                        comedian_rows = cursor.fetchall()
-                        
-                        if comedian_rows:
-                            # Insert comedians into comedian_event table
-                            insert_comedian_event_sql = """
-                            INSERT INTO comedian_event (comedian_id, event_id)
-                            VALUES (%s, %s)
-                            ON CONFLICT DO NOTHING
-                            """
-                            
-                            comedian_count = 0
-                            for (comedian_id,) in comedian_rows:
-                                cursor.execute(insert_comedian_event_sql, (comedian_id, event_id))
-                                if cursor.rowcount > 0:
-                                    comedian_count += 1
-                        else:
-                            print(f"   ⚠️ No comedians found for standup '{standup_name}'")
-                    else:
-                        print(f"⏭️ Skipped (duplicate): {event.title}")
-                        
-                except psycopg2.Error as e:
-                    print(f"❌ Error saving event '{event.title}': {e}")
+                    missing_locations[event.location] = None
+
+                matched_events.append((event, matching_standup, matching_location))
+
+            # Locations that don't exist are created together
+            created_locations, new_locations = (
+                create_locations_in_db(list(missing_locations), cursor, self.location_index.fuzzy_threshold)
+                if missing_locations else ({}, [])
+            )
+
+            rows = []
+            row_labels = []
+            location_outcomes = {}
+            for event, (standup_id, standup_name), matching_location in matched_events:
+                outcome = 'hit' if matching_location else 'created' if event.location in created_locations else 'miss'
+                location_outcomes[outcome] = location_outcomes.get(outcome, 0) + 1
+                matching_location = matching_location or created_locations.get(event.location)
+                if not matching_location:
+                    # Failed to create location, skip this event
+                    self.skipped_location_count += 1
+                    get_metrics().inc('events', outcome='no_location')
+                    self.unmatched_locations.add(event.location)
+                    print(f"🚫 Skipped (failed to create location): {event.title} - Location: {event.location}")
                     continue
-            else:
-                skipped_standup_count += 1
-                print(f"🚫 Skipped (no matching standup): {event.title}")
-        
-        conn.commit()
-        print(f"\n✅ Successfully saved {saved_count} new events to database")
-        print(f"🚫 Skipped {skipped_standup_count} events (no matching standup)")
-        print(f"🚫 Skipped {skipped_location_count} events (failed to create location)")
-        
+
+                location_id, location_name = matching_location
+
+                # Parse the date string to OffsetDateTime
+                parsed_date = parse_date_to_offset_datetime(event.date)
+
+                # Map fields: title -> name, detailsPageUrl -> url
+                rows.append((event.title, parsed_date, event.detailsPageUrl, location_id, standup_id))
+                row_labels.append((event.title, standup_name, location_name))
+
+            inserted = insert_events_batch(cursor, rows)
+            inserted_ids = {(standup_id, date): event_id for event_id, standup_id, date in inserted}
+
+            # The first row of each (standup_id, date) got inserted, the rest already existed
+            new_event_ids = []
+            new_standups = {}
+            saved = []
+            for (title, date, url, location_id, standup_id), (_, standup_name, location_name) in zip(rows, row_labels):
+                event_id = inserted_ids.pop((standup_id, date), None)
+                if event_id is None:
+                    print(f"⏭️ Skipped (duplicate): {title}")
+                    continue
+                new_event_ids.append(event_id)
+                new_standups[standup_id] = standup_name
+                saved.append(f"💾 Saved: {title} (Standup: {standup_name}, Location: {location_name})")
+
+            if new_event_ids:
+                link_comedians_to_events(cursor, new_event_ids)
+
+                with get_metrics().timer('db_seconds', statement='select_standup_comedians'):
+                    cursor.execute(
+                        "SELECT DISTINCT standup_id FROM standup_comedian WHERE standup_id = ANY(%s)",
+                        (list(new_standups),)
+                    )
+                standups_with_comedians = {row[0] for row in cursor.fetchall()}
+                for standup_id, standup_name in new_standups.items():
+                    if standup_id not in standups_with_comedians:
+                        print(f"   ⚠️ No comedians found for standup '{standup_name}'")
+
+            with get_metrics().timer('db_seconds', statement='commit'):
+                self.uow.checkpoint(f"batch {self.batches + 1} saved ({len(new_event_ids)} new events)")
+
+            # Committed: the new locations and events exist now
+            self.batches += 1
+            for location_id, location_name, city in new_locations:
+                self.location_index.add(location_id, location_name, city)
+            for line in saved:
+                print(line)
+            self.saved_count += len(new_event_ids)
+            get_metrics().inc('events', len(new_event_ids), outcome='saved')
+            get_metrics().inc('events', len(rows) - len(new_event_ids), outcome='duplicate')
+            for outcome, count in location_outcomes.items():
+                get_metrics().inc('matches', count, kind='location', outcome=outcome)
+
+        except psycopg2.Error as e:
+            print(f"❌ Database error, {len(matched_events)} events of the batch rolled back: {e}")
+            get_metrics().inc('events', len(matched_events), outcome='rolled_back')
+            self.uow.rollback()
+        finally:
+            cursor.close()
+
+    def report(self):
+        """Print the totals of every batch written."""
+        if self.location_index is None:
+            return
+
+        print(f"\n✅ Successfully saved {self.saved_count} new events to database")
+        print(f"🚫 Skipped {self.skipped_standup_count} events (no matching standup)")
+        print(f"🚫 Skipped {self.skipped_location_count} events (failed to create location)")
+
         # Print locations that failed to be created
-        if unmatched_locations:
+        if self.unmatched_locations:
             print(f"\n📋 Locations that failed to be created:")
-            for location in sorted(unmatched_locations):
+            for location in sorted(self.unmatched_locations):
                 print(f"   - {location}")
         else:
             print(f"\n✅ All event locations were found or successfully created in database")
-        
-    except psycopg2.Error as e:
-        print(f"❌ Database error: {e}")
-        conn.rollback()
-    finally:
-        cursor.close()
-        conn.close()
 
-def scrape_events_for_month(page, month, year):
-    events = []
-    page_number = 1
+def save_events_to_db(events, matcher, uow):
+    """Save events to the database, committing them as one checkpoint of the run's unit of work."""
+    writer = EventWriter(matcher, uow)
+    writer.write(events)
+    writer.report()
 
-    while True:
-        url = f"{BASE_URL}/pesquisa/?category=253&month={month}&year={year}&page={page_number}" #253 is the stand up comedy's category
-        human_like_delay()  # Use human-like delays instead of fixed delays
-        print(f"\n🔍 Checking: {url}")
+# Extraction scripts run inside the page, so a whole listing / sessions list costs one round trip.
+# With the structured data fallbacks of extract_listing_records / extract_session_records, they
+# give the same records as parse_listing_records / parse_session_records.
+LISTING_EXTRACT_JS = """
+items => items.map(li => {
+    const text = sel => { const el = li.querySelector(sel); return el ? el.textContent : ''; };
+    const attr = (sel, name) => { const el = li.querySelector(sel); return (el && el.getAttribute(name)) || ''; };
+    return {
+        classes: li.getAttribute('class') || '',
+        title: text('.title'),
+        date: attr('.date', 'data-date'),
+        venues: text('.venues'),
+        href: attr('a', 'href')
+    };
+})
+"""
+
+SESSIONS_EXTRACT_JS = """
+() => {
+    const text = (root, sel) => { const el = root.querySelector(sel); return el ? el.textContent : ''; };
+    const attr = (root, sel, name) => { const el = root.querySelector(sel); return (el && el.getAttribute(name)) || ''; };
+
+    // Variant 1: classic sessions list under #sessoes
+    const sessions = document.querySelectorAll('#sessoes ul.sessions_list li');
+    if (sessions.length > 0) {
+        return Array.from(sessions, li => ({
+            date: attr(li, '.date', 'content'),
+            name: attr(li, '.details', 'content'),
+            venue: text(li, '.venue'),
+            district: text(li, '.district'),
+            href: attr(li, 'a', 'href')
+        }));
+    }
+
+    // Variant 2: available events list under #eventList.available_events
+    const container = document.querySelector('#eventList.available_events');
+    if (!container) {
+        return [];
+    }
+    let items = container.querySelectorAll('ul.events_list li');
+    if (items.length === 0) {
+        items = container.querySelectorAll('li');
+    }
+    return Array.from(items, li => ({
+        date: attr(li, '.date', 'content') || attr(li, '.date', 'data-date'),
+        name: text(li, '.title') || text(li, '[itemprop="name"]'),
+        venue: text(li, '.venues') || text(li, '.venue'),
+        district: '',
+        href: attr(li, 'a', 'href')
+    }));
+}
+"""
+
+STRUCTURED_DATA_EXTRACT_JS = """
+() => ({
+    jsonLd: Array.from(document.querySelectorAll('script[type="application/ld+json"]'), script => script.textContent),
+    microdata: Array.from(document.querySelectorAll('[itemscope]:not([itemprop])'), item => item.outerHTML)
+})
+"""
+
+PAGE_COUNT_EXTRACT_JS = """
+() => {
+    const pages = Array.from(document.querySelectorAll('%s'), a => {
+        const match = (a.getAttribute('href') || '').match(/[?&]page=(\\d+)/);
+        return match ? parseInt(match[1], 10) : 0;
+    });
+    const counter = document.querySelector('%s');
+    return {
+        maxPage: pages.length ? Math.max(...pages) : 0,
+        counterText: counter ? counter.textContent : ''
+    };
+}
+""" % (PAGINATION_LINK_SELECTOR, RESULT_COUNTER_SELECTOR)
+
+def details_ready_selector():
+    """What tells a details page has rendered: its sessions list, or structured data when it is used."""
+    return f"{DETAILS_READY_SELECTOR}, {STRUCTURED_DATA_SELECTOR}" if STRUCTURED_DATA_ENABLED else DETAILS_READY_SELECTOR
 
+def structured_items(structured):
+    """The structured data items (same as extract_items) from what STRUCTURED_DATA_EXTRACT_JS returned."""
+    if not structured:
+        return []
+    items = parse_json_ld(structured['jsonLd'])
+    if structured['microdata']:
+        items += extract_microdata(BeautifulSoup(''.join(structured['microdata']), 'html.parser'))
+    return items
+
+def extract_listing_records(page):
+    """Extract one plain record per '#eventos ul.events_list li' from the page loaded in the browser."""
+    with get_metrics().timer('extraction_seconds', kind='listing', source='browser'):
+        records = page.eval_on_selector_all('#eventos ul.events_list li', LISTING_EXTRACT_JS)
+        structured = page.evaluate(STRUCTURED_DATA_EXTRACT_JS) if STRUCTURED_DATA_ENABLED else None
+    return attach_listed_sessions(records, structured_items(structured))
+
+def extract_page_count(page, per_page):
+    """Page count of the listing loaded in the browser (see page_count_from_hints)."""
+    with get_metrics().timer('extraction_seconds', kind='page_count', source='browser'):
+        hints = page.evaluate(PAGE_COUNT_EXTRACT_JS)
+    return page_count_from_hints(hints['maxPage'], hints['counterText'], per_page)
+
+def extract_session_records(page):
+    """Extract the sessions from the details page loaded in the browser (same records as parse_session_records)."""
+    with get_metrics().timer('extraction_seconds', kind='details', source='browser'):
+        records = page.evaluate(SESSIONS_EXTRACT_JS)
+        if not records and STRUCTURED_DATA_ENABLED:
+            records = page_sessions(structured_items(page.evaluate(STRUCTURED_DATA_EXTRACT_JS)))
+        return records
+
+def listing_url(category, month, year, page_number):
+    """Build the search URL for one page of a month's listing in a category (253 is stand-up comedy)."""
+    return f"{BASE_URL}/pesquisa/?category={category}&month={month}&year={year}&page={page_number}"
+
+def search_url(query, category, page_number):
+    """
+    Build the search URL for one page of the results of a text search (e.g. a standup's name),
+    within a category like the listings, so shows of other kinds with the same name are left out.
+    """
+    return f"{BASE_URL}/pesquisa/?{urlencode({SEARCH_PARAM: query, 'category': category, 'page': page_number})}"
+
+def is_empty_listing(records):
+    """If no <li>, or only one and it has class "empty" → no events."""
+    return not records or (len(records) == 1 and records[0]['classes'] == "empty")
+
+def add_listing_events(events, records):
+    """Turn the records of one listing page into Events and append them."""
+    print(f"📦 Found {len(records)} events.")
+
+    for i, record in enumerate(records, start=1):
+        event_obj = listing_record_to_event(record)
+        events.append(event_obj)
+        print(f"✅ Event {i}: {event_obj.title} on {event_obj.date} at {event_obj.location} | Multiple Sessions: {event_obj.has_multi_sessions}")
+
+def open_in_browser(page, url, kind, ready_selector, timeout=TIMEOUT):
+    """
+    Navigate the browser page to `url` and wait for `ready_selector`.
+    Blocks and errors are retried within the retry policy's budgets (blocks after the rate
+    controller's backoff, errors after an exponential delay). Returns False if the page was given up.
+    """
+    while True:
         try:
-            page.goto(url, wait_until=WAIT_UNTIL, timeout=TIMEOUT)
+            started = time.monotonic()
+            response = page.goto(url, wait_until=WAIT_UNTIL, timeout=timeout)
+            latency = time.monotonic() - started
             simulate_human_behavior(page)  # Add human-like behavior
-            
+
             # Check for rate limiting
-            if check_for_rate_limiting(page):
-                handle_rate_limiting()
-                continue
-                
+            blocked = report_response(response.status if response else None, latency, check_for_rate_limiting(page, response), url=url)
+
         except Exception as e:
             print(f"⚠️ Error loading page: {e}")
-            time.sleep(random.uniform(ERROR_WAIT_MIN, ERROR_WAIT_MAX))
+            get_retry_policy().record(url, False)
+            delay = next_retry(kind, url, type(e).__name__)
+            if delay is None:
+                return False
+            time.sleep(retry_pause(delay))
+            pace(url=url)
+            continue
+
+        if blocked:
+            if next_retry(kind, url, 'blocked') is None:
+                return False
+            pace(url=url)  # Waits out the rate controller's backoff
             continue
 
         try:
-            page.wait_for_selector("#eventos", timeout=10000)
-            print("✅ '#eventos' container found.")
+            page.wait_for_selector(ready_selector, state='attached', timeout=READY_SELECTOR_TIMEOUT)  # Script tags are never visible
+            return True
         except TimeoutError:
-            print("⛔ Timeout: '#eventos' not found. Skipping.")
-            break
+            return False
 
-        event_elements = page.locator('#eventos ul.events_list li')
-        # If only one <li> and it has class "empty" → no events
-        if event_elements.count() == 1 and event_elements.first.get_attribute("class") == "empty":
-            print("⚠️ No events found (empty class detected). Moving to next month.")
-            break
+def load_listing_page(page, url, try_http=True):
+    """
+    Load one listing page, over HTTP first and in the browser as a fallback.
+    Returns {'records': [...], 'page_count': n or None}, or None if '#eventos' never showed up.
+    """
+    listing = read_journal('listing', url)
+    if listing is not None:
+        return listing
 
-        print(f"📦 Found {event_elements.count()} events.")
-
-        for i, event in enumerate(event_elements.all(), start=1):
-            classes = event.get_attribute('class') or ''
-            has_multi = 'has_multiple_sessions' in classes
-            title = event.locator('.title').text_content() or 'N/A'
-            date = event.locator('.date').get_attribute('data-date') or 'N/A'
-            location = event.locator('.venues').text_content() or 'N/A'
-            href = event.locator('a').get_attribute('href') or ''
-            full_url = BASE_URL + href if href.startswith('/') else href
-
-            event_obj = Event(
-                title.strip(),
-                date.strip(),
-                location.strip(),
-                has_multi,
-                full_url
-            )
-            events.append(event_obj)
-            print(f"✅ Event {i}: {title.strip()} on {date.strip()} at {location.strip()} | Multiple Sessions: {has_multi}")
+    if not is_fresh_in_cache(url):
+        pace(url=url)  # Paced by how the site has been responding
+    print(f"\n🔍 Checking: {url}")
 
-        page_number += 1
+    listing = fetch_listing_page(url) if FETCH_MODE == 'http' and try_http else None
+    if listing is not None:
+        print("✅ '#eventos' container found (HTTP).")
+        write_journal('listing', url, listing)
+        return listing
 
-    return events
+    if FETCH_MODE == 'http' and try_http:
+        pace(url=url)  # The HTTP attempt took a request slot, and may have made the controller back off
+    if not open_in_browser(page, url, 'listing', LISTING_READY_SELECTOR):
+        print("⛔ '#eventos' not found. Skipping.")
+        return None
+    print("✅ '#eventos' container found.")
+
+    records = extract_listing_records(page)
+    listing = {'records': records, 'page_count': extract_page_count(page, len(records))}
+    get_metrics().inc('pages', kind='listing', source='browser')
+    write_journal('listing', url, listing)
+    return listing
 
-def scrape_additional_sessions(page, event: Event):
-    human_like_delay()  # Use human-like delays
+def fetch_listing_over_http(url):
+    """Load a listing page over HTTP only (for worker threads). Returns None if it needs the browser."""
+    listing = read_journal('listing', url)
+    if listing is not None:
+        return listing
+    if not is_fresh_in_cache(url):
+        pace(url=url)
+    print(f"\n🔍 Checking: {url}")
+    listing = fetch_listing_page(url)
+    if listing is not None:
+        write_journal('listing', url, listing)
+    return listing
+
+def scrape_additional_sessions(page, event: Event, try_http=True, try_browser=True):
+    """
+    Scrape the sessions on an event's details page, over HTTP first and in the browser as a fallback.
+    With try_browser=False, returns None instead of opening the browser (for HTTP worker threads).
+    Sessions the listing's structured data already gave are used without opening the page.
+    """
+    if event.sessions:
+        return listed_sessions(event)
+
+    url = canonical_url(event.detailsPageUrl)  # The URL de-duplication claimed, whichever link came first
+    resumed = read_journal_events('details', url)
+    if resumed is not None:
+        print(f"↩️ {len(resumed)} sessions of '{event.title}' restored from the crawl journal")
+        return resumed
+
+    if not is_fresh_in_cache(url):
+        pace(url=url)  # Paced by how the site has been responding
     print(f"🔍 Opening details page for: {event.title}")
-    
-    try:
-        page.goto(event.detailsPageUrl, wait_until=WAIT_UNTIL, timeout=60000)
-        simulate_human_behavior(page)  # Add human-like behavior
-        
-        # Check for rate limiting
-        if check_for_rate_limiting(page):
-            handle_rate_limiting()
+
+    records = fetch_session_records(url) if FETCH_MODE == 'http' and try_http else None
+    if records is None:
+        if not try_browser:
+            return None
+        if FETCH_MODE == 'http' and try_http:
+            pace(url=url)  # The HTTP attempt took a request slot, and may have made the controller back off
+        if not open_in_browser(page, url, 'details', details_ready_selector(), timeout=60000):
+            print(f"⚠️ No sessions found for {event.title}")
             return []
-            
-    except Exception as e:
-        print(f"⚠️ Error loading details page: {e}")
+
+        records = extract_session_records(page)
+        get_metrics().inc('pages', kind='details', source='browser')
+
+    if not records:
+        print(f"⚠️ No sessions found for {event.title}")
         return []
 
-    extra_events = []
-    # Variant 1: classic sessions list under #sessoes
-    session_elements = page.locator('#sessoes ul.sessions_list li')
-    if session_elements.count() > 0:
-        for session in session_elements.all():
-            if session.locator('.date').count() == 0:
-                print("⚠️ Session is no longer available.")
+    extra_events = session_records_to_events(event, records)
+    print(f"➕ Found {len(extra_events)} extra sessions for {event.title}")
+    write_journal_events('details', url, extra_events)
+    return extra_events
+
+
+class AsyncPagePool:
+    """
+    Bounded pool of browser pages shared by the async crawl workers, spread over several contexts.
+    When a page is challenged, `replace(context, reason, pages)` retires its context and returns
+    the context (and pages) that take its place; the old context's pages are closed as they come
+    back, and its context with the last one.
+    """
+
+    def __init__(self, contexts, replace=None):
+        self.contexts = {context: list(pages) for context, pages in contexts}
+        self._replace = replace
+        self._retired = set()
+        self._pages = asyncio.Queue()
+        for pages in self.contexts.values():
+            for page in pages:
+                self._pages.put_nowait(page)
+
+    @property
+    def pages(self):
+        return [page for pages in self.contexts.values() for page in pages]
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page for one navigation; waits while every page is busy."""
+        page = await self._pages.get()
+        while page.context in self._retired:
+            await self._drop(page)
+            page = await self._pages.get()
+        try:
+            yield page
+        finally:
+            reason = get_block_detector().take_challenge(page) if self._replace else None
+            if reason and page.context not in self._retired:
+                self._retired.add(page.context)
+                context, pages = await self._replace(page.context, reason, len(self.contexts[page.context]))
+                self.contexts[context] = list(pages)
+                for new_page in pages:
+                    self._pages.put_nowait(new_page)
+            if page.context in self._retired:
+                await self._drop(page)
+            else:
+                self._pages.put_nowait(page)
+
+    async def _drop(self, page):
+        context = page.context
+        self.contexts[context].remove(page)
+        if not self.contexts[context]:
+            del self.contexts[context]
+            self._retired.discard(context)
+            await context.close()
+
+    async def close(self):
+        """Close the pool's contexts (and every page in them)."""
+        for context in list(self.contexts):
+            await context.close()
+        self.contexts = {}
+
+async def async_new_browser_context(browser, profile, profiles, pages, policy=None):
+    """Open a browser context for a profile (see browser_context_options) with `pages` pages. Returns (context, pages)."""
+    context = await browser.new_context(**browser_context_options(profile, profiles))
+    await context.add_init_script(STEALTH_INIT_SCRIPT)
+    if policy:
+        await policy.async_attach(context)
+    context_pages = [await context.new_page() for _ in range(pages)]
+    for page in context_pages:
+        get_block_detector().watch(page)
+    restored = " (cookies restored)" if profiles.storage_state(profile) else ""
+    print(f"🕵️ Browser context {profile['id']}: {pages} pages, {describe(profile)}{restored}")
+    return context, context_pages
+
+async def async_open_in_browser(page, budget, url, kind, ready_selector, timeout=TIMEOUT):
+    """Async counterpart of open_in_browser; pacing comes from the shared budget."""
+    while True:
+        try:
+            started = time.monotonic()
+            response = await page.goto(url, wait_until=WAIT_UNTIL, timeout=timeout)
+            latency = time.monotonic() - started
+
+            blocked = report_response(response.status if response else None, latency, await async_check_for_rate_limiting(page, response), url=url)
+
+        except Exception as e:
+            print(f"⚠️ Error loading page: {e}")
+            get_retry_policy().record(url, False)
+            delay = next_retry(kind, url, type(e).__name__)
+            if delay is None:
+                return False
+            await asyncio.sleep(retry_pause(delay))
+            await async_pace(budget, url)
+            continue
+
+        if blocked:
+            if next_retry(kind, url, 'blocked') is None:
+                return False
+            await async_pace(budget, url)  # Waits out the rate controller's backoff
+            continue
+
+        try:
+            await page.wait_for_selector(ready_selector, state='attached', timeout=READY_SELECTOR_TIMEOUT)
+            return True
+        except TimeoutError:
+            return False
+
+async def async_load_listing_page(pool, budget, url):
+    """Async counterpart of load_listing_page; pacing comes from the shared budget."""
+    listing = read_journal('listing', url)
+    if listing is not None:
+        return listing
+
+    if not is_fresh_in_cache(url):
+        await async_pace(budget, url)
+    print(f"\n🔍 Checking: {url}")
+
+    listing = await asyncio.to_thread(fetch_listing_page, url) if FETCH_MODE == 'http' else None
+    if listing is not None:
+        write_journal('listing', url, listing)
+        return listing
+
+    if FETCH_MODE == 'http':
+        await async_pace(budget, url)  # The HTTP attempt took a request slot, and may have made the controller back off
+    async with pool.page() as page:
+        if not await async_open_in_browser(page, budget, url, 'listing', LISTING_READY_SELECTOR):
+            print(f"⛔ '#eventos' not found on {url}. Skipping.")
+            return None
+
+        with get_metrics().timer('extraction_seconds', kind='listing', source='browser'):
+            records = await page.eval_on_selector_all('#eventos ul.events_list li', LISTING_EXTRACT_JS)
+            structured = await page.evaluate(STRUCTURED_DATA_EXTRACT_JS) if STRUCTURED_DATA_ENABLED else None
+            hints = await page.evaluate(PAGE_COUNT_EXTRACT_JS)
+        attach_listed_sessions(records, structured_items(structured))
+        get_metrics().inc('pages', kind='listing', source='browser')
+        listing = {'records': records, 'page_count': page_count_from_hints(hints['maxPage'], hints['counterText'], len(records))}
+        write_journal('listing', url, listing)
+        return listing
+
+async def async_scrape_additional_sessions(pool, budget, event: Event):
+    """Async counterpart of scrape_additional_sessions; pacing comes from the shared budget."""
+    if event.sessions:
+        return listed_sessions(event)
+
+    url = canonical_url(event.detailsPageUrl)  # The URL de-duplication claimed, whichever link came first
+    resumed = read_journal_events('details', url)
+    if resumed is not None:
+        print(f"↩️ {len(resumed)} sessions of '{event.title}' restored from the crawl journal")
+        return resumed
+
+    if not is_fresh_in_cache(url):
+        await async_pace(budget, url)
+    print(f"🔍 Opening details page for: {event.title}")
+
+    records = await asyncio.to_thread(fetch_session_records, url) if FETCH_MODE == 'http' else None
+    if records is None:
+        if FETCH_MODE == 'http':
+            await async_pace(budget, url)  # The HTTP attempt took a request slot, and may have made the controller back off
+        async with pool.page() as page:
+            if not await async_open_in_browser(page, budget, url, 'details', details_ready_selector(), timeout=60000):
+                print(f"⚠️ No sessions found for {event.title}")
+                return []
+
+            with get_metrics().timer('extraction_seconds', kind='details', source='browser'):
+                records = await page.evaluate(SESSIONS_EXTRACT_JS)
+                if not records and STRUCTURED_DATA_ENABLED:
+                    records = page_sessions(structured_items(await page.evaluate(STRUCTURED_DATA_EXTRACT_JS)))
+            get_metrics().inc('pages', kind='details', source='browser')
+
+    if not records:
+        print(f"⚠️ No sessions found for {event.title}")
+        return []
+
+    extra_events = session_records_to_events(event, records)
+    print(f"➕ Found {len(extra_events)} extra sessions for {event.title}")
+    write_journal_events('details', url, extra_events)
+    return extra_events
+
+def get_crawl_months():
+    """Return the (month, year) pairs to crawl: the current month + the next CRAWL_MONTHS - 1."""
+    today = datetime.today().date()
+    months = []
+    for i in range(CRAWL_MONTHS):
+        month = (today.month + i - 1) % 12 + 1
+        year = today.year + ((today.month + i - 1) // 12)
+        months.append((month, year))
+    return months
+
+def get_crawl_targets():
+    """Return the (category, month, year) listings to crawl: every month of every category."""
+    return [(category, month, year) for category in CATEGORIES for month, year in get_crawl_months()]
+
+def get_browser_args():
+    """Chromium launch arguments for the current settings."""
+    browser_args = list(BROWSER_ARGS)
+
+    if DISABLE_JAVASCRIPT:
+        browser_args.append('--disable-javascript')
+
+    return browser_args
+
+def create_resource_policy():
+    """Build the request blocking policy from the settings, or None if blocking is disabled."""
+    if not BLOCK_RESOURCES:
+        return None
+
+    blocked_types = list(BLOCKED_RESOURCE_TYPES)
+    if DISABLE_IMAGES:
+        blocked_types.append('image')
+
+    return ResourcePolicy(blocked_types, BLOCKED_DOMAINS, BLOCKED_BYTES_ESTIMATE)
+
+def details_visit_needed(event, tracker):
+    """Check with the incremental tracker (if any) whether an event's details page has to be opened."""
+    if tracker and not tracker.needs_visit(event):
+        get_metrics().inc('details_skipped', reason='incremental')
+        return False
+    return True
+
+class DetailsPageRegistry:
+    """
+    De-duplicates details pages within a run. A multi-session show is listed in every month it
+    plays, so the same page shows up several times: only the first link to each canonical URL
+    is opened, and sessions already emitted (same title, date and venue) are dropped.
+    """
+
+    def __init__(self):
+        self.requested = 0
+        self.duplicate_sessions = 0
+        self._claimed = set()
+        self._sessions = set()
+
+    def claim(self, event):
+        """Check if an event's details page still has to be opened in this run, and claim it."""
+        self.requested += 1
+        url = canonical_url(event.detailsPageUrl)
+        if url in self._claimed:
+            print(f"🔁 Details page of '{event.title}' already opened in this run")
+            get_metrics().inc('details_skipped', reason='duplicate')
+            return False
+        self._claimed.add(url)
+        return True
+
+    def merge(self, sessions):
+        """Drop the sessions that were already emitted in this run."""
+        merged = []
+        for session in sessions:
+            key = (session.title, session.date, session.location)
+            if key in self._sessions:
+                self.duplicate_sessions += 1
                 continue
-            date_attr = session.locator('.date').get_attribute('content') or ''
-            title_text = event.title + " - " + session.locator('.details').get_attribute('content') or event.title
-            venue_text = session.locator('.venue').text_content() or ''
-            district_text = session.locator('.district').text_content() or ''
+            self._sessions.add(key)
+            merged.append(session)
+        return merged
 
-            # Build the location string same as in main scrape
-            location_str = f"{venue_text.strip()} - {district_text.strip()}".strip(" -")
+    def summary(self):
+        """One-line human readable summary of what de-duplication saved."""
+        return (
+            f"Details pages: {self.requested} links, {len(self._claimed)} unique, "
+            f"{self.requested - len(self._claimed)} navigations saved, {self.duplicate_sessions} duplicate sessions merged"
+        )
 
-            href = session.locator('a').get_attribute('href') or ''
-            full_url = BASE_URL + href if href.startswith('/') else href
+def listing_task(category, month, year, page_number, **hints):
+    """Crawl task for one listing page. `hints` (page_count, per_page) come from the month's first page."""
+    return (
+        'listing',
+        listing_url(category, month, year, page_number),
+        {'category': category, 'month': month, 'year': year, 'page': page_number, **hints}
+    )
 
-            extra_events.append(Event(
-                title=title_text.strip(),
-                date=date_attr.strip(),
-                location=location_str,
-                has_multi_sessions=False,
-                detailsPageUrl=full_url
-            ))
+def search_task(query, category, page_number, **hints):
+    """Crawl task for one page of a search's results in a category, with the same hints as listing_task."""
+    return ('listing', search_url(query, category, page_number), {'query': query, 'category': category, 'page': page_number, **hints})
 
-        print(f"➕ Found {len(extra_events)} extra sessions for {event.title}")
-        return extra_events
+def listing_page_task(payload, page_number, **hints):
+    """The task of another page of the same listing (a category month, or a search) as `payload`."""
+    if 'query' in payload:
+        return search_task(payload['query'], payload['category'], page_number, **hints)
+    return listing_task(payload['category'], payload['month'], payload['year'], page_number, **hints)
 
-    # Variant 2: available events list under #eventList.available_events
-    available_container = page.locator('#eventList.available_events')
-    if available_container.count() > 0:
-        alt_items = available_container.locator('ul.events_list li')
-        if alt_items.count() == 0:
-            alt_items = available_container.locator('ul.list.events_list li')
-            if alt_items.count() == 0:
-                alt_items = available_container.locator('li')
-
-        for item in alt_items.all():
-            # Date can be in content or data-date
-            date_attr = (
-                item.locator('.date').get_attribute('content')
-                or item.locator('.date').get_attribute('data-date')
-                or ''
-            )
-            if not date_attr:
-                # Skip if we cannot determine a date
+def task_url(payload):
+    """The URL of a listing task's page."""
+    return listing_page_task(payload, payload['page'])[1]
+
+def listing_label(payload):
+    """How a listing task's listing is named in the log: 'month/year' or the search query."""
+    return f"'{payload['query']}'" if 'query' in payload else f"{payload['month']}/{payload['year']}"
+
+def event_month(event):
+    """(month, year) of an event's date, or None if it has no date ('N/A')."""
+    match = re.match(r'(\d{4})-(\d{2})', event.date or '')
+    return (int(match.group(2)), int(match.group(1))) if match else None
+
+def current_month():
+    today = datetime.today().date()
+    return today.month, today.year
+
+def months_ahead(month, year):
+    """How many months from the current one (0) a month is."""
+    today = datetime.today().date()
+    return (year - today.year) * 12 + month - today.month
+
+def in_crawl_window(event):
+    """Check if an event is in one of the crawled months (search results can be in any month). Undated events are kept."""
+    month = event_month(event)
+    return month is None or 0 <= months_ahead(*month) < CRAWL_MONTHS
+
+def plan_listing(payload, listing, matcher):
+    """
+    Split a scraped listing page of a crawl task into (events, multi_session_events, next_pages):
+    the events to emit as they are, the matching multi-session events whose sessions replace them,
+    and the tasks of the listing's next pages (all of them from the first page when it has a
+    paginator, otherwise one at a time until an empty page).
+    """
+    records = listing['records']
+    events = []
+    add_listing_events(events, records)
+
+    page_number = payload['page']
+    page_count = payload.get('page_count') or listing['page_count']
+    per_page = max(1, payload.get('per_page') or len(records))
+    numbers = []
+    if records:  # An empty page ends the listing
+        if page_number == 1 and page_count:
+            print(f"📑 {page_count} result pages for {listing_label(payload)}")
+            numbers.extend(range(2, page_count + 1))
+        # Past the paginator (or without one), a full page means there may be more
+        if page_number >= (page_count or 0) and (not page_count or len(records) >= per_page):
+            numbers.append(page_number + 1)
+    next_pages = [listing_page_task(payload, number, page_count=page_count, per_page=per_page) for number in numbers]
+
+    multi_session_events = [
+        event for event in events
+        if event.has_multi_sessions and find_matching_standup(event.title, matcher)
+    ]
+    return [event for event in events if event not in multi_session_events], multi_session_events, next_pages
+
+def crawl_task_priority(kind, payload):
+    """
+    Priority of a page in a scheduled crawl (lower goes first): nearer months first and, within a
+    month, its listing pages in order, then the details pages of its matching shows. So the
+    details pages of this month's standups come before the listing pages of later months.
+    Search results span every month: they rank with the current month's listing pages.
+    """
+    if kind == 'listing':
+        ahead = months_ahead(payload['month'], payload['year']) if 'month' in payload else 0
+        return (ahead, 0, payload['page'])
+    return (months_ahead(payload['month'], payload['year']), 1, 0)
+
+def get_discovery_planner():
+    return DiscoveryPlanner(DISCOVERY_STATE_PATH, CATEGORY_PAGES_ESTIMATE, SEARCH_PAGES_ESTIMATE)
+
+def discovery_tasks(standups, planner=None):
+    """
+    The first listing pages of a run: every (category, month) target for the category crawl, or
+    one search per standup (see search_queries) and category when DISCOVERY_MODE picks the search.
+    Returns (mode, tasks).
+    """
+    planner = planner or get_discovery_planner()
+    targets = get_crawl_targets()
+    queries = search_queries(name for _, name in standups)
+    mode, estimates = planner.choose(DISCOVERY_MODE, len(targets), len(queries) * len(CATEGORIES))
+    print(f"🧭 {planner.summary(mode, estimates)}")
+    if mode == 'search':
+        return mode, [search_task(query, category, 1) for query in queries for category in CATEGORIES]
+    return mode, [listing_task(category, month, year, 1) for category, month, year in targets]
+
+class ScheduledCrawl:
+    """
+    A crawl run ordered by a CrawlScheduler (see crawl_task_priority), shared by the sync and async
+    crawls: seeds the first listing pages (see discovery_tasks), and turns each scraped page into
+    the events to emit and the pages it leads to. Each details page is opened once per run (see
+    DetailsPageRegistry), and with a DetailsTracker, details pages whose sessions are all stored
+    already are not opened. Search results outside the crawled months are dropped, and events
+    found by several searches are emitted once.
+    """
+
+    def __init__(self, matcher, tracker=None):
+        self.matcher = matcher
+        self.tracker = tracker
+        self.details = DetailsPageRegistry()
+        self.scheduler = CrawlScheduler(RUN_DEADLINE_SECONDS)
+        self.planner = get_discovery_planner()
+        self.mode, tasks = discovery_tasks(matcher.standups, self.planner)
+        self.seeds = len(tasks)
+        self.listing_pages = 0
+        self.duplicate_results = 0
+        self._listed = set()
+        for task in tasks:
+            self.push(task)
+
+    def push(self, task):
+        kind, _, payload = task
+        self.scheduler.push(crawl_task_priority(kind, payload), task)
+
+    def listing_done(self, payload, listing):
+        """Schedule what a scraped listing page (None if it never loaded) leads to. Returns the events to emit."""
+        if listing is not None:
+            self.listing_pages += 1
+        if listing is None or is_empty_listing(listing['records']):
+            print(f"⚠️ No more events for {listing_label(payload)}.")
+            return []
+
+        events, multi_session_events, next_pages = plan_listing(payload, listing, self.matcher)
+        for task in next_pages:
+            self.push(task)
+        if 'query' in payload:
+            events = self.new_results(events)
+            multi_session_events = self.new_results(multi_session_events)
+
+        # Multi-session events are replaced by the sessions on their details page
+        for event in multi_session_events:
+            if not self.details.claim(event) or not details_visit_needed(event, self.tracker):
                 continue
+            if event.sessions:
+                events.extend(self.details_done(event, listed_sessions(event)))
+            else:
+                month, year = (payload['month'], payload['year']) if 'month' in payload else event_month(event) or current_month()
+                self.push(('details', canonical_url(event.detailsPageUrl), {'month': month, 'year': year, 'event': event}))
+        return events
 
-            title_text = (
-                event.title + " - " + item.locator('.title').text_content()
-                or event.title + " - " + item.locator('[itemprop="name"]').text_content()
-                or event.title
-            )
-            venue_text = (
-                item.locator('.venues').text_content()
-                or item.locator('.venue').text_content()
-                or ''
-            )
-            href = item.locator('a').get_attribute('href') or ''
-            full_url = BASE_URL + href if href.startswith('/') else href
-
-            extra_events.append(Event(
-                title=title_text.strip(),
-                date=date_attr.strip(),
-                location=venue_text.strip(),
-                has_multi_sessions=False,
-                detailsPageUrl=full_url
-            ))
-
-        print(f"➕ Found {len(extra_events)} extra sessions for {event.title}")
-        return extra_events
-
-    print(f"⚠️ No sessions found for {event.title}")
-    return []
-
-
-# Main execution
-try:
-    with sync_playwright() as p:
-        # Launch browser with anti-detection settings
-        browser_args = [
-            '--no-sandbox',
-            '--disable-blink-features=AutomationControlled',
-            '--disable-dev-shm-usage',
-            '--disable-extensions',
-            '--disable-plugins',
-            '--disable-gpu',
-            '--no-first-run',
-            '--no-default-browser-check',
-            '--disable-background-timer-throttling',
-            '--disable-backgrounding-occluded-windows',
-            '--disable-renderer-backgrounding',
-            '--disable-features=TranslateUI',
-            '--disable-ipc-flooding-protection'
-        ]
-        
-        if DISABLE_IMAGES:
-            browser_args.append('--disable-images')
-        
-        if DISABLE_JAVASCRIPT:
-            browser_args.append('--disable-javascript')
-        
-        browser = p.chromium.launch(
+    def new_results(self, events):
+        """The search results within the crawled months that no other search returned yet."""
+        new = []
+        for event in events:
+            key = (event.title, event.date, event.location)
+            if key in self._listed:
+                self.duplicate_results += 1
+            elif in_crawl_window(event):
+                self._listed.add(key)
+                new.append(event)
+        return new
+
+    def details_done(self, event, extra):
+        """Record the sessions of a details page. Returns the ones not emitted yet in this run."""
+        if self.tracker and extra:
+            self.tracker.record(event, session_keys(extra, self.matcher))
+        return self.details.merge(extra)
+
+    def finish(self, policy=None):
+        """Print the run's summaries. Returns True if every page was crawled (the deadline didn't cut the run short)."""
+        print(f"\n🔁 {self.details.summary()}")
+        if policy:
+            print(f"\n🧱 {policy.summary()}")
+        complete = self.scheduler.finished
+        print(f"\n{'🗓️' if complete else '⏰'} {self.scheduler.summary()}")
+        if self.mode == 'search':
+            print(f"🔎 Search: {self.seeds} searches, {self.listing_pages} result pages, {self.duplicate_results} duplicate results merged")
+        if complete:
+            self.planner.record(self.mode, self.seeds, self.listing_pages)
+            self.planner.save()
+        return complete
+
+def fetch_task_over_http(task):
+    """Scrape a crawl task's page over HTTP only (for worker threads). Returns None if it needs the browser."""
+    if FETCH_MODE != 'http':
+        return None
+    kind, url, payload = task
+    if kind == 'listing':
+        return fetch_listing_over_http(url)
+    return scrape_additional_sessions(None, payload['event'], try_browser=False)
+
+def run_sync_crawl(session, matcher, emit, tracker=None):
+    """
+    Crawl every month and the details pages of matching multi-session events, most valuable pages
+    first (see ScheduledCrawl). In HTTP mode, CRAWL_CONCURRENCY worker threads fetch the next pages
+    in parallel (paced by the shared budget), and the pages HTTP couldn't load are opened one by one
+    in the session's browser. Events are handed to `emit` as soon as they are scraped.
+    Returns False if RUN_DEADLINE_SECONDS stopped the crawl before every page was scraped.
+    """
+    crawl = ScheduledCrawl(matcher, tracker)
+    scheduler = crawl.scheduler
+    workers = CRAWL_CONCURRENCY if FETCH_MODE == 'http' else 1
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        while True:
+            while len(running) < workers:
+                task = scheduler.pop()
+                if task is None:
+                    break
+                running[executor.submit(fetch_task_over_http, task)] = task
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                kind, url, payload = running.pop(future)
+                result = future.result()
+                if kind == 'listing':
+                    if result is None:
+                        result = load_listing_page(session.page(), url, try_http=False)
+                    emit(crawl.listing_done(payload, result))
+                else:
+                    event = payload['event']
+                    if result is None:
+                        result = scrape_additional_sessions(session.page(), event, try_http=False)
+                    emit(crawl.details_done(event, result))
+                scheduler.task_done()
+
+    return crawl.finish(session.policy)
+
+async def run_async_crawl(session, matcher, emit, tracker=None):
+    """
+    Crawl the pages of run_sync_crawl concurrently over a bounded pool of pages, most valuable
+    first: each worker takes the next page of the schedule as soon as it is free.
+    Emits the same events as run_sync_crawl, in the order they finish.
+    `emit` may block (bounded queue), so it runs off the event loop.
+    """
+    budget = get_rate_budget()
+    crawl = ScheduledCrawl(matcher, tracker)
+    scheduler = crawl.scheduler
+    changed = asyncio.Event()
+    pool = await session.new_page_pool()
+
+    async def worker():
+        while True:
+            task = scheduler.pop()
+            if task is None:
+                if scheduler.finished or scheduler.expired:
+                    return
+                # Pages being scraped may still lead to more
+                changed.clear()
+                await changed.wait()
+                continue
+
+            kind, url, payload = task
+            try:
+                if kind == 'listing':
+                    events = crawl.listing_done(payload, await async_load_listing_page(pool, budget, url))
+                else:
+                    event = payload['event']
+                    events = crawl.details_done(event, await async_scrape_additional_sessions(pool, budget, event))
+                await asyncio.to_thread(emit, events)
+            finally:
+                scheduler.task_done()
+                changed.set()
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(ASYNC_PAGE_POOL_SIZE, CRAWL_CONCURRENCY))))
+    finally:
+        await session.release(pool)
+
+    return crawl.finish(session.policy)
+
+def get_work_queue(db_pool):
+    """The task queue shared by the workers of a distributed crawl, with its table created."""
+    queue = WorkQueue(db_pool, WORK_QUEUE_TABLE, TASK_LEASE_SECONDS, TASK_MAX_ATTEMPTS)
+    queue.create_table()
+    return queue
+
+def seed_crawl(db_pool):
+    """Start a distributed run: queue the first listing pages of the run (see discovery_tasks). Returns the run id."""
+    queue = get_work_queue(db_pool)
+    with UnitOfWork(db_pool) as uow:
+        standups = get_standups_from_db(uow)
+    run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{random.randrange(16 ** 4):04x}"
+    mode, tasks = discovery_tasks(standups)
+    added = queue.add(run_id, tasks)
+    print(f"🌱 Seeded run {run_id} with {added} listing tasks ({mode})")
+    return run_id
+
+def run_listing_task(page, queue, run_id, payload, matcher, emit, tracker=None):
+    """
+    Scrape one listing page of a distributed run. Queues the month's next pages and the details
+    pages of matching multi-session events (see plan_listing), and emits the other events.
+    """
+    url = task_url(payload)
+    listing = load_listing_page(page, url)
+    if listing is None:
+        raise RuntimeError(f"'#eventos' never showed up on {url}")
+    records = listing['records']
+    if is_empty_listing(records):
+        print(f"⚠️ No more events for {listing_label(payload)}.")
+        return {'events': 0}
+
+    events, multi_session_events, tasks = plan_listing(payload, listing, matcher)
+    if 'query' in payload:
+        # Duplicates across searches are left to the writer, which skips stored events
+        events = [event for event in events if in_crawl_window(event)]
+        multi_session_events = [event for event in multi_session_events if in_crawl_window(event)]
+    tasks.extend(
+        ('details', canonical_url(event.detailsPageUrl), {'event': asdict(event)})
+        for event in multi_session_events
+        if not event.sessions and details_visit_needed(event, tracker)
+    )
+    queue.add(run_id, tasks)  # Already queued pages (e.g. a show listed in two months) are skipped
+
+    emit(events)
+    for event in multi_session_events:
+        if event.sessions:
+            emit(listed_sessions(event))
+    return {'events': len(events) + len(multi_session_events), 'queued': len(tasks)}
+
+def run_details_task(page, payload, matcher, emit, tracker=None):
+    """Scrape one details page of a distributed run and emit its sessions."""
+    event = Event(**payload['event'])
+    extra = scrape_additional_sessions(page, event)
+    if tracker and extra:
+        tracker.record(event, session_keys(extra, matcher))
+    emit(extra)
+    return {'events': len(extra)}
+
+def run_queue_crawl(session, queue, run_id, matcher, emit, tracker=None):
+    """
+    Work on a distributed run until it has no tasks left: claim a task, scrape it, mark it done.
+    A task that raises goes back to the queue for another attempt (possibly on another worker).
+    While the remaining tasks are leased by other workers, waits for them to finish or expire.
+    Past RUN_DEADLINE_SECONDS, the worker stops claiming tasks and returns False; what is left
+    stays in the queue for the other workers (or a later --worker run).
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"👷 Worker {worker} on run {run_id}")
+    started = time.monotonic()
+    complete = True
+    while True:
+        if RUN_DEADLINE_SECONDS is not None and time.monotonic() - started >= RUN_DEADLINE_SECONDS:
+            print(f"\n⏰ Deadline of {RUN_DEADLINE_SECONDS:.0f}s reached, leaving the remaining tasks to the other workers")
+            complete = False
+            break
+        task = queue.claim(run_id, worker)
+        if task is None:
+            if queue.open_count(run_id) == 0:
+                break
+            time.sleep(WORKER_POLL_SECONDS)
+            continue
+
+        print(f"\n📋 Task {task['id']} ({task['kind']}, attempt {task['attempts']}): {task['key']}")
+        try:
+            if task['kind'] == 'listing':
+                result = run_listing_task(session.page(), queue, run_id, task['payload'], matcher, emit, tracker)
+            else:
+                result = run_details_task(session.page(), task['payload'], matcher, emit, tracker)
+        except Exception as e:
+            print(f"⚠️ Task {task['id']} failed: {e}")
+            get_metrics().inc('tasks', kind=task['kind'], outcome='failed')
+            queue.fail(task, e)
+            if isinstance(e, CircuitBreakerOpen):
+                raise  # The site is down for this worker: stop claiming tasks
+            continue
+
+        if queue.complete(task, result):
+            get_metrics().inc('tasks', kind=task['kind'], outcome='done')
+        else:
+            print(f"⚠️ Task {task['id']} was taken over by another worker (lease expired)")
+            get_metrics().inc('tasks', kind=task['kind'], outcome='lease_lost')
+
+    print(f"\n🗂️ {queue.summary(run_id)}")
+    if session.policy:
+        print(f"\n🧱 {session.policy.summary()}")
+    return complete
+
+class BrowserSession:
+    """
+    Chromium kept open across runs for the sync crawl, with one context per browser profile
+    (BROWSER_CONTEXTS of them), used in turn between units of work. Each context keeps its
+    profile's fingerprint and saves its cookies and storage when closed, so they survive recycles
+    and restarts. A context that gets challenged is closed and its profile retired.
+    A context (and its page) is recycled after BROWSER_RECYCLE_NAVIGATIONS navigations, and the
+    whole browser is relaunched once the process tree uses more than BROWSER_RECYCLE_RSS_MB.
+    Recycling only happens between units of work (a listing page, a details page), in page().
+    """
+
+    def __init__(self):
+        self.policy = create_resource_policy()
+        self.profiles = get_browser_profiles()
+        self.navigations = 0
+        self.context_recycles = 0
+        self.contexts_retired = 0
+        self.browser_launches = 0
+        self._playwright = sync_playwright().start()
+        self._browser = None
+        self._slots = {}
+        self._current = None
+        self._turn = 0
+
+    def _launch(self):
+        self._browser = self._playwright.chromium.launch(
             headless=HEADLESS,
-            args=browser_args
+            args=get_browser_args()
         )
-        
-        # Create context with additional settings
-        context = browser.new_context(
-            viewport=None,  # Will be set by setup_anti_detection
-            user_agent=None,  # Will be set by setup_anti_detection
-            locale='pt-PT',
-            timezone_id='Europe/Lisbon',
-            permissions=['geolocation'],
-            extra_http_headers={
-                'Accept-Language': 'pt-PT,pt;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
-        )
-        
-        page = context.new_page()
-        setup_anti_detection(page)  # Apply anti-detection measures
+        self.browser_launches += 1
 
-        today = datetime.today().date()
-        main_events = []
-        all_events = []
-        
-        for i in range(4):
-        # for i in range(3):  # current month + next 2
-            month = (today.month + i - 1) % 12 + 1
-            year = today.year + ((today.month + i - 1) // 12)
-            month_events = scrape_events_for_month(page, month, year)
-            main_events.extend(month_events)
-
-        standups = get_standups_from_db()
-        
-        # It checks multi-sessions events
-        for event in main_events[:]:  # iterate over a copy so we can extend the list
-            if event.has_multi_sessions and find_matching_standup(event.title, standups) :
-                extra = scrape_additional_sessions(page, event)
-                all_events.extend(extra)
-            else:
-                all_events.append(event)
+    def _open(self, profile):
+        context = self._browser.new_context(**browser_context_options(profile, self.profiles))
+        context.add_init_script(STEALTH_INIT_SCRIPT)
+        if self.policy:
+            self.policy.attach(context)
 
-        browser.close()
+        slot = {'profile': profile, 'context': context, 'page': context.new_page(), 'navigations': 0}
+        get_block_detector().watch(slot['page'])
+        slot['page'].on('framenavigated', lambda frame: self._on_navigated(slot, frame))
+        self._slots[profile['id']] = slot
+        restored = " (cookies restored)" if self.profiles.storage_state(profile) else ""
+        print(f"🕵️ Browser context {profile['id']}: {describe(profile)}{restored}")
+        return slot
 
-        print("\n--- ✅ All Events Found ---")
-        for event in all_events:
-            print(event)
+    def _close(self, slot, save=True):
+        """Close a context, keeping its cookies and storage for the next one of its profile."""
+        self._slots.pop(slot['profile']['id'], None)
+        try:
+            if save:
+                self.profiles.save_storage(slot['profile'], slot['context'].storage_state())
+        except (Error, OSError) as e:
+            print(f"⚠️ Could not save the storage of browser context {slot['profile']['id']}: {e}")
+        finally:
+            slot['context'].close()
+
+    def _close_all(self):
+        for slot in list(self._slots.values()):
+            self._close(slot)
+        self._current = None
+
+    def _on_navigated(self, slot, frame):
+        if frame.parent_frame is None:
+            self.navigations += 1
+            slot['navigations'] += 1
+
+    def page(self):
+        """
+        Return the page of the next context in turn, retiring the one just used if it was
+        challenged and recycling it or the browser first if they are due.
+        """
+        rss = process_tree_rss_mb()
+        if self._browser and rss is not None and rss > BROWSER_RECYCLE_RSS_MB:
+            print(f"♻️ Process tree uses {rss:.0f} MB, relaunching the browser")
+            self._close_all()
+            self._browser.close()
+            self._browser = None
+
+        slot = self._current
+        reason = get_block_detector().take_challenge(slot['page']) if slot else None
+        if reason:
+            self._close(slot, save=False)
+            self.profiles.retire(slot['profile'], reason)
+            self.contexts_retired += 1
+        elif slot and slot['navigations'] >= BROWSER_RECYCLE_NAVIGATIONS:
+            print(f"♻️ {slot['navigations']} navigations on browser context {slot['profile']['id']}, recycling it")
+            self._close(slot)
+            self.context_recycles += 1
+
+        if self._browser is None:
+            self._launch()
+        profiles = self.profiles.profiles
+        profile = profiles[self._turn % len(profiles)]
+        self._turn += 1
+        self._current = self._slots.get(profile['id']) or self._open(profile)
+        return self._current['page']
+
+    def save_storage(self):
+        """Save the cookies and storage of every open context."""
+        for slot in self._slots.values():
+            try:
+                self.profiles.save_storage(slot['profile'], slot['context'].storage_state())
+            except (Error, OSError) as e:
+                print(f"⚠️ Could not save the storage of browser context {slot['profile']['id']}: {e}")
+
+    def crawl(self, matcher, emit, tracker=None):
+        try:
+            return run_sync_crawl(self, matcher, emit, tracker)
+        finally:
+            self.save_storage()
+
+    def stats(self):
+        return {
+            'mode': 'sync',
+            'navigations': self.navigations,
+            'context_recycles': self.context_recycles,
+            'contexts_retired': self.contexts_retired,
+            'browser_launches': self.browser_launches,
+            'profiles': self.profiles.stats(),
+            'rss_mb': process_tree_rss_mb()
+        }
+
+    def close(self):
+        if self._browser:
+            self._close_all()
+            self._browser.close()
+        self._playwright.stop()
+
+class AsyncBrowserSession:
+    """
+    Chromium kept open across runs for the async crawl, on an event loop owned by the session.
+    Each run gets a page pool spread over one context per browser profile (up to BROWSER_CONTEXTS),
+    opened with the profile's fingerprint and saved cookies and storage; a context that gets
+    challenged is replaced by one for a new profile. The browser is relaunched once the
+    process tree uses more than BROWSER_RECYCLE_RSS_MB.
+    """
+
+    def __init__(self):
+        self.policy = create_resource_policy()
+        self.profiles = get_browser_profiles()
+        self.navigations = 0
+        self.context_recycles = 0
+        self.contexts_retired = 0
+        self.browser_launches = 0
+        self._loop = asyncio.new_event_loop()
+        self._playwright = self._loop.run_until_complete(async_playwright().start())
+        self._browser = None
+        self._context_profiles = {}
+
+    async def _open(self, profile, pages):
+        context, context_pages = await async_new_browser_context(self._browser, profile, self.profiles, pages, self.policy)
+        self._context_profiles[context] = profile
+        for page in context_pages:
+            page.on('framenavigated', self._on_navigated)
+        return context, context_pages
+
+    async def _replace(self, context, reason, pages):
+        """Retire the profile of a challenged context and open one for its replacement."""
+        profile = self._context_profiles.pop(context)
+        self.contexts_retired += 1
+        replacement = self.profiles.retire(profile, reason)
+        if replacement is None:  # Already retired by another run of the process
+            replacement = self.profiles.profiles[0]
+        return await self._open(replacement, pages)
+
+    async def new_page_pool(self):
+        """Create the page pool for one run, relaunching the browser first if it is due."""
+        rss = process_tree_rss_mb()
+        if self._browser and rss is not None and rss > BROWSER_RECYCLE_RSS_MB:
+            print(f"♻️ Process tree uses {rss:.0f} MB, relaunching the browser")
+            await self._browser.close()
+            self._browser = None
+        if self._browser is None:
+            self._browser = await self._playwright.chromium.launch(headless=HEADLESS, args=get_browser_args())
+            self.browser_launches += 1
+
+        profiles = self.profiles.profiles[:max(1, min(BROWSER_CONTEXTS, ASYNC_PAGE_POOL_SIZE))]
+        contexts = []
+        for index, profile in enumerate(profiles):
+            pages = ASYNC_PAGE_POOL_SIZE // len(profiles) + (index < ASYNC_PAGE_POOL_SIZE % len(profiles))
+            contexts.append(await self._open(profile, pages))
+        return AsyncPagePool(contexts, replace=self._replace)
+
+    async def release(self, pool):
+        """Save the cookies and storage of a finished run's contexts, then close them."""
+        for context in pool.contexts:
+            profile = self._context_profiles.pop(context, None)
+            if profile is None:
+                continue
+            try:
+                self.profiles.save_storage(profile, await context.storage_state())
+            except (Error, OSError) as e:
+                print(f"⚠️ Could not save the storage of browser context {profile['id']}: {e}")
+        await pool.close()
+        self.context_recycles += 1
+
+    def _on_navigated(self, frame):
+        if frame.parent_frame is None:
+            self.navigations += 1
+
+    def crawl(self, matcher, emit, tracker=None):
+        return self._loop.run_until_complete(run_async_crawl(self, matcher, emit, tracker))
+
+    def stats(self):
+        return {
+            'mode': 'async',
+            'navigations': self.navigations,
+            'context_recycles': self.context_recycles,
+            'contexts_retired': self.contexts_retired,
+            'browser_launches': self.browser_launches,
+            'profiles': self.profiles.stats(),
+            'rss_mb': process_tree_rss_mb()
+        }
+
+    def close(self):
+        if self._browser:
+            self._loop.run_until_complete(self._browser.close())
+        self._loop.run_until_complete(self._playwright.stop())
+        self._loop.close()
+
+def create_browser_session():
+    """Start the browser session for the configured crawl mode."""
+    return AsyncBrowserSession() if CRAWL_MODE == 'async' else BrowserSession()
+
+
+def write_run_report(status, db_pool, session, pipeline=None, error=None):
+    """Write the JSON run report (and the Prometheus textfile, if configured) for the run that just ended."""
+    metrics = get_metrics()
+    metrics.inc('runs', status=status)
+    extra = {
+        'status': status,
+        'error': str(error) if error else None,
+        'crawl_mode': CRAWL_MODE,
+        'fetch_mode': FETCH_MODE,
+        'pacing': get_rate_budget().stats(),
+        'db_pool': db_pool.stats(),
+        'browser': session.stats(),
+        'blocks': dict(get_block_detector().reasons),
+        'retries': get_retry_policy().stats()
+    }
+    if pipeline:
+        extra['pipeline'] = {
+            'events': pipeline.items,
+            'batches': pipeline.batches,
+            'max_latency_seconds': round(pipeline.max_latency, 3),
+            'peak_queue': pipeline.peak_depth
+        }
+    if get_page_cache():
+        extra['page_cache'] = {key: value for key, value in get_page_cache().stats().items() if key != 'entries'}
+
+    try:
+        metrics.write_json(RUN_REPORT_PATH, **extra)
+        print(f"📊 Run report written to {RUN_REPORT_PATH}")
+        if PROMETHEUS_TEXTFILE_PATH:
+            metrics.write_prometheus(PROMETHEUS_TEXTFILE_PATH)
+    except OSError as e:
+        print(f"⚠️ Could not write the run report: {e}")
+
+def run_crawl(db_pool, session, queue=None, run_id=None):
+    """
+    One full run: load the standups, then crawl with the (already open) browser session while a
+    pipeline saves the events in micro-batches as they come. Returns the number of events found.
+    Scraped pages are journaled as they come, so a run that fails resumes where it stopped.
+    With a work queue, the session works on tasks of the distributed run `run_id` instead
+    (the queue keeps track of what was scraped, so there is no journal).
+    When RUN_DEADLINE_SECONDS cuts the crawl short, what was scraped is still saved and the run
+    ends as 'partial', keeping the journal so that the next run starts with those pages.
+    A run report with timings and counters is written at the end, whether the run failed or not.
+    """
+    metrics = get_metrics()
+    metrics.reset()
+    get_retry_policy().reset()
+    # The run report covers this run only, while the pacing rate, cache and pool carry over
+    get_rate_budget().reset_stats()
+    get_block_detector().reset_stats()
+    db_pool.reset_stats()
+    if get_page_cache():
+        get_page_cache().reset_stats()
+    journal = open_crawl_journal() if queue is None else None
+    pipeline = None
+    try:
+        # One connection for the whole run, committed at each checkpoint
+        with UnitOfWork(db_pool) as uow:
+            with metrics.timer('phase_seconds', phase='load_standups'):
+                standups = get_standups_from_db(uow)
+                tracker = DetailsTracker(DETAILS_STATE_PATH, get_known_event_keys(uow)) if INCREMENTAL_MODE else None
+                uow.checkpoint("standups loaded")  # Don't keep a transaction open while crawling
+                matcher = StandupMatcher(standups)  # Built once, shared by the crawl and the save
+                writer = EventWriter(matcher, uow)
+
+            # The crawl produces, the writer consumes on its own thread (the only one using the connection)
+            pipeline = BatchingPipeline(writer.write, PIPELINE_QUEUE_SIZE, PIPELINE_BATCH_SIZE, PIPELINE_FLUSH_SECONDS).start()
+            try:
+                with metrics.timer('phase_seconds', phase='crawl'):
+                    if queue:
+                        complete = run_queue_crawl(session, queue, run_id, matcher, pipeline.put, tracker)
+                    else:
+                        complete = session.crawl(matcher, pipeline.put, tracker)
+            finally:
+                save_http_sessions()  # After the browser contexts' own save (see BrowserSession.crawl)
+                with metrics.timer('phase_seconds', phase='drain_pipeline'):
+                    pipeline.close()
+
+            writer.report()
+            print(f"🧵 {pipeline.summary()}")
+
+            if tracker:
+                tracker.save()
+                print(f"⏭️ {tracker.summary()}")
+    except BaseException as e:
+        if journal:
+            journal.close()
+            print(f"📓 Crawl journal kept for the next run: {journal.path}")
+        write_run_report('failed', db_pool, session, pipeline, e)
+        raise
+
+    if journal:
+        print(f"📓 {journal.summary()}")
+        if complete:
+            journal.complete()
+        else:
+            journal.close()
+            print(f"📓 Crawl journal kept for the next run: {journal.path}")
+    structured = metrics.counter('pages', kind='details', source='structured_data')
+    if structured:
+        print(f"🧩 Structured data: {structured} details pages not opened")
+    print(f"🔌 {db_pool.summary()}")
+    print(f"🚦 {get_rate_budget().summary()}")
+    print(f"🔁 {get_retry_policy().summary()}")
+    if get_block_detector().checks:
+        print(f"🚨 {get_block_detector().summary()}")
+    if get_page_cache():
+        print(f"🗄️ {get_page_cache().summary()}")
+    print(f"⏱️ Time spent:\n{metrics.summary()}")
+    write_run_report('succeeded' if complete else 'partial', db_pool, session, pipeline)
+    return pipeline.items
+
+def run_service(db_pool, session):
+    """
+    Crawl on SERVICE_SCHEDULE forever, reusing the browser session and the DB pool between runs.
+    A failed run is logged and the service waits for the next one. Status is served on
+    http://HEALTH_HOST:HEALTH_PORT/health.
+    """
+    schedule = parse_schedule(SERVICE_SCHEDULE)
+    status = {
+        'state': 'starting',
+        'schedule': str(schedule),
+        'started_at': datetime.now(),
+        'runs': 0,
+        'failures': 0,
+        'consecutive_failures': 0,
+        'last_run': None,
+        'last_error': None,
+        'next_run': None
+    }
+
+    def health():
+        return {
+            **status,
+            'healthy': status['consecutive_failures'] == 0,
+            'browser': session.stats(),
+            'db_pool': db_pool.stats(),
+            'pacing': get_rate_budget().stats(),
+            'retries': get_retry_policy().stats()
+        }
+
+    health_server = HealthServer(HEALTH_HOST, HEALTH_PORT, health)
+    health_server.start()
+    print(f"🩺 Health endpoint on http://{HEALTH_HOST}:{HEALTH_PORT}/health")
+
+    next_run = datetime.now() if SERVICE_RUN_ON_START else schedule.next_after(datetime.now())
+    try:
+        while True:
+            status['state'] = 'idle'
+            status['next_run'] = next_run
+            print(f"\n⏰ Next run at {next_run:%Y-%m-%d %H:%M:%S} ({schedule})")
+            time.sleep(max(0.0, (next_run - datetime.now()).total_seconds()))
+
+            started = datetime.now()
+            status['state'] = 'running'
+            try:
+                found = run_crawl(db_pool, session)
+                status['consecutive_failures'] = 0
+                status['last_run'] = {'started_at': started, 'seconds': (datetime.now() - started).total_seconds(), 'events': found}
+                print(f"\n✅ Run {status['runs'] + 1} completed in {status['last_run']['seconds']:.0f}s")
+            except Exception as e:
+                status['failures'] += 1
+                status['consecutive_failures'] += 1
+                status['last_error'] = f"{started:%Y-%m-%d %H:%M:%S}: {e}"
+                print(f"\n❌ Run failed with error: {e}")
+                import traceback
+                traceback.print_exc()
+            status['runs'] += 1
+            next_run = schedule.next_after(started)
+            if next_run < datetime.now():
+                next_run = schedule.next_after(datetime.now())  # The run overran its slot
+    finally:
+        health_server.stop()
+
+def main():
+    try:
+        db_pool = get_db_pool()
+        if not db_pool:
+            print("❌ Cannot run - no database connection")
+            sys.exit(1)
+
+        # Docker stops containers with SIGTERM: exit through the finally blocks below
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+        if '--seed' in sys.argv[1:]:
+            seed_crawl(db_pool)
+            db_pool.close()
+            sys.exit(0)
+
+        queue = run_id = None
+        if '--worker' in sys.argv[1:]:
+            queue = get_work_queue(db_pool)
+            run_id = queue.latest_open_run()
+            if run_id is None:
+                print("✅ No distributed run with tasks left (start one with --seed)")
+                db_pool.close()
+                sys.exit(0)
+
+        # Workers scrape one task at a time, on the sync session's page
+        session = BrowserSession() if queue else create_browser_session()
+        try:
+            if '--service' in sys.argv[1:]:
+                run_service(db_pool, session)
+            else:
+                run_crawl(db_pool, session, queue, run_id)
+        finally:
+            session.close()
+            db_pool.close()
 
-        # Save events to database
-        print(f"\n💾 Saving {len(all_events)} events to database...")
-        save_events_to_db(all_events, standups)
-        
         print("\n✅ Script completed successfully")
         sys.exit(0)
-        
-except Exception as e:
-    print(f"\n❌ Script failed with error: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
+
+    except Exception as e:
+        print(f"\n❌ Script failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
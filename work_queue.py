@@ -0,0 +1,162 @@
+"""
+Postgres work queue shared by the workers of a distributed crawl.
+"""
+
+from psycopg2 import sql
+from psycopg2.extras import Json
+
+# Task states: pending -> running -> done, or back to pending on a failure until it is failed for good
+OPEN_STATUSES = ('pending', 'running')
+
+
+class WorkQueue:
+    """
+    Crawl tasks (a listing page, a details page) in a table of the scraper's database, so that
+    several workers, each with its own browser and IP, can share one crawl run.
+
+    A worker claims a task with FOR UPDATE SKIP LOCKED, so no two workers get the same one, and
+    holds it for a lease: when a worker dies, its task goes back to the queue once the lease runs
+    out. A failed task is retried until it has been claimed `max_attempts` times. Tasks are unique
+    per run, kind and key, so adding one twice (the same details page from two months, or from a
+    task that is retried) is a no-op. Every call is its own short transaction.
+    """
+
+    def __init__(self, db_pool, table='crawl_task', lease_seconds=900, max_attempts=3):
+        self.db_pool = db_pool
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._table = sql.Identifier(table)
+        self._index = sql.Identifier(f"{table}_claim_idx")
+
+    def _execute(self, query, params=(), fetch=None, **parts):
+        with self.db_pool.connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(query.format(table=self._table, index=self._index, **parts), params)
+                    if fetch == 'one':
+                        result = cursor.fetchone()
+                    elif fetch == 'all':
+                        result = cursor.fetchall()
+                    else:
+                        result = cursor.rowcount
+                conn.commit()
+                return result
+            except Exception:
+                conn.rollback()
+                raise
+
+    def create_table(self):
+        """Create the task table if it doesn't exist yet."""
+        self._execute(sql.SQL("""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id BIGSERIAL PRIMARY KEY,
+            run_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            payload JSONB NOT NULL DEFAULT '{{}}',
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            lease_until TIMESTAMPTZ,
+            result JSONB,
+            error TEXT,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            UNIQUE (run_id, kind, key)
+        );
+        CREATE INDEX IF NOT EXISTS {index} ON {table} (run_id, status, id);
+        """))
+
+    def add(self, run_id, tasks):
+        """Add (kind, key, payload) tasks to a run. Returns how many were new."""
+        tasks = list(tasks)
+        if not tasks:
+            return 0
+        values = sql.SQL(', ').join(sql.SQL("(%s, %s, %s, %s)") for _ in tasks)
+        params = [value for kind, key, payload in tasks for value in (run_id, kind, key, Json(payload))]
+        return self._execute(
+            sql.SQL("INSERT INTO {table} (run_id, kind, key, payload) VALUES {values} ON CONFLICT (run_id, kind, key) DO NOTHING"),
+            params,
+            values=values
+        )
+
+    def claim(self, run_id, worker):
+        """
+        Lease the oldest claimable task of a run to `worker`: a pending one, or a running one whose
+        lease ran out. Returns {'id', 'kind', 'key', 'payload', 'attempts'}, or None if there is none.
+        """
+        # Tasks abandoned on their last attempt are failed, not claimed again
+        self._execute(sql.SQL("""
+        UPDATE {table}
+        SET status = 'failed', error = coalesce(error, 'lease expired'), updated_at = now()
+        WHERE run_id = %s AND status = 'running' AND lease_until < now() AND attempts >= %s
+        """), (run_id, self.max_attempts))
+
+        row = self._execute(sql.SQL("""
+        UPDATE {table}
+        SET status = 'running', attempts = attempts + 1, worker = %s,
+            lease_until = now() + make_interval(secs => %s), updated_at = now()
+        WHERE id = (
+            SELECT id FROM {table}
+            WHERE run_id = %s AND (status = 'pending' OR (status = 'running' AND lease_until < now()))
+            ORDER BY id
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING id, kind, key, payload, attempts
+        """), (worker, self.lease_seconds, run_id), fetch='one')
+        if row is None:
+            return None
+        task_id, kind, key, payload, attempts = row
+        return {'id': task_id, 'kind': kind, 'key': key, 'payload': payload, 'attempts': attempts, 'worker': worker}
+
+    def complete(self, task, result=None):
+        """Mark a claimed task done. Returns False if its lease ran out and another worker took it over."""
+        return self._execute(sql.SQL("""
+        UPDATE {table}
+        SET status = 'done', result = %s, error = NULL, lease_until = NULL, updated_at = now()
+        WHERE id = %s AND worker = %s AND status = 'running'
+        """), (Json(result), task['id'], task['worker'])) == 1
+
+    def fail(self, task, error):
+        """Put a claimed task back in the queue, or mark it failed once it used all its attempts."""
+        self._execute(sql.SQL("""
+        UPDATE {table}
+        SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+            error = %s, lease_until = NULL, updated_at = now()
+        WHERE id = %s AND worker = %s AND status = 'running'
+        """), (self.max_attempts, str(error), task['id'], task['worker']))
+
+    def latest_open_run(self):
+        """The most recently seeded run that still has pending or running tasks, or None."""
+        row = self._execute(sql.SQL("""
+        SELECT run_id FROM {table}
+        WHERE status IN %s
+        GROUP BY run_id
+        ORDER BY min(created_at) DESC
+        LIMIT 1
+        """), (OPEN_STATUSES,), fetch='one')
+        return row[0] if row else None
+
+    def open_count(self, run_id):
+        """Tasks of a run that are pending or being worked on."""
+        return self._execute(
+            sql.SQL("SELECT count(*) FROM {table} WHERE run_id = %s AND status IN %s"),
+            (run_id, OPEN_STATUSES),
+            fetch='one'
+        )[0]
+
+    def counts(self, run_id):
+        """Number of tasks of a run per status."""
+        rows = self._execute(
+            sql.SQL("SELECT status, count(*) FROM {table} WHERE run_id = %s GROUP BY status"),
+            (run_id,),
+            fetch='all'
+        )
+        return dict(rows)
+
+    def summary(self, run_id):
+        """One-line human readable summary of a run's tasks."""
+        counts = self.counts(run_id)
+        details = ', '.join(f"{counts[status]} {status}" for status in ('done', 'failed', 'running', 'pending') if counts.get(status))
+        return f"Work queue run {run_id}: {sum(counts.values())} tasks" + (f" ({details})" if details else "")